@@ -4,7 +4,13 @@ from app.api.v1.endpoints import (
     transcriptions,
     project_phases,
     requirements,
-    phase_comments
+    phase_comments,
+    metrics,
+    events,
+    webhooks,
+    projects,
+    search,
+    jobs
 )
 
 api_router = APIRouter()
@@ -43,3 +49,45 @@ api_router.include_router(
     prefix="/phase-comments",
     tags=["phase-comments"]
 )
+
+# Resúmenes por proyecto
+api_router.include_router(
+    projects.router,
+    prefix="/projects",
+    tags=["projects"]
+)
+
+# Búsqueda de texto completo
+api_router.include_router(
+    search.router,
+    prefix="/search",
+    tags=["search"]
+)
+
+# Cola de trabajos
+api_router.include_router(
+    jobs.router,
+    prefix="/jobs",
+    tags=["jobs"]
+)
+
+# Métricas internas
+api_router.include_router(
+    metrics.router,
+    prefix="/metrics",
+    tags=["metrics"]
+)
+
+# Eventos de cambios (SSE)
+api_router.include_router(
+    events.router,
+    prefix="/events",
+    tags=["events"]
+)
+
+# Webhooks salientes
+api_router.include_router(
+    webhooks.router,
+    prefix="/webhooks",
+    tags=["webhooks"]
+)
@@ -1,10 +1,16 @@
 from .meetings import router as meetings_router
-from . import transcriptions, project_phases, requirements, phase_comments
+from . import transcriptions, project_phases, requirements, phase_comments, metrics, events, webhooks, projects, search, jobs
 
 __all__ = [
     "meetings_router",
     "transcriptions",
     "project_phases",
     "requirements",
-    "phase_comments"
+    "phase_comments",
+    "metrics",
+    "events",
+    "webhooks",
+    "projects",
+    "search",
+    "jobs"
 ]
@@ -0,0 +1,74 @@
+"""Endpoints de eventos de cambios (Server-Sent Events)"""
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.events import event_bus
+from app.services.export import to_jsonable
+
+
+router = APIRouter()
+
+
+def _format_sse(event: dict) -> str:
+    """Serializar un evento en formato SSE (id + data)"""
+    lines = []
+    if event["id"]:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {json.dumps(to_jsonable(event), ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    project_id: Optional[str] = Query(None, description="Recibir sólo los cambios de este proyecto"),
+    last_event_id: Optional[str] = Query(
+        None,
+        description="Id del último evento recibido (alternativa a la cabecera Last-Event-ID)"
+    ),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Stream de cambios de reuniones, transcripciones, fases, requerimientos
+    y comentarios (Server-Sent Events).
+    
+    Cada mensaje es un JSON con type (p. ej. "requirement.updated"),
+    entity_id, project_id y data (el documento). Al reconectar, el cliente
+    envía Last-Event-ID y recibe sólo los eventos que se perdió; si ya no
+    están disponibles recibe un evento "reset" y debe recargar su estado.
+    """
+    if project_id and not ObjectId.is_valid(project_id):
+        raise HTTPException(status_code=400, detail="ID de proyecto no válido")
+    
+    events = event_bus.subscribe(
+        project_id=ObjectId(project_id) if project_id else None,
+        last_event_id=last_event_id_header or last_event_id,
+        heartbeat=settings.EVENTS_HEARTBEAT_SECONDS
+    )
+    
+    async def body():
+        # Tiempo de reconexión sugerido al cliente (ms)
+        yield "retry: 3000\n\n"
+        try:
+            async for event in events:
+                if event is None:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format_sse(event)
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -0,0 +1,29 @@
+"""Endpoints for background jobs"""
+from fastapi import APIRouter, Depends, HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.deps import get_db
+from app.schemas.job import JobResponse
+from app.crud.job import job_crud
+
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Estado de un trabajo: queued, running, completed o failed.
+    
+    Al completarse, result contiene el resumen del trabajo (para el
+    procesamiento con IA: transcription_id, phases_created,
+    requirements_created, ai_cache_hit). error guarda el último fallo,
+    también mientras quedan reintentos.
+    """
+    job = await job_crud.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
@@ -2,13 +2,17 @@ from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.core.deps import get_db
+from app.core.deps import get_db, get_cursor, ProjectionParams
+from app.core.responses import fast_response
 from app.crud.meeting import meeting_crud
-from app.schemas.meeting import MeetingCreate, MeetingUpdate, MeetingResponse
-from app.schemas.common import PaginatedResponse, Message
+from app.schemas.meeting import MeetingCreate, MeetingUpdate, MeetingResponse, MeetingPartialResponse
+from app.schemas.common import PaginatedResponse, Message, TotalMode
 
 router = APIRouter()
 
+# Proyecciones permitidas (fields/exclude)
+meeting_projection = ProjectionParams(MeetingResponse)
+
 
 @router.post("/", response_model=MeetingResponse, status_code=201)
 async def create_meeting(
@@ -19,42 +23,45 @@ async def create_meeting(
     return meeting_dict
 
 
-@router.get("/", response_model=PaginatedResponse[MeetingResponse])
+@router.get("/", response_model=PaginatedResponse[MeetingPartialResponse])
 async def list_meetings(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     project_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    total_mode: TotalMode = Query("exact", description="exact | estimated | none"),
+    projection: Optional[dict] = Depends(meeting_projection),
+    after: Optional[dict] = Depends(get_cursor),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    meetings = await meeting_crud.get_multi(
+    page = await meeting_crud.get_page(
         db, 
         skip=skip, 
         limit=limit,
         project_id=project_id,
-        status=status
+        status=status,
+        after=after,
+        total_mode=total_mode,
+        projection=projection
     )
-    total = await meeting_crud.count(db, project_id=project_id)
     
-    return PaginatedResponse(
-        items=meetings,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
+    return fast_response(
+        PaginatedResponse[MeetingPartialResponse],
+        PaginatedResponse.from_page(page, skip=skip, limit=limit, total_mode=total_mode)
     )
 
 
-@router.get("/{meeting_id}", response_model=MeetingResponse)
+@router.get("/{meeting_id}", response_model=MeetingPartialResponse)
 async def get_meeting(
     meeting_id: str,
+    projection: Optional[dict] = Depends(meeting_projection),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    meeting = await meeting_crud.get(db, meeting_id)
+    meeting = await meeting_crud.get(db, meeting_id, projection)
     if not meeting:
         raise HTTPException(status_code=404, detail="Reunión no encontrada")
     
-    return meeting
+    return fast_response(MeetingPartialResponse, meeting)
 
 
 @router.put("/{meeting_id}", response_model=MeetingResponse)
@@ -63,13 +70,9 @@ async def update_meeting(
     meeting_in: MeetingUpdate,
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    meeting = await meeting_crud.get(db, meeting_id)
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Reunión no encontrada")
-    
     updated_meeting = await meeting_crud.update(db, meeting_id, meeting_in)
     if not updated_meeting:
-        raise HTTPException(status_code=400, detail="Error al actualizar la reunión")
+        raise HTTPException(status_code=404, detail="Reunión no encontrada")
     
     return updated_meeting
 
@@ -79,13 +82,9 @@ async def delete_meeting(
     meeting_id: str,
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    meeting = await meeting_crud.get(db, meeting_id)
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Reunión no encontrada")
-    
     deleted = await meeting_crud.delete(db, meeting_id)
     if not deleted:
-        raise HTTPException(status_code=400, detail="Error al eliminar la reunión")
+        raise HTTPException(status_code=404, detail="Reunión no encontrada")
     
     return Message(message="Reunión eliminada exitosamente")
 
@@ -96,12 +95,8 @@ async def update_meeting_status(
     status: str = Query(..., regex="^(scheduled|in_progress|completed|cancelled)$"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    meeting = await meeting_crud.get(db, meeting_id)
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Reunión no encontrada")
-    
     updated_meeting = await meeting_crud.update_status(db, meeting_id, status)
     if not updated_meeting:
-        raise HTTPException(status_code=400, detail="Error al actualizar el estado")
+        raise HTTPException(status_code=404, detail="Reunión no encontrada")
     
     return updated_meeting
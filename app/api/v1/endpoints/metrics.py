@@ -0,0 +1,58 @@
+"""Endpoints de métricas internas"""
+from fastapi import APIRouter, Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.pool_metrics import pool_metrics
+from app.services.webhooks import webhook_dispatcher
+from app.services.ai_cache import ai_cache
+from app.services.openai_service import openai_service
+from app.services.job_queue import job_worker_pool
+from app.crud.job import job_crud
+from app.core.deps import get_db
+
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics():
+    """
+    Métricas del pool de conexiones de MongoDB.
+    
+    - in_use / open_connections: conexiones ocupadas y abiertas
+    - waiting: peticiones esperando una conexión libre
+    - checkout_wait_ms: percentiles del tiempo de espera en checkout
+    """
+    return pool_metrics.snapshot()
+
+
+@router.get("/webhooks")
+async def get_webhook_metrics():
+    """Contadores del dispatcher de webhooks y tamaño de sus colas"""
+    return webhook_dispatcher.snapshot()
+
+
+@router.get("/ai-cache")
+async def get_ai_cache_metrics():
+    """Aciertos, fallos, escrituras y expulsiones de la caché de análisis de IA"""
+    return ai_cache.snapshot()
+
+
+@router.get("/openai")
+async def get_openai_metrics():
+    """
+    Limitador de OpenAI: llamadas, reintentos y 429, límite de
+    concurrencia actual, presupuestos disponibles y, por separado, el
+    tiempo de espera en el limitador (queue_wait_ms) y la latencia del
+    modelo (model_latency_ms).
+    """
+    return openai_service.limiter.snapshot()
+
+
+@router.get("/jobs")
+async def get_job_metrics(db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Trabajos por estado (todos los procesos) y contadores de los workers de este proceso"""
+    return {
+        "by_status": await job_crud.count_by_status(db),
+        "workers": job_worker_pool.snapshot()
+    }
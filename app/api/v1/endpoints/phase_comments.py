@@ -3,18 +3,25 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.core.deps import get_db
+from app.core.config import settings
+from app.core.deps import get_db, get_cursor, ProjectionParams
+from app.core.responses import fast_response
 from app.schemas.phase_comment import (
     PhaseCommentCreate,
     PhaseCommentUpdate,
-    PhaseCommentResponse
+    PhaseCommentResponse,
+    PhaseCommentPartialResponse
 )
-from app.schemas.common import Message, PaginatedResponse
+from app.schemas.common import Message, PaginatedResponse, TotalMode, ExportFormat
 from app.crud.phase_comment import phase_comment_crud
+from app.services.export import export_columns, export_response
 
 
 router = APIRouter()
 
+# Proyecciones permitidas (fields/exclude)
+comment_projection = ProjectionParams(PhaseCommentResponse)
+
 
 @router.post("/", response_model=PhaseCommentResponse, status_code=201)
 async def create_comment(
@@ -26,37 +33,62 @@ async def create_comment(
     return comment
 
 
-@router.get("/", response_model=PaginatedResponse[PhaseCommentResponse])
+@router.get("/", response_model=PaginatedResponse[PhaseCommentPartialResponse])
 async def list_comments(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     phase_id: Optional[str] = Query(None),
     project_id: Optional[str] = Query(None),
     user_email: Optional[str] = Query(None),
+    total_mode: TotalMode = Query("exact", description="exact | estimated | none"),
+    projection: Optional[dict] = Depends(comment_projection),
+    after: Optional[dict] = Depends(get_cursor),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Listar comentarios con filtros"""
-    comments = await phase_comment_crud.get_multi(
+    page = await phase_comment_crud.get_page(
         db,
         skip=skip,
         limit=limit,
         phase_id=phase_id,
         project_id=project_id,
-        user_email=user_email
+        user_email=user_email,
+        after=after,
+        total_mode=total_mode,
+        projection=projection
+    )
+    
+    return fast_response(
+        PaginatedResponse[PhaseCommentPartialResponse],
+        PaginatedResponse.from_page(page, skip=skip, limit=limit, total_mode=total_mode)
     )
-    total = await phase_comment_crud.count(
+
+
+@router.get("/export")
+async def export_phase_comments(
+    format: ExportFormat = Query("ndjson", description="ndjson | csv"),
+    phase_id: Optional[str] = Query(None),
+    project_id: Optional[str] = Query(None),
+    user_email: Optional[str] = Query(None),
+    projection: Optional[dict] = Depends(comment_projection),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Exportar comentarios (NDJSON o CSV) en streaming, con los mismos filtros del listado.
+    
+    Se declara antes de las rutas por ID para que "export" no se
+    interprete como un ID.
+    """
+    cursor = phase_comment_crud.export_cursor(
         db,
+        projection=projection,
+        batch_size=settings.EXPORT_BATCH_SIZE,
         phase_id=phase_id,
-        project_id=project_id
+        project_id=project_id,
+        user_email=user_email
     )
     
-    return PaginatedResponse(
-        items=comments,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
-    )
+    return export_response(cursor, format, export_columns(PhaseCommentResponse, projection), "phase_comments")
 
 
 @router.get("/phase/{phase_id}", response_model=list[PhaseCommentResponse])
@@ -66,20 +98,21 @@ async def get_phase_comments(
 ):
     """Obtener todos los comentarios de una fase"""
     comments = await phase_comment_crud.get_by_phase(db, phase_id)
-    return comments
+    return fast_response(list[PhaseCommentResponse], comments)
 
 
-@router.get("/{comment_id}", response_model=PhaseCommentResponse)
+@router.get("/{comment_id}", response_model=PhaseCommentPartialResponse)
 async def get_comment(
     comment_id: str,
+    projection: Optional[dict] = Depends(comment_projection),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Obtener comentario por ID"""
-    comment = await phase_comment_crud.get(db, comment_id)
+    comment = await phase_comment_crud.get(db, comment_id, projection)
     if not comment:
         raise HTTPException(status_code=404, detail="Comentario no encontrado")
     
-    return comment
+    return fast_response(PhaseCommentPartialResponse, comment)
 
 
 @router.put("/{comment_id}", response_model=PhaseCommentResponse)
@@ -89,13 +122,9 @@ async def update_comment(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Actualizar comentario"""
-    comment = await phase_comment_crud.get(db, comment_id)
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comentario no encontrado")
-    
     updated = await phase_comment_crud.update(db, comment_id, comment_in)
     if not updated:
-        raise HTTPException(status_code=400, detail="Error al actualizar")
+        raise HTTPException(status_code=404, detail="Comentario no encontrado")
     
     return updated
 
@@ -106,12 +135,8 @@ async def delete_comment(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Eliminar comentario"""
-    comment = await phase_comment_crud.get(db, comment_id)
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comentario no encontrado")
-    
     deleted = await phase_comment_crud.delete(db, comment_id)
     if not deleted:
-        raise HTTPException(status_code=400, detail="Error al eliminar")
+        raise HTTPException(status_code=404, detail="Comentario no encontrado")
     
     return Message(message="Comentario eliminado exitosamente")
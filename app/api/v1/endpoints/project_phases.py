@@ -3,19 +3,24 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.core.deps import get_db
+from app.core.deps import get_db, get_cursor, ProjectionParams
+from app.core.responses import fast_response
 from app.schemas.project_phase import (
     ProjectPhaseCreate,
     ProjectPhaseUpdate,
     ProjectPhaseResponse,
+    ProjectPhasePartialResponse,
     PhaseReorderRequest
 )
-from app.schemas.common import Message, PaginatedResponse
+from app.schemas.common import Message, PaginatedResponse, TotalMode
 from app.crud.project_phase import project_phase_crud
 
 
 router = APIRouter()
 
+# Proyecciones permitidas (fields/exclude)
+phase_projection = ProjectionParams(ProjectPhaseResponse)
+
 
 @router.post("/", response_model=ProjectPhaseResponse, status_code=201)
 async def create_phase(
@@ -27,30 +32,32 @@ async def create_phase(
     return phase
 
 
-@router.get("/", response_model=PaginatedResponse[ProjectPhaseResponse])
+@router.get("/", response_model=PaginatedResponse[ProjectPhasePartialResponse])
 async def list_phases(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     project_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    total_mode: TotalMode = Query("exact", description="exact | estimated | none"),
+    projection: Optional[dict] = Depends(phase_projection),
+    after: Optional[dict] = Depends(get_cursor),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Listar fases con filtros"""
-    phases = await project_phase_crud.get_multi(
+    page = await project_phase_crud.get_page(
         db,
         skip=skip,
         limit=limit,
         project_id=project_id,
-        status=status
+        status=status,
+        after=after,
+        total_mode=total_mode,
+        projection=projection
     )
-    total = await project_phase_crud.count(db, project_id=project_id, status=status)
     
-    return PaginatedResponse(
-        items=phases,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
+    return fast_response(
+        PaginatedResponse[ProjectPhasePartialResponse],
+        PaginatedResponse.from_page(page, skip=skip, limit=limit, total_mode=total_mode)
     )
 
 
@@ -61,20 +68,21 @@ async def get_project_phases(
 ):
     """Obtener todas las fases de un proyecto ordenadas"""
     phases = await project_phase_crud.get_by_project(db, project_id)
-    return phases
+    return fast_response(list[ProjectPhaseResponse], phases)
 
 
-@router.get("/{phase_id}", response_model=ProjectPhaseResponse)
+@router.get("/{phase_id}", response_model=ProjectPhasePartialResponse)
 async def get_phase(
     phase_id: str,
+    projection: Optional[dict] = Depends(phase_projection),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Obtener fase por ID"""
-    phase = await project_phase_crud.get(db, phase_id)
+    phase = await project_phase_crud.get(db, phase_id, projection)
     if not phase:
         raise HTTPException(status_code=404, detail="Fase no encontrada")
     
-    return phase
+    return fast_response(ProjectPhasePartialResponse, phase)
 
 
 @router.put("/{phase_id}", response_model=ProjectPhaseResponse)
@@ -84,13 +92,9 @@ async def update_phase(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Actualizar fase"""
-    phase = await project_phase_crud.get(db, phase_id)
-    if not phase:
-        raise HTTPException(status_code=404, detail="Fase no encontrada")
-    
     updated = await project_phase_crud.update(db, phase_id, phase_in)
     if not updated:
-        raise HTTPException(status_code=400, detail="Error al actualizar")
+        raise HTTPException(status_code=404, detail="Fase no encontrada")
     
     return updated
 
@@ -101,13 +105,9 @@ async def delete_phase(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Eliminar fase"""
-    phase = await project_phase_crud.get(db, phase_id)
-    if not phase:
-        raise HTTPException(status_code=404, detail="Fase no encontrada")
-    
     deleted = await project_phase_crud.delete(db, phase_id)
     if not deleted:
-        raise HTTPException(status_code=400, detail="Error al eliminar")
+        raise HTTPException(status_code=404, detail="Fase no encontrada")
     
     return Message(message="Fase eliminada exitosamente")
 
@@ -119,13 +119,9 @@ async def update_phase_status(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Actualizar estado de la fase"""
-    phase = await project_phase_crud.get(db, phase_id)
-    if not phase:
-        raise HTTPException(status_code=404, detail="Fase no encontrada")
-    
     updated = await project_phase_crud.update_status(db, phase_id, status)
     if not updated:
-        raise HTTPException(status_code=400, detail="Error al actualizar estado")
+        raise HTTPException(status_code=404, detail="Fase no encontrada")
     
     return updated
 
@@ -137,18 +133,14 @@ async def update_phase_completion(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Actualizar porcentaje de completitud de la fase"""
-    phase = await project_phase_crud.get(db, phase_id)
-    if not phase:
-        raise HTTPException(status_code=404, detail="Fase no encontrada")
-    
     updated = await project_phase_crud.update_completion(db, phase_id, completion)
     if not updated:
-        raise HTTPException(status_code=400, detail="Error al actualizar completitud")
+        raise HTTPException(status_code=404, detail="Fase no encontrada")
     
     return updated
 
 
-@router.post("/reorder", response_model=Message)
+@router.post("/reorder", response_model=list[ProjectPhaseResponse])
 async def reorder_phases(
     project_id: str = Query(..., description="ID del proyecto"),
     reorder_data: PhaseReorderRequest = Body(...),
@@ -164,14 +156,19 @@ async def reorder_phases(
             {"phase_id": "yyy", "order": 2}
         ]
     }
+    
+    Retorna las fases del proyecto con el nuevo orden.
     """
-    success = await project_phase_crud.reorder_phases(
-        db,
-        project_id,
-        reorder_data.phase_orders
-    )
+    try:
+        phases = await project_phase_crud.reorder_phases(
+            db,
+            project_id,
+            reorder_data.phase_orders
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if not success:
-        raise HTTPException(status_code=400, detail="Error al reordenar fases")
+    if phases is None:
+        raise HTTPException(status_code=400, detail="ID de proyecto no válido")
     
-    return Message(message="Fases reordenadas exitosamente")
+    return phases
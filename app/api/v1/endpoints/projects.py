@@ -0,0 +1,32 @@
+"""Endpoints agregados por proyecto"""
+from fastapi import APIRouter, Depends, HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+
+from app.core.deps import get_db
+from app.schemas.project_summary import ProjectSummaryResponse
+from app.crud.project_summary import project_summary_crud
+
+
+router = APIRouter()
+
+
+@router.get("/{project_id}/summary", response_model=ProjectSummaryResponse)
+async def get_project_summary(
+    project_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Resumen del proyecto para el dashboard: requerimientos por estado,
+    prioridad, tipo y fase, y fases por estado.
+    
+    Los contadores se mantienen al escribir, así que la lectura es una
+    búsqueda por _id. Un proyecto sin datos devuelve contadores a cero.
+    """
+    if not ObjectId.is_valid(project_id):
+        raise HTTPException(status_code=400, detail="ID de proyecto no válido")
+    
+    summary = await project_summary_crud.get(db, project_id)
+    if not summary:
+        return {"_id": ObjectId(project_id)}
+    return summary
@@ -2,19 +2,31 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
 
-from app.core.deps import get_db
+from app.core.config import settings
+from app.core.deps import get_db, get_cursor, ProjectionParams
+from app.core.responses import fast_response
 from app.schemas.requirement import (
     RequirementCreate,
     RequirementUpdate,
-    RequirementResponse
+    RequirementResponse,
+    RequirementPartialResponse,
+    RequirementBulkCreate,
+    RequirementBulkStatusUpdate,
+    RequirementBulkMove,
+    RequirementBulkDelete
 )
-from app.schemas.common import Message, PaginatedResponse
+from app.schemas.common import Message, PaginatedResponse, TotalMode, ExportFormat, BulkOperationResponse
 from app.crud.requirement import requirement_crud
+from app.services.export import export_columns, export_response
 
 
 router = APIRouter()
 
+# Proyecciones permitidas (fields/exclude)
+requirement_projection = ProjectionParams(RequirementResponse)
+
 
 @router.post("/", response_model=RequirementResponse, status_code=201)
 async def create_requirement(
@@ -26,7 +38,53 @@ async def create_requirement(
     return requirement
 
 
-@router.get("/", response_model=PaginatedResponse[RequirementResponse])
+# Operaciones masivas: se declaran antes de las rutas /{requirement_id}
+# para que "bulk" no se interprete como un ID
+
+@router.post("/bulk", response_model=BulkOperationResponse, status_code=201)
+async def bulk_create_requirements(
+    bulk_in: RequirementBulkCreate,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Crear varios requerimientos en una sola operación"""
+    results = await requirement_crud.create_many(db, bulk_in.items)
+    return BulkOperationResponse.from_results(results)
+
+
+@router.patch("/bulk/status", response_model=BulkOperationResponse)
+async def bulk_update_requirement_status(
+    bulk_in: RequirementBulkStatusUpdate,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Actualizar el estado de varios requerimientos"""
+    results = await requirement_crud.update_status_many(db, bulk_in.ids, bulk_in.status)
+    return BulkOperationResponse.from_results(results)
+
+
+@router.patch("/bulk/move", response_model=BulkOperationResponse)
+async def bulk_move_requirements(
+    bulk_in: RequirementBulkMove,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Mover varios requerimientos a otra fase"""
+    results = await requirement_crud.move_many_to_phase(db, bulk_in.ids, bulk_in.new_phase_id)
+    if results is None:
+        raise HTTPException(status_code=400, detail="ID de fase no válido")
+    
+    return BulkOperationResponse.from_results(results)
+
+
+@router.delete("/bulk", response_model=BulkOperationResponse)
+async def bulk_delete_requirements(
+    bulk_in: RequirementBulkDelete,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Eliminar varios requerimientos"""
+    results = await requirement_crud.delete_many(db, bulk_in.ids)
+    return BulkOperationResponse.from_results(results)
+
+
+@router.get("/", response_model=PaginatedResponse[RequirementPartialResponse])
 async def list_requirements(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
@@ -35,10 +93,13 @@ async def list_requirements(
     status: Optional[str] = Query(None),
     priority: Optional[str] = Query(None),
     type: Optional[str] = Query(None),
+    total_mode: TotalMode = Query("exact", description="exact | estimated | none"),
+    projection: Optional[dict] = Depends(requirement_projection),
+    after: Optional[dict] = Depends(get_cursor),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Listar requerimientos con filtros"""
-    requirements = await requirement_crud.get_multi(
+    page = await requirement_crud.get_page(
         db,
         skip=skip,
         limit=limit,
@@ -46,22 +107,47 @@ async def list_requirements(
         phase_id=phase_id,
         status=status,
         priority=priority,
-        type=type
+        type=type,
+        after=after,
+        total_mode=total_mode,
+        projection=projection
     )
-    total = await requirement_crud.count(
+    
+    return fast_response(
+        PaginatedResponse[RequirementPartialResponse],
+        PaginatedResponse.from_page(page, skip=skip, limit=limit, total_mode=total_mode)
+    )
+
+
+@router.get("/export")
+async def export_requirements(
+    format: ExportFormat = Query("ndjson", description="ndjson | csv"),
+    project_id: Optional[str] = Query(None),
+    phase_id: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    type: Optional[str] = Query(None),
+    projection: Optional[dict] = Depends(requirement_projection),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Exportar requerimientos (NDJSON o CSV) en streaming, con los mismos filtros del listado.
+    
+    Se declara antes de las rutas por ID para que "export" no se
+    interprete como un ID.
+    """
+    cursor = requirement_crud.export_cursor(
         db,
+        projection=projection,
+        batch_size=settings.EXPORT_BATCH_SIZE,
         project_id=project_id,
         phase_id=phase_id,
-        status=status
+        status=status,
+        priority=priority,
+        type=type
     )
     
-    return PaginatedResponse(
-        items=requirements,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
-    )
+    return export_response(cursor, format, export_columns(RequirementResponse, projection), "requirements")
 
 
 @router.get("/phase/{phase_id}", response_model=list[RequirementResponse])
@@ -71,20 +157,21 @@ async def get_phase_requirements(
 ):
     """Obtener todos los requerimientos de una fase"""
     requirements = await requirement_crud.get_by_phase(db, phase_id)
-    return requirements
+    return fast_response(list[RequirementResponse], requirements)
 
 
-@router.get("/{requirement_id}", response_model=RequirementResponse)
+@router.get("/{requirement_id}", response_model=RequirementPartialResponse)
 async def get_requirement(
     requirement_id: str,
+    projection: Optional[dict] = Depends(requirement_projection),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Obtener requerimiento por ID"""
-    requirement = await requirement_crud.get(db, requirement_id)
+    requirement = await requirement_crud.get(db, requirement_id, projection)
     if not requirement:
         raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
     
-    return requirement
+    return fast_response(RequirementPartialResponse, requirement)
 
 
 @router.put("/{requirement_id}", response_model=RequirementResponse)
@@ -94,13 +181,9 @@ async def update_requirement(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Actualizar requerimiento"""
-    requirement = await requirement_crud.get(db, requirement_id)
-    if not requirement:
-        raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
-    
     updated = await requirement_crud.update(db, requirement_id, requirement_in)
     if not updated:
-        raise HTTPException(status_code=400, detail="Error al actualizar")
+        raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
     
     return updated
 
@@ -111,13 +194,9 @@ async def delete_requirement(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Eliminar requerimiento"""
-    requirement = await requirement_crud.get(db, requirement_id)
-    if not requirement:
-        raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
-    
     deleted = await requirement_crud.delete(db, requirement_id)
     if not deleted:
-        raise HTTPException(status_code=400, detail="Error al eliminar")
+        raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
     
     return Message(message="Requerimiento eliminado exitosamente")
 
@@ -129,13 +208,9 @@ async def update_requirement_status(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Actualizar estado del requerimiento"""
-    requirement = await requirement_crud.get(db, requirement_id)
-    if not requirement:
-        raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
-    
     updated = await requirement_crud.update_status(db, requirement_id, status)
     if not updated:
-        raise HTTPException(status_code=400, detail="Error al actualizar estado")
+        raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
     
     return updated
 
@@ -147,12 +222,11 @@ async def move_requirement_to_phase(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Mover requerimiento a otra fase"""
-    requirement = await requirement_crud.get(db, requirement_id)
-    if not requirement:
-        raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
+    if not ObjectId.is_valid(new_phase_id):
+        raise HTTPException(status_code=400, detail="ID de fase no válido")
     
     updated = await requirement_crud.move_to_phase(db, requirement_id, new_phase_id)
     if not updated:
-        raise HTTPException(status_code=400, detail="Error al mover requerimiento")
+        raise HTTPException(status_code=404, detail="Requerimiento no encontrado")
     
     return updated
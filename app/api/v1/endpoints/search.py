@@ -0,0 +1,61 @@
+"""Endpoint de búsqueda de texto completo"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.deps import get_db, get_cursor
+from app.schemas.search import SearchResponse
+from app.crud.search import search_crud, SEARCH_TARGETS
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=2, max_length=200, description="Texto a buscar (admite \"frases\" y -exclusiones)"),
+    project_id: Optional[str] = Query(None),
+    types: Optional[str] = Query(
+        None,
+        description="Tipos separados por coma: transcription, requirement, phase_comment (todos por defecto)"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[dict] = Depends(get_cursor),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Buscar en transcripciones, requerimientos y comentarios de fases.
+    
+    Los resultados se ordenan por relevancia (índices de texto con
+    stemming en español) y se paginan con next_cursor. Cada resultado
+    incluye un fragmento del texto con los términos resaltados, nunca el
+    texto completo.
+    """
+    selected = None
+    if types:
+        selected = [name.strip() for name in types.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in SEARCH_TARGETS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Tipos no válidos: {', '.join(unknown)}. "
+                       f"Permitidos: {', '.join(SEARCH_TARGETS)}"
+            )
+    
+    page = await search_crud.search(
+        db,
+        q,
+        types=selected,
+        project_id=project_id,
+        after=after,
+        limit=limit
+    )
+    if page is None:
+        raise HTTPException(status_code=400, detail="ID de proyecto no válido")
+    
+    return SearchResponse(
+        items=page.items,
+        size=limit,
+        has_more=page.has_more,
+        next_cursor=page.next_cursor
+    )
@@ -1,21 +1,56 @@
 """Endpoints for Transcriptions"""
-from typing import Optional
+import asyncio
+import json
+import uuid
+from typing import Any, Optional, Set
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.core.deps import get_db
+from app.core.config import settings
+from app.core.deps import get_db, get_cursor, ProjectionParams
+from app.core.responses import fast_response, raw_reads
 from app.schemas.transcription import (
     TranscriptionCreate,
     TranscriptionUpdate,
     TranscriptionResponse,
+    TranscriptionPartialResponse,
     TranscriptionProcessRequest
 )
-from app.schemas.common import Message, PaginatedResponse
-from app.crud.transcription import transcription_crud
+from app.schemas.common import Message, PaginatedResponse, TotalMode, ExportFormat
+from app.schemas.job import JobResponse
+from app.crud.transcription import TranscriptionBusyError, transcription_crud
+from app.crud.job import job_crud
+from app.services.job_queue import job_worker_pool
+from app.services.job_handlers import TRANSCRIPTION_PROCESS
+from app.services.export import export_columns, export_response, to_jsonable
 
 
 router = APIRouter()
 
+# Proyecciones permitidas (fields/exclude)
+transcription_projection = ProjectionParams(TranscriptionResponse)
+transcription_list_projection = ProjectionParams(
+    TranscriptionResponse,
+    default_exclude=("transcription_text", "ai_analysis")
+)
+
+# Procesamientos en streaming en curso (referencia fuerte: siguen aunque
+# el cliente se desconecte)
+_streaming_tasks: Set[asyncio.Task] = set()
+
+
+async def cancel_streaming_tasks() -> None:
+    """Cancelar los procesamientos en streaming (al apagar la API)"""
+    for task in list(_streaming_tasks):
+        task.cancel()
+    await asyncio.gather(*_streaming_tasks, return_exceptions=True)
+
+
+def _format_sse(event: str, data: Any) -> str:
+    """Serializar un evento SSE con nombre (event + data)"""
+    return f"event: {event}\ndata: {json.dumps(to_jsonable(data), ensure_ascii=False)}\n\n"
+
 
 @router.post("/", response_model=TranscriptionResponse, status_code=201)
 async def create_transcription(
@@ -27,51 +62,84 @@ async def create_transcription(
     return transcription
 
 
-@router.get("/", response_model=PaginatedResponse[TranscriptionResponse])
+@router.get("/", response_model=PaginatedResponse[TranscriptionPartialResponse])
 async def list_transcriptions(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     user_email: Optional[str] = Query(None),
     project_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    total_mode: TotalMode = Query("exact", description="exact | estimated | none"),
+    projection: Optional[dict] = Depends(transcription_list_projection),
+    after: Optional[dict] = Depends(get_cursor),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    """Listar transcripciones con filtros"""
-    transcriptions = await transcription_crud.get_multi(
+    """
+    Listar transcripciones con filtros.
+    
+    Por defecto no incluye transcription_text ni ai_analysis; se pueden
+    pedir con fields=... (o fields=* para todos los campos).
+    """
+    raw = raw_reads()
+    page = await transcription_crud.get_page(
         db,
         skip=skip,
         limit=limit,
         user_email=user_email,
         project_id=project_id,
-        status=status
+        status=status,
+        after=after,
+        total_mode=total_mode,
+        projection=projection,
+        raw=raw
     )
-    total = await transcription_crud.count(
+    
+    return fast_response(
+        PaginatedResponse[TranscriptionPartialResponse],
+        PaginatedResponse.from_page(page, skip=skip, limit=limit, total_mode=total_mode),
+        raw=raw
+    )
+
+
+@router.get("/export")
+async def export_transcriptions(
+    format: ExportFormat = Query("ndjson", description="ndjson | csv"),
+    user_email: Optional[str] = Query(None),
+    project_id: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    projection: Optional[dict] = Depends(transcription_projection),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Exportar transcripciones (NDJSON o CSV) en streaming, con los mismos filtros del listado.
+    
+    Se declara antes de las rutas por ID para que "export" no se
+    interprete como un ID.
+    """
+    cursor = transcription_crud.export_cursor(
         db,
+        projection=projection,
+        batch_size=settings.EXPORT_BATCH_SIZE,
         user_email=user_email,
         project_id=project_id,
         status=status
     )
     
-    return PaginatedResponse(
-        items=transcriptions,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
-    )
+    return export_response(cursor, format, export_columns(TranscriptionResponse, projection), "transcriptions")
 
 
-@router.get("/{transcription_id}", response_model=TranscriptionResponse)
+@router.get("/{transcription_id}", response_model=TranscriptionPartialResponse)
 async def get_transcription(
     transcription_id: str,
+    projection: Optional[dict] = Depends(transcription_projection),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Obtener transcripción por ID"""
-    transcription = await transcription_crud.get(db, transcription_id)
+    transcription = await transcription_crud.get(db, transcription_id, projection)
     if not transcription:
         raise HTTPException(status_code=404, detail="Transcripción no encontrada")
     
-    return transcription
+    return fast_response(TranscriptionPartialResponse, transcription)
 
 
 @router.put("/{transcription_id}", response_model=TranscriptionResponse)
@@ -81,13 +149,9 @@ async def update_transcription(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Actualizar transcripción"""
-    transcription = await transcription_crud.get(db, transcription_id)
-    if not transcription:
-        raise HTTPException(status_code=404, detail="Transcripción no encontrada")
-    
     updated = await transcription_crud.update(db, transcription_id, transcription_in)
     if not updated:
-        raise HTTPException(status_code=400, detail="Error al actualizar")
+        raise HTTPException(status_code=404, detail="Transcripción no encontrada")
     
     return updated
 
@@ -98,25 +162,26 @@ async def delete_transcription(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Eliminar transcripción"""
-    transcription = await transcription_crud.get(db, transcription_id)
-    if not transcription:
-        raise HTTPException(status_code=404, detail="Transcripción no encontrada")
-    
     deleted = await transcription_crud.delete(db, transcription_id)
     if not deleted:
-        raise HTTPException(status_code=400, detail="Error al eliminar")
+        raise HTTPException(status_code=404, detail="Transcripción no encontrada")
     
     return Message(message="Transcripción eliminada exitosamente")
 
 
-@router.post("/{transcription_id}/process", response_model=TranscriptionResponse)
+@router.post("/{transcription_id}/process", response_model=JobResponse, status_code=202)
 async def process_transcription_with_ai(
     transcription_id: str,
     process_request: TranscriptionProcessRequest,
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """
-    Procesar transcripción con IA (OpenAI).
+    Encolar el procesamiento de la transcripción con IA (OpenAI).
+    
+    Responde 202 con el trabajo creado; el progreso se consulta en
+    GET /jobs/{job_id} (o con los eventos transcription.processed /
+    transcription.failed). Si ya hay un trabajo pendiente para esta
+    transcripción se devuelve ese mismo.
     
     Extrae:
     - Resumen ejecutivo
@@ -133,26 +198,95 @@ async def process_transcription_with_ai(
     if not transcription:
         raise HTTPException(status_code=404, detail="Transcripción no encontrada")
     
-    if transcription.get("status") == "processing":
-        raise HTTPException(
-            status_code=400,
-            detail="La transcripción ya está siendo procesada"
-        )
+    job = await job_crud.enqueue(
+        db,
+        TRANSCRIPTION_PROCESS,
+        {
+            "transcription_id": transcription_id,
+            "project_context": process_request.project_context,
+            "use_cache": process_request.use_cache
+        },
+        dedupe_key=f"{TRANSCRIPTION_PROCESS}:{transcription_id}"
+    )
+    job_worker_pool.notify()
+    return job
+
+
+@router.post("/{transcription_id}/process/stream")
+async def process_transcription_with_ai_stream(
+    transcription_id: str,
+    process_request: TranscriptionProcessRequest,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Procesar la transcripción con IA en streaming (Server-Sent Events).
+    
+    A diferencia de /process no pasa por la cola: el análisis se hace en
+    esta petición y cada elemento se envía en cuanto el modelo termina de
+    escribirlo, como eventos summary, phase, requirement,
+    technical_decision y action_item. Al final llega un evento completed
+    con el resultado guardado (mismo proceso que /process: fases y
+    requerimientos creados, webhooks) o un evento error.
     
+    Si el cliente se desconecta el procesamiento continúa y el resultado
+    se guarda igualmente.
+    """
+    # Se toma antes de responder para poder devolver 404/409
+    owner = f"stream:{uuid.uuid4().hex}"
     try:
-        processed = await transcription_crud.process_with_ai(
-            db,
-            transcription_id,
-            project_context=process_request.project_context
-        )
-        
-        if not processed:
-            raise HTTPException(status_code=500, detail="Error al procesar con IA")
-        
-        return processed
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error al procesar transcripción: {str(e)}"
-        )
+        transcription = await transcription_crud.start_processing(db, transcription_id, owner)
+    except TranscriptionBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not transcription:
+        raise HTTPException(status_code=404, detail="Transcripción no encontrada")
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def on_item(item_type: str, item: Any) -> None:
+        await queue.put(_format_sse(item_type, item))
+    
+    async def process() -> None:
+        try:
+            processed = await transcription_crud.process_with_ai(
+                db,
+                transcription_id,
+                project_context=process_request.project_context,
+                use_cache=process_request.use_cache,
+                on_item=on_item,
+                transcription=transcription,
+                owner=owner
+            )
+            if not processed:
+                raise ValueError("Transcripción no encontrada")
+            await queue.put(_format_sse("completed", {
+                "transcription_id": processed["_id"],
+                "status": processed["status"],
+                "phases_created": processed.get("phases_created"),
+                "requirements_created": processed.get("requirements_created"),
+                "ai_cache_hit": processed.get("ai_cache_hit"),
+                "ai_analysis": processed.get("ai_analysis"),
+            }))
+        except Exception as e:
+            await queue.put(_format_sse("error", {"detail": str(e)}))
+        finally:
+            await queue.put(None)
+    
+    task = asyncio.create_task(process())
+    _streaming_tasks.add(task)
+    task.add_done_callback(_streaming_tasks.discard)
+    
+    async def body():
+        while True:
+            message = await queue.get()
+            if message is None:
+                break
+            yield message
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -0,0 +1,134 @@
+"""Endpoints for Webhook subscriptions"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+
+from app.core.deps import get_db
+from app.schemas.webhook import (
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionUpdate,
+    WebhookSubscriptionResponse,
+    WebhookDeadLetterResponse
+)
+from app.schemas.common import Message
+from app.crud.webhook import webhook_subscription_crud, webhook_dead_letter_crud
+from app.services.webhooks import webhook_dispatcher
+
+
+router = APIRouter()
+
+
+@router.post("/", response_model=WebhookSubscriptionResponse, status_code=201)
+async def create_subscription(
+    subscription_in: WebhookSubscriptionCreate,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Crear una suscripción de webhook.
+    
+    Eventos disponibles: transcription.processed, transcription.failed,
+    requirement.created y project_phase.status_changed. Se admiten
+    prefijos ("transcription.*") y "*" para todos.
+    """
+    if subscription_in.project_id and not ObjectId.is_valid(subscription_in.project_id):
+        raise HTTPException(status_code=400, detail="ID de proyecto no válido")
+    
+    subscription = await webhook_subscription_crud.create(db, subscription_in)
+    webhook_dispatcher.invalidate_subscriptions()
+    return subscription
+
+
+@router.get("/", response_model=list[WebhookSubscriptionResponse])
+async def list_subscriptions(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Listar suscripciones de webhooks"""
+    return await webhook_subscription_crud.get_multi(db, skip=skip, limit=limit)
+
+
+# Dead letters: se declaran antes de /{subscription_id}
+
+@router.get("/dead-letters", response_model=list[WebhookDeadLetterResponse])
+async def list_dead_letters(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    subscription_id: Optional[str] = Query(None),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Listar entregas que agotaron los reintentos"""
+    return await webhook_dead_letter_crud.get_multi(
+        db,
+        skip=skip,
+        limit=limit,
+        subscription_id=subscription_id
+    )
+
+
+@router.post("/dead-letters/{dead_letter_id}/retry", response_model=Message)
+async def retry_dead_letter(
+    dead_letter_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Reenviar una entrega fallida"""
+    if not webhook_dispatcher.running:
+        raise HTTPException(status_code=503, detail="El dispatcher de webhooks no está activo")
+    
+    dead_letter = await webhook_dead_letter_crud.pop(db, dead_letter_id)
+    if not dead_letter:
+        raise HTTPException(status_code=404, detail="Entrega fallida no encontrada")
+    
+    if not await webhook_dispatcher.redeliver(dead_letter):
+        # La suscripción ya no existe: se conserva la entrega
+        dead_letter.pop("_id", None)
+        await webhook_dead_letter_crud.create(db, dead_letter)
+        raise HTTPException(status_code=404, detail="Suscripción no encontrada")
+    
+    return Message(message="Entrega reencolada")
+
+
+@router.get("/{subscription_id}", response_model=WebhookSubscriptionResponse)
+async def get_subscription(
+    subscription_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Obtener suscripción por ID"""
+    subscription = await webhook_subscription_crud.get(db, subscription_id)
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Suscripción no encontrada")
+    
+    return subscription
+
+
+@router.put("/{subscription_id}", response_model=WebhookSubscriptionResponse)
+async def update_subscription(
+    subscription_id: str,
+    subscription_in: WebhookSubscriptionUpdate,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Actualizar suscripción"""
+    if subscription_in.project_id and not ObjectId.is_valid(subscription_in.project_id):
+        raise HTTPException(status_code=400, detail="ID de proyecto no válido")
+    
+    updated = await webhook_subscription_crud.update(db, subscription_id, subscription_in)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Suscripción no encontrada")
+    
+    webhook_dispatcher.invalidate_subscriptions()
+    return updated
+
+
+@router.delete("/{subscription_id}", response_model=Message)
+async def delete_subscription(
+    subscription_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Eliminar suscripción"""
+    deleted = await webhook_subscription_crud.delete(db, subscription_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Suscripción no encontrada")
+    
+    webhook_dispatcher.invalidate_subscriptions()
+    return Message(message="Suscripción eliminada exitosamente")
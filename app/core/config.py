@@ -37,6 +37,70 @@ class Settings(BaseSettings):
             return f"mongodb://{user}:{password}@{server}:{port}/{values.get('MONGODB_DB', 'v1tr0_db')}"
         return f"mongodb://{server}:{port}/{values.get('MONGODB_DB', 'v1tr0_db')}"
     
+    # Pool de conexiones (por worker)
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGODB_COMPRESSORS: Optional[str] = None  # ej: "zstd,snappy,zlib"
+    
+    # TTL del caché de conteos para total_mode=estimated en listados filtrados
+    COUNT_CACHE_TTL_SECONDS: int = 30
+    
+    # Índices: reconciliar al arrancar y (opcional) verificar planes de consulta
+    MONGODB_ENSURE_INDEXES: bool = True
+    MONGODB_CHECK_QUERY_PLANS: bool = False
+    
+    # Exportaciones en streaming: documentos por lote leídos del cursor
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Respuestas de lectura sin construir los modelos de response_model
+    # (forma del schema + orjson, misma salida). False: validación completa
+    FAST_RESPONSES: bool = True
+    # Listado de transcripciones como RawBSONDocument: la página queda en
+    # bytes BSON y se decodifica un documento cada vez al escribir el JSON
+    RAW_BSON_READS: bool = False
+    
+    # Eventos de cambios (SSE): auto | change_stream | memory
+    EVENTS_SOURCE: str = "auto"
+    EVENTS_BUFFER_SIZE: int = 1000
+    EVENTS_QUEUE_SIZE: int = 1000
+    EVENTS_HEARTBEAT_SECONDS: float = 15
+    
+    # Webhooks salientes
+    WEBHOOKS_ENABLED: bool = True
+    WEBHOOK_WORKERS: int = 4
+    WEBHOOK_QUEUE_SIZE: int = 10000
+    WEBHOOK_BATCH_SIZE: int = 50
+    WEBHOOK_BATCH_WINDOW_SECONDS: float = 1.0
+    WEBHOOK_TIMEOUT_SECONDS: float = 10
+    WEBHOOK_MAX_ATTEMPTS: int = 6
+    WEBHOOK_BACKOFF_BASE_SECONDS: float = 2
+    WEBHOOK_BACKOFF_MAX_SECONDS: float = 300
+    WEBHOOK_SUBSCRIPTION_CACHE_SECONDS: float = 30
+    
+    # Caché de análisis de IA (MongoDB, con Redis opcional delante)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    AI_CACHE_MAX_ENTRIES: int = 10000
+    AI_CACHE_REDIS_ENABLED: bool = False
+    AI_CACHE_REDIS_TTL_SECONDS: int = 24 * 3600
+    
+    # Plazo de la marca processing de una transcripción: se renueva mientras
+    # se procesa y, si vence (el proceso murió), otro puede retomarla
+    AI_PROCESSING_LEASE_SECONDS: float = 120
+    
+    # Cola de trabajos (procesamiento con IA). Con 0 workers en proceso,
+    # los trabajos los ejecuta "python -m app.worker"
+    JOBS_INPROCESS_WORKERS: int = 2
+    JOBS_WORKER_CONCURRENCY: int = 4
+    JOBS_LEASE_SECONDS: float = 120
+    JOBS_POLL_INTERVAL_SECONDS: float = 2
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_RETRY_BACKOFF_SECONDS: float = 30
+    JOBS_RETRY_BACKOFF_MAX_SECONDS: float = 600
+    JOBS_RETENTION_SECONDS: int = 7 * 24 * 3600
+    
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -60,6 +124,35 @@ class Settings(BaseSettings):
     # OpenAI (para procesamiento de transcripciones y IA)
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4o-mini"  # Modelo económico y eficiente
+    # Análisis por fragmentos (map-reduce) de transcripciones largas
+    OPENAI_CHUNK_THRESHOLD_TOKENS: int = 12000
+    OPENAI_CHUNK_MAX_TOKENS: int = 6000
+    # Limitador de llamadas (por proceso): presupuestos por minuto de la
+    # cuenta, máximo de llamadas simultáneas (se adapta a los 429) y reintentos
+    OPENAI_RPM_LIMIT: int = 500
+    OPENAI_TPM_LIMIT: int = 200000
+    OPENAI_MAX_CONCURRENCY: int = 4
+    OPENAI_COMPLETION_TOKENS_ESTIMATE: int = 2000
+    OPENAI_MAX_RETRIES: int = 5
+    OPENAI_BACKOFF_BASE_SECONDS: float = 1
+    OPENAI_BACKOFF_MAX_SECONDS: float = 60
+    
+    # Backend de LLM: openai | openai_compatible (API compatible en
+    # LLM_BASE_URL, p. ej. un servidor local) | fake (servidor simulado en
+    # proceso, sin coste, para pruebas de carga)
+    LLM_BACKEND: str = "openai"
+    LLM_BASE_URL: Optional[str] = None
+    LLM_API_KEY: Optional[str] = None
+    LLM_MODEL: Optional[str] = None  # por defecto OPENAI_MODEL
+    # Servidor simulado (LLM_BACKEND=fake o python -m app.services.fake_llm):
+    # latencia fixed | uniform (±SPREAD) | lognormal (mediana y sigma=SPREAD)
+    # y proporción de respuestas 429 y 5xx
+    FAKE_LLM_LATENCY_DISTRIBUTION: str = "lognormal"
+    FAKE_LLM_LATENCY_MS: float = 800
+    FAKE_LLM_LATENCY_SPREAD: float = 0.5
+    FAKE_LLM_RATE_LIMIT_RATE: float = 0.0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_SEED: Optional[int] = None
     
     # Jitsi Meet
     JITSI_DOMAIN: str = "meet.jit.si"
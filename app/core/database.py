@@ -1,17 +1,78 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
+import asyncio
+from bson.raw_bson import RawBSONDocument
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorClientSession,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase
+)
+from typing import Optional, Dict, Any, Callable, Awaitable, TypeVar
 
 from app.core.config import settings
+from app.core.indexes import ensure_indexes, verify_query_plans
+from app.core.pool_metrics import pool_metrics
 
 # Cliente MongoDB global
 mongodb_client: Optional[AsyncIOMotorClient] = None
 
+# Se detecta una vez si el despliegue es replica set / mongos
+_replicated: Optional[bool] = None
+
+T = TypeVar("T")
+
+
+def _client_options() -> Dict[str, Any]:
+    """Opciones del pool de conexiones definidas en Settings"""
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "event_listeners": [pool_metrics],
+    }
+    if settings.MONGODB_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGODB_MAX_IDLE_TIME_MS
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGODB_COMPRESSORS:
+        options["compressors"] = settings.MONGODB_COMPRESSORS
+    return options
+
 
 async def connect_to_mongo():
     """Conectar a MongoDB"""
     global mongodb_client
-    mongodb_client = AsyncIOMotorClient(settings.MONGODB_URL)
+    mongodb_client = AsyncIOMotorClient(settings.MONGODB_URL, **_client_options())
     print(f"✅ Conectado a MongoDB: {settings.MONGODB_DB}")
+    
+    db = mongodb_client[settings.MONGODB_DB]
+    
+    if settings.MONGODB_ENSURE_INDEXES:
+        await ensure_indexes(db, _registered_cruds())
+    
+    if settings.MONGODB_CHECK_QUERY_PLANS:
+        await verify_query_plans(db, _registered_cruds())
+
+
+def _registered_cruds():
+    """CRUDs con índices declarados (import diferido para evitar ciclos)"""
+    from app.crud import CRUD_REGISTRY
+    return CRUD_REGISTRY
+
+
+async def warm_up_pool():
+    """
+    Abrir MONGODB_MIN_POOL_SIZE conexiones antes de aceptar tráfico.
+    
+    Los pings concurrentes obligan al driver a abrir una conexión por cada
+    uno, de modo que las primeras peticiones no pagan el handshake/TLS.
+    """
+    if mongodb_client is None or settings.MONGODB_MIN_POOL_SIZE <= 0:
+        return
+    
+    admin = mongodb_client.admin
+    await asyncio.gather(
+        *(admin.command("ping") for _ in range(settings.MONGODB_MIN_POOL_SIZE))
+    )
+    print(f"🔥 Pool de MongoDB precalentado: {pool_metrics.open_connections} conexiones abiertas")
 
 
 async def close_mongo_connection():
@@ -22,6 +83,16 @@ async def close_mongo_connection():
         print("❌ Desconectado de MongoDB")
 
 
+def raw_bson(collection: AsyncIOMotorCollection) -> AsyncIOMotorCollection:
+    """
+    La misma colección devolviendo RawBSONDocument: el driver no decodifica
+    los documentos (ni los subdocumentos) hasta que se accede a ellos.
+    """
+    return collection.with_options(
+        codec_options=collection.codec_options.with_options(document_class=RawBSONDocument)
+    )
+
+
 async def get_database() -> AsyncIOMotorDatabase:
     """Obtener instancia de la base de datos"""
     if mongodb_client is None:
@@ -35,3 +106,40 @@ def get_collection(collection_name: str):
         raise Exception("MongoDB no está conectado")
     db = mongodb_client[settings.MONGODB_DB]
     return db[collection_name]
+
+
+async def is_replicated(db: AsyncIOMotorDatabase) -> bool:
+    """
+    Indica si el despliegue es replica set o sharded (mongos).
+    
+    Sólo en ese caso hay transacciones y change streams; se detecta una vez.
+    """
+    global _replicated
+    if _replicated is None:
+        hello = await db.client.admin.command("hello")
+        _replicated = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        if not _replicated:
+            print("⚠️  Warning: MongoDB standalone, sin transacciones ni change streams")
+    return _replicated
+
+
+async def supports_transactions(db: AsyncIOMotorDatabase) -> bool:
+    """Indica si el servidor admite transacciones (replica set o sharded)"""
+    return await is_replicated(db)
+
+
+async def run_in_transaction(
+    db: AsyncIOMotorDatabase,
+    callback: Callable[[Optional[AsyncIOMotorClientSession]], Awaitable[T]]
+) -> T:
+    """
+    Ejecutar callback(session) dentro de una transacción.
+    
+    with_transaction reintenta los errores transitorios. En un servidor
+    standalone (desarrollo) se ejecuta con session=None y sin atomicidad.
+    """
+    if not await supports_transactions(db):
+        return await callback(None)
+    
+    async with await db.client.start_session() as session:
+        return await session.with_transaction(callback)
@@ -1,7 +1,10 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, List, Optional, Sequence, Type
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 from app.core.database import get_database
+from app.crud.pagination import decode_cursor
 
 
 async def get_db() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
@@ -10,4 +13,74 @@ async def get_db() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
     try:
         yield db
     finally:
-        pass
\ No newline at end of file
+        pass
+
+
+def get_cursor(
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor opaco devuelto en next_cursor para pedir la siguiente página"
+    )
+) -> Optional[dict]:
+    """Dependencia para decodificar el cursor de paginación"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+class ProjectionParams:
+    """
+    Dependencia que traduce los parámetros fields/exclude a una proyección
+    de MongoDB, validando los nombres contra el schema de respuesta.
+    
+    - fields=a,b   -> sólo esos campos (más _id)
+    - exclude=a,b  -> todos menos esos campos
+    - fields=*     -> todos los campos, incluidos los excluidos por defecto
+    - sin parámetros -> se excluyen los campos de default_exclude
+    """
+    
+    def __init__(self, model: Type[BaseModel], default_exclude: Sequence[str] = ()):
+        self.allowed = set(model.model_fields) - {"id"}
+        self.default_exclude = tuple(default_exclude)
+    
+    def _parse(self, value: str) -> List[str]:
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Campos no válidos: {', '.join(unknown)}. "
+                       f"Permitidos: {', '.join(sorted(self.allowed))}"
+            )
+        return names
+    
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None,
+            description="Campos a incluir separados por coma (* para todos)"
+        ),
+        exclude: Optional[str] = Query(
+            None,
+            description="Campos a excluir separados por coma"
+        )
+    ) -> Optional[Dict[str, int]]:
+        if fields and exclude:
+            raise HTTPException(status_code=400, detail="Usa fields o exclude, no ambos")
+        
+        if fields == "*":
+            return None
+        
+        if fields:
+            return {name: 1 for name in self._parse(fields)}
+        
+        if exclude:
+            return {name: 0 for name in self._parse(exclude)}
+        
+        if self.default_exclude:
+            return {name: 0 for name in self.default_exclude}
+        
+        return None
@@ -0,0 +1,341 @@
+"""
+Bus de eventos de cambios sobre las entidades.
+
+Los CRUD publican cada escritura (creación, actualización y borrado) y el
+endpoint SSE /events/stream reparte los eventos entre los clientes.
+
+Origen de los eventos (EVENTS_SOURCE):
+- memory: los publica este proceso desde los métodos de escritura de los
+  CRUD. Sólo ve los cambios hechos por este worker.
+- change_stream: en replica set / sharded se escucha un change stream de
+  MongoDB, que ve los cambios de todos los workers; las publicaciones de
+  los CRUD se ignoran para no duplicar eventos.
+- auto: change_stream si el despliegue lo admite, memory si no.
+
+Cada evento lleva un id (el id de SSE). Los últimos EVENTS_BUFFER_SIZE se
+guardan en memoria para que un cliente que reconecta con Last-Event-ID
+reciba sólo lo que se perdió. Con change streams el id es el resume token:
+si ya no está en memoria, el cliente se sirve con un change stream propio
+reanudado desde ese punto. Si no se puede recuperar, se envía un evento
+"reset" para que el cliente recargue su estado.
+"""
+import asyncio
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.config import settings
+from app.core.database import is_replicated
+
+# Colecciones publicadas y nombre de la entidad en el tipo de evento
+WATCHED_COLLECTIONS = {
+    "meetings": "meeting",
+    "transcriptions": "transcription",
+    "project_phases": "project_phase",
+    "requirements": "requirement",
+    "phase_comments": "phase_comment",
+}
+
+# operationType del change stream -> operación del evento
+_CHANGE_OPERATIONS = {
+    "insert": "created",
+    "update": "updated",
+    "replace": "updated",
+    "delete": "deleted",
+}
+
+_CHANGE_PIPELINE = [
+    {"$match": {
+        "ns.coll": {"$in": list(WATCHED_COLLECTIONS)},
+        "operationType": {"$in": list(_CHANGE_OPERATIONS)},
+    }}
+]
+
+# Códigos de error de MongoDB
+_UNKNOWN_FIELD = 40415          # fullDocumentBeforeChange en servidores < 6.0
+_HISTORY_LOST = 286             # el resume token ya no está en el oplog
+
+
+class _Subscriber:
+    """Cola de eventos de un cliente SSE"""
+
+    def __init__(self, project_id: Optional[ObjectId], queue_size: int):
+        self.project_id = project_id
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        # Los borrados sin pre-imagen no traen project_id: se envían a todos
+        return (
+            self.project_id is None
+            or event["project_id"] is None
+            or event["project_id"] == self.project_id
+        )
+
+    def put(self, event: Dict[str, Any]) -> None:
+        if not self.matches(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente demasiado lento: recibirá un reset
+            self.overflowed = True
+
+
+class EventBus:
+    """Bus de eventos en proceso con buffer circular para reanudar"""
+
+    def __init__(self, buffer_size: int = 1000, queue_size: int = 1000):
+        self.boot_id = uuid.uuid4().hex[:8]
+        self.source = "memory"
+        self._seq = 0
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._queue_size = queue_size
+        self._subscribers: Set[_Subscriber] = set()
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._pre_images = True
+
+    # Ciclo de vida
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        """Elegir el origen de eventos y, si procede, abrir el change stream"""
+        source = settings.EVENTS_SOURCE
+        if source == "auto":
+            source = "change_stream" if await is_replicated(db) else "memory"
+
+        self.source = source
+        self._db = db
+        if source == "change_stream":
+            self._watch_task = asyncio.create_task(self._watch_loop())
+        print(f"📡 Eventos de cambios: origen {source}")
+
+    async def stop(self) -> None:
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    # Publicación
+
+    def publish(self, collection: str, operation: str, document: Optional[Dict[str, Any]]) -> None:
+        """Publicar un cambio hecho por este proceso (sólo con origen memory)"""
+        if self.source != "memory" or not document or collection not in WATCHED_COLLECTIONS:
+            return
+        self._seq += 1
+        self._dispatch(
+            self._build_event(f"{self.boot_id}-{self._seq}", collection, operation, document)
+        )
+
+    def publish_many(self, collection: str, operation: str, documents: List[Dict[str, Any]]) -> None:
+        for document in documents:
+            self.publish(collection, operation, document)
+
+    def _build_event(
+        self,
+        event_id: str,
+        collection: str,
+        operation: str,
+        document: Dict[str, Any],
+        timestamp: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        return {
+            "id": event_id,
+            "type": f"{WATCHED_COLLECTIONS[collection]}.{operation}",
+            "collection": collection,
+            "operation": operation,
+            "entity_id": document.get("_id"),
+            "project_id": document.get("project_id"),
+            "data": document,
+            "timestamp": timestamp or datetime.utcnow(),
+        }
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        self._buffer.append(event)
+        for subscriber in list(self._subscribers):
+            subscriber.put(event)
+
+    @staticmethod
+    def reset_event() -> Dict[str, Any]:
+        """Evento sin id que indica al cliente que debe recargar su estado"""
+        return {
+            "id": None,
+            "type": "reset",
+            "collection": None,
+            "operation": None,
+            "entity_id": None,
+            "project_id": None,
+            "data": None,
+            "timestamp": datetime.utcnow(),
+        }
+
+    # Change streams
+
+    def _watch(self, resume_after: Optional[Dict[str, Any]] = None, max_await_time_ms: Optional[int] = None):
+        options: Dict[str, Any] = {"full_document": "updateLookup"}
+        # La pre-imagen de los borrados requiere changeStreamPreAndPostImages
+        # en la colección; "whenAvailable" no falla si no está activado
+        if self._pre_images:
+            options["full_document_before_change"] = "whenAvailable"
+        return self._db.watch(
+            _CHANGE_PIPELINE,
+            resume_after=resume_after,
+            max_await_time_ms=max_await_time_ms,
+            **options
+        )
+
+    def _from_change(self, change: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        collection = change["ns"]["coll"]
+        operation = _CHANGE_OPERATIONS.get(change["operationType"])
+        if operation is None or collection not in WATCHED_COLLECTIONS:
+            return None
+
+        document = (
+            change.get("fullDocument")
+            or change.get("fullDocumentBeforeChange")
+            or change["documentKey"]
+        )
+        return self._build_event(
+            change["_id"]["_data"],
+            collection,
+            operation,
+            document,
+            change.get("wallTime")
+        )
+
+    def _handle_watch_error(self, error: OperationFailure) -> bool:
+        """Retorna True si el error se resolvió cambiando las opciones"""
+        if self._pre_images and error.code == _UNKNOWN_FIELD:
+            print("⚠️  Warning: El servidor no admite fullDocumentBeforeChange (MongoDB < 6.0)")
+            self._pre_images = False
+            return True
+        return False
+
+    async def _watch_loop(self) -> None:
+        """Leer el change stream y repartir los eventos, reanudando si se corta"""
+        resume_token = None
+        while True:
+            try:
+                async with self._watch(resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        event = self._from_change(change)
+                        if event:
+                            self._dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if self._handle_watch_error(e):
+                    continue
+                if e.code == _HISTORY_LOST:
+                    # Se perdieron eventos: los clientes conectados recargan
+                    resume_token = None
+                    for subscriber in list(self._subscribers):
+                        subscriber.overflowed = True
+                print(f"⚠️  Warning: Change stream interrumpido: {e}")
+                await asyncio.sleep(1)
+            except PyMongoError as e:
+                print(f"⚠️  Warning: Change stream interrumpido: {e}")
+                await asyncio.sleep(1)
+
+    async def _resumed_stream(
+        self,
+        token: str,
+        subscriber: _Subscriber,
+        heartbeat: float
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Change stream propio de un cliente, reanudado desde su resume token"""
+        while True:
+            try:
+                async with self._watch(
+                    resume_after={"_data": token},
+                    max_await_time_ms=int(heartbeat * 1000)
+                ) as stream:
+                    while stream.alive:
+                        change = await stream.try_next()
+                        if change is None:
+                            yield None
+                            continue
+                        event = self._from_change(change)
+                        if event and subscriber.matches(event):
+                            yield event
+                return
+            except OperationFailure as e:
+                if not self._handle_watch_error(e):
+                    raise
+
+    # Suscripción
+
+    def _replay(self, last_event_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Eventos del buffer posteriores a last_event_id (None si no está)"""
+        events = list(self._buffer)
+        for index, event in enumerate(events):
+            if event["id"] == last_event_id:
+                return events[index + 1:]
+        return None
+
+    async def subscribe(
+        self,
+        project_id: Optional[ObjectId] = None,
+        last_event_id: Optional[str] = None,
+        heartbeat: float = 15
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Eventos para un cliente, empezando por los perdidos desde
+        last_event_id. Produce None cada `heartbeat` segundos sin eventos
+        para que el endpoint pueda enviar un keep-alive.
+        """
+        subscriber = _Subscriber(project_id, self._queue_size)
+
+        if last_event_id and self.source == "change_stream" and self._replay(last_event_id) is None:
+            try:
+                async for event in self._resumed_stream(last_event_id, subscriber, heartbeat):
+                    yield event
+                return
+            except PyMongoError as e:
+                print(f"⚠️  Warning: No se pudo reanudar desde {last_event_id}: {e}")
+
+        # La copia del buffer y el registro ocurren sin ceder el control al
+        # event loop, así que no se pierden ni se duplican eventos
+        replay = self._replay(last_event_id) if last_event_id else []
+        self._subscribers.add(subscriber)
+        try:
+            if replay is None:
+                yield self.reset_event()
+            else:
+                for event in replay:
+                    if subscriber.matches(event):
+                        yield event
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if subscriber.overflowed:
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    subscriber.overflowed = False
+                    yield self.reset_event()
+                    continue
+
+                yield event
+        finally:
+            self._subscribers.discard(subscriber)
+
+
+# Instancia global usada por los CRUD y el endpoint SSE
+event_bus = EventBus(
+    buffer_size=settings.EVENTS_BUFFER_SIZE,
+    queue_size=settings.EVENTS_QUEUE_SIZE
+)
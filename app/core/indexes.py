@@ -0,0 +1,164 @@
+"""
+Registro de índices de MongoDB.
+
+Cada clase CRUD declara:
+- ``indexes``: lista de ``IndexModel`` que necesita su colección
+- ``query_shapes``: formas de consulta (filtro + orden) que ejecuta
+
+Al arrancar se reconcilian los índices declarados con los existentes y,
+en modo verificación, se ejecuta ``explain()`` sobre cada forma de consulta
+para detectar planes que terminan en COLLSCAN.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+# Opciones de índice que, si cambian, obligan a recrearlo
+_COMPARED_OPTIONS = (
+    "unique",
+    "sparse",
+    "partialFilterExpression",
+    "expireAfterSeconds",
+    "default_language",
+    "language_override",
+    "weights",
+)
+
+
+# Idioma de los índices de texto (stemming y stop words)
+TEXT_DEFAULT_LANGUAGE = "spanish"
+# Campo que podría fijar el idioma por documento. Se usa uno que no existe:
+# el campo por defecto ("language") lo tienen las transcripciones con
+# valores como "es-CO" que MongoDB rechaza al insertar
+TEXT_LANGUAGE_OVERRIDE = "search_language"
+
+
+def text_index(fields: List[str], weights: Optional[Dict[str, int]] = None) -> IndexModel:
+    """Índice de texto (uno por colección) con stemming en español"""
+    options: Dict[str, Any] = {
+        "default_language": TEXT_DEFAULT_LANGUAGE,
+        "language_override": TEXT_LANGUAGE_OVERRIDE,
+    }
+    if weights:
+        options["weights"] = weights
+    return IndexModel([(field, TEXT) for field in fields], name="text_search", **options)
+
+
+class QueryPlanError(Exception):
+    """Alguna consulta registrada no usa índice (COLLSCAN)"""
+
+
+def _normalize_key(key: Iterable) -> List[tuple]:
+    """Normaliza la especificación de claves para poder compararla"""
+    items = key.items() if hasattr(key, "items") else key
+    normalized = []
+    for field, direction in items:
+        if isinstance(direction, float):
+            direction = int(direction)
+        normalized.append((field, direction))
+    return normalized
+
+
+def _is_text_index(spec: Dict[str, Any]) -> bool:
+    return any(direction == "text" for _, direction in _normalize_key(spec["key"]))
+
+
+def _index_differs(current: Dict[str, Any], spec: Dict[str, Any]) -> bool:
+    """Indica si el índice existente no coincide con el declarado"""
+    # En los índices de texto MongoDB guarda las claves como _fts/_ftsx,
+    # así que la comparación se hace por pesos e idioma
+    if not _is_text_index(spec):
+        if _normalize_key(current["key"]) != _normalize_key(spec["key"]):
+            return True
+
+    for option in _COMPARED_OPTIONS:
+        # El servidor asigna valores por defecto a las opciones de texto
+        if option not in spec and option in ("weights", "default_language", "language_override"):
+            continue
+        default = False if option in ("unique", "sparse") else None
+        if current.get(option, default) != spec.get(option, default):
+            return True
+
+    return False
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase, cruds: Iterable[Any]) -> None:
+    """
+    Reconciliar los índices declarados por cada CRUD.
+
+    - Crea los índices que faltan
+    - Recrea los índices cuyo nombre existe pero con otra definición
+    - No elimina índices que no estén registrados (pueden ser manuales)
+    """
+    for crud in cruds:
+        collection = db[crud.collection_name]
+        declared = getattr(crud, "indexes", [])
+        if not declared:
+            continue
+
+        try:
+            existing = await collection.index_information()
+            to_create = []
+
+            for index in declared:
+                spec = index.document
+                current = existing.get(spec["name"])
+
+                if current is None:
+                    to_create.append(index)
+                elif _index_differs(current, spec):
+                    await collection.drop_index(spec["name"])
+                    to_create.append(index)
+
+            if to_create:
+                names = await collection.create_indexes(to_create)
+                print(f"🗂️  Índices creados en {crud.collection_name}: {', '.join(names)}")
+        except OperationFailure as e:
+            print(f"⚠️  Warning: No se pudieron reconciliar índices de {crud.collection_name}: {e}")
+
+
+def _find_stages(plan: Any, stage: str) -> bool:
+    """Busca recursivamente una etapa dentro de un plan de ejecución"""
+    if isinstance(plan, dict):
+        if plan.get("stage") == stage:
+            return True
+        return any(_find_stages(value, stage) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_find_stages(item, stage) for item in plan)
+    return False
+
+
+async def check_query_plans(db: AsyncIOMotorDatabase, cruds: Iterable[Any]) -> List[str]:
+    """
+    Ejecutar explain() sobre cada forma de consulta registrada.
+
+    Retorna la lista de consultas cuyo plan ganador contiene COLLSCAN.
+    """
+    problems = []
+
+    for crud in cruds:
+        for shape in getattr(crud, "query_shapes", []):
+            cursor = db[crud.collection_name].find(shape["filter"])
+            if shape.get("sort"):
+                cursor = cursor.sort(shape["sort"])
+
+            plan = await cursor.explain()
+            winning_plan = plan.get("queryPlanner", {}).get("winningPlan", {})
+
+            if _find_stages(winning_plan, "COLLSCAN"):
+                problems.append(
+                    f"{crud.collection_name}: filter={shape['filter']} sort={shape.get('sort')}"
+                )
+
+    return problems
+
+
+async def verify_query_plans(db: AsyncIOMotorDatabase, cruds: Iterable[Any]) -> None:
+    """Igual que check_query_plans pero lanza QueryPlanError si hay COLLSCAN"""
+    problems = await check_query_plans(db, cruds)
+    if problems:
+        raise QueryPlanError(
+            "Consultas sin índice (COLLSCAN):\n" + "\n".join(f"  - {p}" for p in problems)
+        )
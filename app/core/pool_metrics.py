@@ -0,0 +1,121 @@
+"""
+Métricas del pool de conexiones de MongoDB.
+
+PoolMetricsListener recibe los eventos CMAP de pymongo y mantiene
+conexiones en uso, conexiones abiertas, esperas en la cola y tiempos de
+checkout. Permite distinguir la latencia causada por falta de conexiones
+de la latencia propia de las consultas.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Any
+
+from pymongo import monitoring
+
+
+def _percentile(sorted_values: list, percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Listener CMAP que acumula métricas del pool de conexiones"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        # Los eventos de inicio y fin de checkout llegan en el mismo hilo
+        self._local = threading.local()
+        self._wait_times_ms = deque(maxlen=window)
+
+        self.open_connections = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_failures: Dict[str, int] = {}
+        self.pool_clears = 0
+
+    # Checkout
+    def connection_check_out_started(self, event):
+        self._local.started_at = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+
+    def _finish_wait(self) -> None:
+        started_at = getattr(self._local, "started_at", None)
+        self._local.started_at = None
+        with self._lock:
+            self.waiting = max(0, self.waiting - 1)
+            if started_at is not None:
+                self._wait_times_ms.append((time.perf_counter() - started_at) * 1000)
+
+    def connection_checked_out(self, event):
+        self._finish_wait()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def connection_check_out_failed(self, event):
+        self._finish_wait()
+        with self._lock:
+            reason = str(event.reason)
+            self.checkout_failures[reason] = self.checkout_failures.get(reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    # Ciclo de vida de conexiones
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(0, self.open_connections - 1)
+
+    # Ciclo de vida del pool
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado actual del pool y percentiles de espera en checkout"""
+        with self._lock:
+            waits = sorted(self._wait_times_ms)
+            return {
+                "open_connections": self.open_connections,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "pool_clears": self.pool_clears,
+                "checkout_wait_ms": {
+                    "samples": len(waits),
+                    "p50": round(_percentile(waits, 50), 3),
+                    "p95": round(_percentile(waits, 95), 3),
+                    "p99": round(_percentile(waits, 99), 3),
+                    "max": round(waits[-1], 3) if waits else 0.0,
+                },
+            }
+
+
+# Instancia global registrada en el cliente de MongoDB
+pool_metrics = PoolMetricsListener()
@@ -0,0 +1,247 @@
+"""
+Respuestas JSON con orjson y construcción rápida de respuestas de lectura.
+
+Por defecto FastAPI valida lo que devuelve el handler contra response_model,
+lo serializa con los field_serializer del schema y lo codifica con el módulo
+json. Para los documentos que vienen de MongoDB (datos de confianza) eso es
+trabajo repetido: fast_response da a los documentos la forma del schema (sus
+campos, alias y valores por defecto) sin construir modelos, y devuelve
+directamente una ORJSONResponse, que FastAPI no vuelve a validar.
+response_model se mantiene en el decorador para la documentación.
+
+La salida es la misma que con la validación: los campos escalares (str,
+int, float, bool, datetime) cuyo valor no es del tipo exacto se pasan por
+el validador de pydantic del campo (50.0 en un int sale como 50, 2 en un
+float como 2.0), y un campo obligatorio ausente o un valor no válido lanza
+ResponseValidationError (500), como haría FastAPI.
+
+Con RAW_BSON_READS, el listado de transcripciones (la respuesta más grande)
+pide RawBSONDocument a Motor y fast_response(raw=True) decodifica y codifica
+un documento cada vez: la página completa no llega a existir como dicts.
+"""
+import typing
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import bson
+import orjson
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from bson.raw_bson import RawBSONDocument
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import PydanticUndefined
+
+from app.core.config import settings
+
+
+def _default(value: Any) -> Any:
+    """Tipos que orjson no serializa de forma nativa (datetime sí lo es)"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+    raise TypeError(f"Tipo no serializable a JSON: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Codificar a JSON (bytes) con soporte de ObjectId y datetime"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse codificada con orjson (ObjectId como str, datetime ISO 8601)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Plan por schema: (alias, nombre, valor por defecto, factory del valor por
+# defecto, schema anidado, es lista, tipos exactos que no hace falta validar,
+# validador del campo)
+_Plan = List[Tuple[str, str, Any, Any, Optional[Type[BaseModel]], bool, Optional[tuple], Optional[TypeAdapter]]]
+_plans: Dict[Type[BaseModel], _Plan] = {}
+
+_SCALARS = (str, int, float, bool, datetime, type(None))
+_MISSING = object()
+
+
+def _nested_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """Schema anidado de un campo (Model, Optional[Model] o List[Model])"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    origin = typing.get_origin(annotation)
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if origin in (list, List) and args:
+        model, _ = _nested_model(args[0])
+        return model, model is not None
+    if origin is typing.Union and len(args) == 1:
+        return _nested_model(args[0])
+    return None, False
+
+
+def _scalar_types(annotation: Any) -> Optional[tuple]:
+    """Tipos exactos de un campo escalar (T u Optional[T]); None si no lo es"""
+    if typing.get_origin(annotation) is typing.Union:
+        types = typing.get_args(annotation)
+    else:
+        types = (annotation,)
+    return types if all(arg in _SCALARS for arg in types) else None
+
+
+def _plan(model: Type[BaseModel]) -> _Plan:
+    plan = _plans.get(model)
+    if plan is None:
+        plan = []
+        for name, field in model.model_fields.items():
+            nested, is_list = _nested_model(field.annotation)
+            types = _scalar_types(field.annotation)
+            adapter = TypeAdapter(field.annotation) if types else None
+            default = field.default
+            if types and default is not PydanticUndefined and type(default) not in types:
+                # pydantic serializa el valor por defecto con el tipo del campo
+                # (weight: float = 1 sale como 1.0)
+                try:
+                    default = adapter.validate_python(default)
+                except ValidationError:
+                    pass
+            plan.append((
+                field.alias or name, name, default, field.default_factory, nested, is_list, types, adapter
+            ))
+        _plans[model] = plan
+    return plan
+
+
+def _validate(adapter: TypeAdapter, key: str, value: Any) -> Any:
+    """Convertir un valor escalar como lo haría la validación de la respuesta"""
+    try:
+        return adapter.validate_python(value)
+    except ValidationError as e:
+        raise ResponseValidationError(
+            [{**error, "loc": ("response", key, *error["loc"])} for error in e.errors()]
+        )
+
+
+def _missing(model: Type[BaseModel], key: str) -> ResponseValidationError:
+    return ResponseValidationError(
+        [{"type": "missing", "loc": ("response", key), "msg": f"Field required ({model.__name__})", "input": None}]
+    )
+
+
+def shape(model: Type[BaseModel], data: Any) -> Dict[str, Any]:
+    """
+    Documento con la forma de salida del schema, sin construir modelos:
+    sólo los campos del schema (por alias), con su valor por defecto si
+    faltan, y los schemas anidados (p. ej. los items de PaginatedResponse)
+    igual. Los escalares de otro tipo pasan por el validador del campo.
+
+    Los field_serializer de los schemas sólo convierten ObjectId a str, que
+    ya hace el codificador de orjson; no hace falta ejecutarlos.
+    """
+    if isinstance(data, BaseModel):
+        data = data.__dict__
+
+    result: Dict[str, Any] = {}
+    for key, name, default, factory, nested, is_list, types, adapter in _plan(model):
+        value = data.get(key, _MISSING)
+        if value is _MISSING:
+            value = data.get(name, _MISSING)
+        if value is _MISSING:
+            if factory is not None:
+                value = factory()
+            elif default is PydanticUndefined:
+                raise _missing(model, key)
+            else:
+                value = default
+        elif types is not None and type(value) not in types:
+            value = _validate(adapter, key, value)
+        if nested is not None and value is not None:
+            value = [shape(nested, item) for item in value] if is_list else shape(nested, value)
+        result[key] = value
+    return result
+
+
+def _write(model: Type[BaseModel], data: Any, out: bytearray) -> None:
+    """
+    Añadir a out el JSON del schema. Cada RawBSONDocument se decodifica, se
+    codifica y se descarta por separado: sólo hay un documento decodificado
+    a la vez.
+    """
+    if isinstance(data, RawBSONDocument):
+        out += dumps(shape(model, bson.decode(data.raw)))
+        return
+    if isinstance(data, BaseModel):
+        data = data.__dict__
+
+    separator = b"{"
+    for key, name, default, factory, nested, is_list, types, adapter in _plan(model):
+        value = data.get(key, _MISSING)
+        if value is _MISSING:
+            value = data.get(name, _MISSING)
+        if value is _MISSING:
+            if factory is not None:
+                value = factory()
+            elif default is PydanticUndefined:
+                raise _missing(model, key)
+            else:
+                value = default
+        elif types is not None and type(value) not in types:
+            value = _validate(adapter, key, value)
+        out += separator + dumps(key) + b":"
+        separator = b","
+        if nested is None or value is None:
+            out += dumps(value)
+        elif is_list:
+            _write_list(nested, value, out)
+        else:
+            _write(nested, value, out)
+    out += b"}" if separator == b"," else b"{}"
+
+
+def _write_list(model: Type[BaseModel], items: Any, out: bytearray) -> None:
+    out += b"["
+    for index, item in enumerate(items):
+        if index:
+            out += b","
+        _write(model, item, out)
+    out += b"]"
+
+
+def raw_reads() -> bool:
+    """Si las lecturas deben pedir RawBSONDocument (sólo con la ruta rápida)"""
+    return settings.RAW_BSON_READS and settings.FAST_RESPONSES
+
+
+def fast_response(model: Any, content: Any, status_code: int = 200, raw: bool = False) -> Any:
+    """
+    Respuesta para documentos de MongoDB sin la validación de response_model.
+
+    model es el mismo schema del decorador (p. ej.
+    PaginatedResponse[RequirementPartialResponse] o list[RequirementResponse]).
+    Con FAST_RESPONSES=false se devuelve el contenido tal cual y FastAPI lo
+    valida como siempre. raw=True cuando los documentos son RawBSONDocument
+    (ver raw_reads).
+    """
+    if not settings.FAST_RESPONSES:
+        return content
+
+    item_model, is_list = _nested_model(model)
+    if item_model is None:
+        raise TypeError(f"fast_response necesita un schema de pydantic, no {model!r}")
+
+    if raw:
+        out = bytearray()
+        if is_list:
+            _write_list(item_model, content, out)
+        else:
+            _write(item_model, content, out)
+        return Response(bytes(out), status_code=status_code, media_type="application/json")
+
+    body = [shape(item_model, item) for item in content] if is_list else shape(item_model, content)
+    return ORJSONResponse(body, status_code=status_code)
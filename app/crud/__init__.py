@@ -1,3 +1,38 @@
 from .meeting import meeting_crud
+from .transcription import transcription_crud
+from .project_phase import project_phase_crud
+from .requirement import requirement_crud
+from .phase_comment import phase_comment_crud
+from .project_summary import project_summary_crud
+from .search import search_crud
+from .ai_cache import ai_analysis_cache_crud
+from .job import job_crud
+from .webhook import webhook_subscription_crud, webhook_dead_letter_crud
 
-__all__ = ["meeting_crud"]
+# CRUDs cuyos índices y formas de consulta se registran al arrancar
+CRUD_REGISTRY = [
+    meeting_crud,
+    transcription_crud,
+    project_phase_crud,
+    requirement_crud,
+    phase_comment_crud,
+    webhook_subscription_crud,
+    webhook_dead_letter_crud,
+    ai_analysis_cache_crud,
+    job_crud,
+]
+
+__all__ = [
+    "meeting_crud",
+    "transcription_crud",
+    "project_phase_crud",
+    "requirement_crud",
+    "phase_comment_crud",
+    "webhook_subscription_crud",
+    "webhook_dead_letter_crud",
+    "project_summary_crud",
+    "search_crud",
+    "ai_analysis_cache_crud",
+    "job_crud",
+    "CRUD_REGISTRY",
+]
@@ -0,0 +1,110 @@
+"""CRUD operations for the AI analysis cache"""
+from typing import Optional
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+
+
+class AIAnalysisCacheCRUD:
+    """
+    Caché de análisis de IA direccionada por contenido.
+    
+    El _id es el hash de (texto normalizado, contexto, modelo, versión del
+    prompt). Las entradas caducan por TTL (expires_at) y, si se supera el
+    máximo de entradas, se eliminan las menos usadas recientemente.
+    """
+    
+    indexes = [
+        # MongoDB elimina las entradas cuando expires_at queda en el pasado
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+        IndexModel([("last_used_at", ASCENDING)], name="last_used"),
+    ]
+    
+    def __init__(self):
+        self.collection_name = "ai_analysis_cache"
+    
+    async def get(
+        self,
+        db: AsyncIOMotorDatabase,
+        key: str
+    ) -> Optional[dict]:
+        """
+        Obtener una entrada vigente y registrar el uso (hits, last_used_at).
+        El monitor TTL pasa cada minuto, así que también se filtra por fecha.
+        """
+        now = datetime.utcnow()
+        return await db[self.collection_name].find_one_and_update(
+            {"_id": key, "expires_at": {"$gt": now}},
+            {"$inc": {"hits": 1}, "$set": {"last_used_at": now}},
+            projection={"result": 1, "model": 1, "prompt_version": 1},
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def touch(
+        self,
+        db: AsyncIOMotorDatabase,
+        key: str
+    ) -> None:
+        """
+        Registrar un uso servido desde Redis (sin leer el resultado), para
+        que la expulsión por last_used_at no elimine las entradas más usadas.
+        """
+        await db[self.collection_name].update_one(
+            {"_id": key},
+            {"$inc": {"hits": 1}, "$set": {"last_used_at": datetime.utcnow()}}
+        )
+    
+    async def set(
+        self,
+        db: AsyncIOMotorDatabase,
+        key: str,
+        result: dict,
+        model: str,
+        prompt_version: str,
+        ttl_seconds: int
+    ) -> None:
+        """Guardar (o reemplazar) el análisis de una clave"""
+        now = datetime.utcnow()
+        await db[self.collection_name].replace_one(
+            {"_id": key},
+            {
+                "result": result,
+                "model": model,
+                "prompt_version": prompt_version,
+                "hits": 0,
+                "created_at": now,
+                "last_used_at": now,
+                "expires_at": now + timedelta(seconds=ttl_seconds)
+            },
+            upsert=True
+        )
+    
+    async def evict_overflow(
+        self,
+        db: AsyncIOMotorDatabase,
+        max_entries: int
+    ) -> int:
+        """
+        Eliminar las entradas menos usadas por encima de max_entries.
+        Retorna el número de entradas eliminadas.
+        """
+        collection = db[self.collection_name]
+        overflow = await collection.estimated_document_count() - max_entries
+        if overflow <= 0:
+            return 0
+        
+        cursor = collection.find({}, {"_id": 1}).sort("last_used_at", ASCENDING).limit(overflow)
+        keys = [doc["_id"] for doc in await cursor.to_list(length=overflow)]
+        if not keys:
+            return 0
+        
+        result = await collection.delete_many({"_id": {"$in": keys}})
+        return result.deleted_count
+    
+    async def clear(self, db: AsyncIOMotorDatabase) -> int:
+        """Vaciar la caché. Retorna el número de entradas eliminadas"""
+        result = await db[self.collection_name].delete_many({})
+        return result.deleted_count
+
+
+ai_analysis_cache_crud = AIAnalysisCacheCRUD()
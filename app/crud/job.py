@@ -0,0 +1,257 @@
+"""CRUD operations for background jobs (cola respaldada en MongoDB)"""
+from typing import Optional, Any
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+
+
+class JobCRUD:
+    """
+    Cola de trabajos en la colección jobs.
+
+    Estados: queued -> running -> completed | failed (o de nuevo queued si
+    quedan intentos). Un worker toma un trabajo con find_one_and_update, de
+    modo que dos workers nunca obtienen el mismo. Mientras corre, el worker
+    renueva locked_until; si muere, el trabajo vuelve a poder tomarse al
+    vencer ese plazo, salvo que ya haya agotado max_attempts: entonces
+    queda como failed (fail_expired).
+
+    dedupe_key evita encolar dos veces lo mismo: un índice único parcial
+    sobre los trabajos activos (active=True) hace que el segundo encolado
+    devuelva el trabajo ya existente.
+    """
+
+    indexes = [
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING), ("_id", ASCENDING)], name="status_run_at"),
+        IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)], name="status_locked_until"),
+        IndexModel(
+            [("dedupe_key", ASCENDING)],
+            name="active_dedupe_key",
+            unique=True,
+            partialFilterExpression={"active": True}
+        ),
+        # Los trabajos terminados se eliminan pasado JOBS_RETENTION_SECONDS
+        IndexModel(
+            [("finished_at", ASCENDING)],
+            name="finished_ttl",
+            expireAfterSeconds=settings.JOBS_RETENTION_SECONDS
+        ),
+    ]
+
+    query_shapes = [
+        {"filter": {"status": "queued", "run_at": {"$lte": datetime.utcnow()}}, "sort": [("run_at", ASCENDING), ("_id", ASCENDING)]},
+        {"filter": {"status": "running", "locked_until": {"$lt": datetime.utcnow()}}},
+    ]
+
+    def __init__(self):
+        self.collection_name = "jobs"
+
+    async def enqueue(
+        self,
+        db: AsyncIOMotorDatabase,
+        job_type: str,
+        payload: dict,
+        dedupe_key: Optional[str] = None,
+        max_attempts: Optional[int] = None
+    ) -> dict:
+        """
+        Encolar un trabajo. Si ya hay uno activo con el mismo dedupe_key
+        se devuelve ese en lugar de crear otro.
+        """
+        now = datetime.utcnow()
+        job = {
+            "type": job_type,
+            "payload": payload,
+            "status": "queued",
+            "active": True,
+            "attempts": 0,
+            "max_attempts": max_attempts or settings.JOBS_MAX_ATTEMPTS,
+            "run_at": now,
+            "locked_until": None,
+            "worker_id": None,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        if dedupe_key:
+            job["dedupe_key"] = dedupe_key
+
+        try:
+            result = await db[self.collection_name].insert_one(job)
+        except DuplicateKeyError:
+            existing = await db[self.collection_name].find_one({"dedupe_key": dedupe_key, "active": True})
+            if existing:
+                return existing
+            # El activo terminó entre el insert y la búsqueda: reintentar
+            job.pop("_id", None)
+            result = await db[self.collection_name].insert_one(job)
+
+        job["_id"] = result.inserted_id
+        return job
+
+    async def get(
+        self,
+        db: AsyncIOMotorDatabase,
+        job_id: str
+    ) -> Optional[dict]:
+        """Obtener trabajo por ID"""
+        if not ObjectId.is_valid(job_id):
+            return None
+
+        return await db[self.collection_name].find_one({"_id": ObjectId(job_id)})
+
+    async def claim(
+        self,
+        db: AsyncIOMotorDatabase,
+        worker_id: str,
+        lease_seconds: float
+    ) -> Optional[dict]:
+        """
+        Tomar atómicamente el siguiente trabajo disponible: uno en cola cuyo
+        run_at ya pasó o uno en curso cuyo worker dejó vencer el plazo y al
+        que aún le quedan intentos.
+        """
+        now = datetime.utcnow()
+        return await db[self.collection_name].find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_at": {"$lte": now}},
+                {
+                    "status": "running",
+                    "locked_until": {"$lt": now},
+                    "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+                },
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": worker_id,
+                    "locked_until": now + timedelta(seconds=lease_seconds),
+                    "started_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", ASCENDING), ("_id", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def fail_expired(self, db: AsyncIOMotorDatabase) -> int:
+        """
+        Marcar como failed los trabajos cuyo plazo venció sin intentos
+        restantes (su worker murió o se colgó en el último intento).
+        Retorna el número de trabajos marcados.
+        """
+        now = datetime.utcnow()
+        result = await db[self.collection_name].update_many(
+            {
+                "status": "running",
+                "locked_until": {"$lt": now},
+                "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+            },
+            {
+                "$set": {
+                    "status": "failed",
+                    "error": "Plazo vencido sin intentos restantes",
+                    "locked_until": None,
+                    "finished_at": now,
+                    "updated_at": now,
+                },
+                "$unset": {"active": ""},
+            }
+        )
+        return result.modified_count
+
+    async def extend_lease(
+        self,
+        db: AsyncIOMotorDatabase,
+        job_id: ObjectId,
+        worker_id: str,
+        lease_seconds: float
+    ) -> bool:
+        """Renovar el plazo del trabajo. False si otro worker lo tomó"""
+        now = datetime.utcnow()
+        result = await db[self.collection_name].update_one(
+            {"_id": job_id, "status": "running", "worker_id": worker_id},
+            {"$set": {"locked_until": now + timedelta(seconds=lease_seconds), "updated_at": now}}
+        )
+        return result.matched_count == 1
+
+    async def complete(
+        self,
+        db: AsyncIOMotorDatabase,
+        job_id: ObjectId,
+        worker_id: str,
+        result: Any = None
+    ) -> Optional[dict]:
+        """Marcar el trabajo como completado"""
+        now = datetime.utcnow()
+        return await db[self.collection_name].find_one_and_update(
+            {"_id": job_id, "worker_id": worker_id},
+            {
+                "$set": {
+                    "status": "completed",
+                    "result": result,
+                    "error": None,
+                    "locked_until": None,
+                    "finished_at": now,
+                    "updated_at": now,
+                },
+                "$unset": {"active": ""},
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def fail(
+        self,
+        db: AsyncIOMotorDatabase,
+        job: dict,
+        worker_id: str,
+        error: str,
+        retry_delay: Optional[float] = None
+    ) -> Optional[dict]:
+        """
+        Registrar un fallo. Con retry_delay el trabajo vuelve a la cola
+        para ejecutarse pasado ese tiempo; sin él queda como failed.
+        """
+        now = datetime.utcnow()
+        if retry_delay is not None:
+            update = {"$set": {
+                "status": "queued",
+                "error": error,
+                "run_at": now + timedelta(seconds=retry_delay),
+                "locked_until": None,
+                "worker_id": None,
+                "updated_at": now,
+            }}
+        else:
+            update = {
+                "$set": {
+                    "status": "failed",
+                    "error": error,
+                    "locked_until": None,
+                    "finished_at": now,
+                    "updated_at": now,
+                },
+                "$unset": {"active": ""},
+            }
+        return await db[self.collection_name].find_one_and_update(
+            {"_id": job["_id"], "worker_id": worker_id},
+            update,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def count_by_status(self, db: AsyncIOMotorDatabase) -> dict:
+        """Número de trabajos por estado"""
+        cursor = db[self.collection_name].aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ])
+        return {doc["_id"]: doc["count"] async for doc in cursor}
+
+
+job_crud = JobCRUD()
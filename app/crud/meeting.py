@@ -1,48 +1,124 @@
 from typing import Optional, List
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
 from datetime import datetime
 
 from app.schemas.meeting import MeetingCreate, MeetingUpdate
+from app.crud.pagination import Page, keyset_filter, paginate, sort_spec
+from app.core.events import event_bus
 
 
 class MeetingCRUD:
+    indexes = [
+        IndexModel(
+            [("project_id", ASCENDING), ("status", ASCENDING), ("scheduled_at", DESCENDING), ("_id", DESCENDING)],
+            name="project_status_scheduled"
+        ),
+        IndexModel(
+            [("project_id", ASCENDING), ("scheduled_at", DESCENDING), ("_id", DESCENDING)],
+            name="project_scheduled"
+        ),
+        IndexModel([("scheduled_at", DESCENDING), ("_id", DESCENDING)], name="scheduled"),
+        IndexModel(
+            [("jitsi_room_name", ASCENDING)],
+            name="jitsi_room_name_unique",
+            unique=True,
+            partialFilterExpression={"jitsi_room_name": {"$gt": ""}}
+        ),
+    ]
+    
+    query_shapes = [
+        {"filter": {}, "sort": sort_spec("scheduled_at", DESCENDING)},
+        {"filter": {"project_id": ObjectId()}, "sort": sort_spec("scheduled_at", DESCENDING)},
+        {"filter": {"project_id": ObjectId(), "status": "scheduled"}, "sort": sort_spec("scheduled_at", DESCENDING)},
+        {"filter": {"jitsi_room_name": "room"}},
+    ]
+    
+    sort_field = "scheduled_at"
+    sort_direction = DESCENDING
+    
     def __init__(self):
         self.collection_name = "meetings"
     
-    async def get(self, db: AsyncIOMotorDatabase, meeting_id: str) -> Optional[dict]:
+    async def get(
+        self,
+        db: AsyncIOMotorDatabase,
+        meeting_id: str,
+        projection: Optional[dict] = None
+    ) -> Optional[dict]:
         if not ObjectId.is_valid(meeting_id):
             return None
         
-        meeting_data = await db[self.collection_name].find_one({"_id": ObjectId(meeting_id)})
+        meeting_data = await db[self.collection_name].find_one({"_id": ObjectId(meeting_id)}, projection)
         return meeting_data
     
+    def _build_query(self, project_id: Optional[str] = None, status: Optional[str] = None) -> dict:
+        query = {}
+        if project_id and ObjectId.is_valid(project_id):
+            query["project_id"] = ObjectId(project_id)
+        if status:
+            query["status"] = status
+        return query
+    
     async def get_multi(
         self, 
         db: AsyncIOMotorDatabase, 
         skip: int = 0, 
         limit: int = 100,
         project_id: Optional[str] = None,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        after: Optional[dict] = None,
+        projection: Optional[dict] = None
     ) -> List[dict]:
-        query = {}
-        if project_id and ObjectId.is_valid(project_id):
-            query["project_id"] = ObjectId(project_id)
-        if status:
-            query["status"] = status
+        query = self._build_query(project_id=project_id, status=status)
         
-        cursor = db[self.collection_name].find(query).sort("scheduled_at", -1).skip(skip).limit(limit)
+        # Con cursor se continúa desde la última posición en vez de usar skip
+        if after:
+            query.update(keyset_filter(self.sort_field, self.sort_direction, after))
+            skip = 0
+        
+        cursor = db[self.collection_name].find(query, projection).sort(
+            sort_spec(self.sort_field, self.sort_direction)
+        ).skip(skip).limit(limit)
         meetings = []
         async for meeting_data in cursor:
             meetings.append(meeting_data)
         return meetings
     
-    async def count(self, db: AsyncIOMotorDatabase, project_id: Optional[str] = None) -> int:
-        query = {}
-        if project_id and ObjectId.is_valid(project_id):
-            query["project_id"] = ObjectId(project_id)
+    async def count(
+        self,
+        db: AsyncIOMotorDatabase,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> int:
+        query = self._build_query(project_id=project_id, status=status)
         return await db[self.collection_name].count_documents(query)
     
+    async def get_page(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 100,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None,
+        after: Optional[dict] = None,
+        total_mode: str = "exact",
+        projection: Optional[dict] = None
+    ) -> Page:
+        """Página de resultados con el mismo filtro para items y total"""
+        return await paginate(
+            db[self.collection_name],
+            self._build_query(project_id=project_id, status=status),
+            self.sort_field,
+            self.sort_direction,
+            skip=skip,
+            limit=limit,
+            after=after,
+            total_mode=total_mode,
+            projection=projection
+        )
+    
     async def create(self, db: AsyncIOMotorDatabase, meeting_in: MeetingCreate) -> dict:
         from datetime import datetime
         
@@ -64,6 +140,7 @@ class MeetingCRUD:
         
         result = await db[self.collection_name].insert_one(meeting_dict)
         created_meeting = await db[self.collection_name].find_one({"_id": result.inserted_id})
+        event_bus.publish(self.collection_name, "created", created_meeting)
         return created_meeting
     
     async def update(
@@ -93,22 +170,24 @@ class MeetingCRUD:
         # Actualizar timestamp
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await db[self.collection_name].update_one(
+        updated = await db[self.collection_name].find_one_and_update(
             {"_id": ObjectId(meeting_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count == 0:
-            return None
-        
-        return await self.get(db, meeting_id)
+        event_bus.publish(self.collection_name, "updated", updated)
+        return updated
     
     async def delete(self, db: AsyncIOMotorDatabase, meeting_id: str) -> bool:
         if not ObjectId.is_valid(meeting_id):
             return False
         
-        result = await db[self.collection_name].delete_one({"_id": ObjectId(meeting_id)})
-        return result.deleted_count > 0
+        deleted = await db[self.collection_name].find_one_and_delete(
+            {"_id": ObjectId(meeting_id)},
+            projection={"project_id": 1}
+        )
+        event_bus.publish(self.collection_name, "deleted", deleted)
+        return deleted is not None
     
     async def get_by_jitsi_room(self, db: AsyncIOMotorDatabase, jitsi_room_name: str) -> Optional[dict]:
         meeting_data = await db[self.collection_name].find_one({"jitsi_room_name": jitsi_room_name})
@@ -118,12 +197,13 @@ class MeetingCRUD:
         if not ObjectId.is_valid(meeting_id):
             return None
         
-        await db[self.collection_name].update_one(
+        updated = await db[self.collection_name].find_one_and_update(
             {"_id": ObjectId(meeting_id)},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
         )
-        
-        return await self.get(db, meeting_id)
+        event_bus.publish(self.collection_name, "updated", updated)
+        return updated
 
 
 meeting_crud = MeetingCRUD()
@@ -0,0 +1,201 @@
+"""
+Paginación por cursor (keyset) para los listados.
+
+El cursor es opaco para el cliente: codifica el valor del campo de orden y
+el _id del último documento de la página. La siguiente página se obtiene
+con un filtro de rango sobre (campo, _id), que el índice resuelve sin
+recorrer los documentos anteriores, a diferencia de skip().
+"""
+import asyncio
+import base64
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from bson import json_util
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.config import settings
+
+
+def encode_cursor(document: Dict[str, Any], sort_field: str) -> str:
+    """Codificar la posición de un documento como cursor opaco"""
+    payload = json_util.dumps({"v": document.get(sort_field), "id": document["_id"]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decodificar un cursor. Lanza ValueError si no es válido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError(f"Cursor inválido: {e}")
+
+    if not isinstance(payload, dict) or "v" not in payload or "id" not in payload:
+        raise ValueError("Cursor inválido")
+
+    return payload
+
+
+def sort_spec(sort_field: str, direction: int) -> List[tuple]:
+    """Orden estable: campo de orden con _id como desempate"""
+    return [(sort_field, direction), ("_id", direction)]
+
+
+def keyset_filter(sort_field: str, direction: int, cursor: Dict[str, Any]) -> Dict[str, Any]:
+    """Filtro que selecciona los documentos posteriores al cursor"""
+    op = "$lt" if direction < 0 else "$gt"
+    return {
+        "$or": [
+            {sort_field: {op: cursor["v"]}},
+            {sort_field: cursor["v"], "_id": {op: cursor["id"]}},
+        ]
+    }
+
+
+class Page(NamedTuple):
+    """Resultado de una consulta paginada"""
+    items: List[Dict[str, Any]]
+    total: Optional[int]
+    has_more: bool
+    next_cursor: Optional[str]
+
+
+class _CountCache:
+    """Caché en memoria de conteos por filtro con TTL corto"""
+
+    def __init__(self, max_entries: int = 10000):
+        self._entries: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._max_entries = max_entries
+
+    def get(self, key: str) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: int, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+_count_cache = _CountCache()
+
+
+async def _estimated_total(collection: AsyncIOMotorCollection, query: Dict[str, Any]) -> int:
+    """Total aproximado: metadatos de la colección o conteo cacheado por filtro"""
+    if not query:
+        return await collection.estimated_document_count()
+
+    key = f"{collection.name}:{json_util.dumps(query, sort_keys=True)}"
+    cached = _count_cache.get(key)
+    if cached is not None:
+        return cached
+
+    total = await collection.count_documents(query)
+    _count_cache.set(key, total, settings.COUNT_CACHE_TTL_SECONDS)
+    return total
+
+
+def _build_page(
+    items: List[Dict[str, Any]],
+    total: Optional[int],
+    limit: int,
+    sort_field: str
+) -> Page:
+    """Recortar el elemento extra (limit + 1) y calcular el siguiente cursor"""
+    has_more = len(items) > limit
+    items = items[:limit]
+    cursor = encode_cursor(items[-1], sort_field) if has_more and items else None
+    return Page(items=items, total=total, has_more=has_more, next_cursor=cursor)
+
+
+async def paginate(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    sort_field: str,
+    sort_direction: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Dict[str, Any]] = None,
+    total_mode: str = "exact",
+    projection: Optional[Dict[str, int]] = None
+) -> Page:
+    """
+    Obtener una página de resultados.
+
+    total_mode:
+    - exact: página y total exacto en un solo viaje con $facet sobre el
+      mismo $match (el $match y el $sort iniciales usan índice). Con
+      cursor (after) la página se pide con find() sobre el índice y el
+      total con count_documents en paralelo: dentro del $facet el filtro
+      del cursor no usa índice y recorrería todos los documentos del filtro
+    - estimated: página con find() y total aproximado (metadatos de la
+      colección si no hay filtro, conteo cacheado con TTL si lo hay)
+    - none: sólo la página; has_more se calcula pidiendo limit + 1
+
+    En todos los modos se pide un elemento extra para saber si hay más.
+    La proyección (si existe) se aplica en el servidor antes de devolver
+    los documentos; el campo de orden se conserva siempre (aunque se pida
+    excluirlo) para generar el cursor.
+    """
+    if projection and any(projection.values()):
+        projection = {**projection, sort_field: 1}
+    elif projection and sort_field in projection:
+        # Una exclusión del campo de orden dejaría el cursor sin valor
+        projection = {name: 0 for name in projection if name != sort_field} or None
+
+    if total_mode == "exact" and not after:
+        page_pipeline: List[Dict[str, Any]] = []
+        if skip:
+            page_pipeline.append({"$skip": skip})
+        page_pipeline.append({"$limit": limit + 1})
+
+        pipeline = [
+            {"$match": query},
+            {"$sort": dict(sort_spec(sort_field, sort_direction))},
+        ]
+        if projection:
+            pipeline.append({"$project": projection})
+        pipeline.append(
+            {"$facet": {
+                "items": page_pipeline,
+                "total": [{"$count": "count"}],
+            }}
+        )
+
+        result = await collection.aggregate(pipeline).to_list(length=1)
+        facet = result[0] if result else {"items": [], "total": []}
+        total = facet["total"][0]["count"] if facet["total"] else 0
+        return _build_page(facet["items"], total, limit, sort_field)
+
+    page_query = dict(query)
+    if after:
+        page_query.update(keyset_filter(sort_field, sort_direction, after))
+        skip = 0
+
+    cursor = collection.find(page_query, projection).sort(sort_spec(sort_field, sort_direction))
+    cursor = cursor.skip(skip).limit(limit + 1)
+
+    if total_mode == "exact":
+        items, total = await asyncio.gather(
+            cursor.to_list(length=limit + 1),
+            collection.count_documents(query)
+        )
+    elif total_mode == "estimated":
+        items, total = await asyncio.gather(
+            cursor.to_list(length=limit + 1),
+            _estimated_total(collection, query)
+        )
+    else:
+        items, total = await cursor.to_list(length=limit + 1), None
+
+    return _build_page(items, total, limit, sort_field)
@@ -1,14 +1,38 @@
 """CRUD operations for PhaseComment"""
 from typing import Optional, List
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorCursor, AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
 from app.schemas.phase_comment import PhaseCommentCreate, PhaseCommentUpdate
+from app.core.indexes import text_index
+from app.crud.pagination import Page, keyset_filter, paginate, sort_spec
+from app.core.events import event_bus
 
 
 class PhaseCommentCRUD:
     """CRUD para gestionar comentarios en fases"""
     
+    indexes = [
+        IndexModel([("phase_id", ASCENDING), ("created_at", ASCENDING)], name="phase_created"),
+        IndexModel(
+            [("project_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="project_created"
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created"),
+        text_index(["comment"]),
+    ]
+    
+    query_shapes = [
+        {"filter": {}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"phase_id": ObjectId()}, "sort": [("created_at", ASCENDING)]},
+        {"filter": {"project_id": ObjectId()}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"$text": {"$search": "requerimiento"}}},
+    ]
+    
+    sort_field = "created_at"
+    sort_direction = DESCENDING
+    
     def __init__(self):
         self.collection_name = "phase_comments"
     
@@ -34,29 +58,28 @@ class PhaseCommentCRUD:
         
         result = await db[self.collection_name].insert_one(comment_dict)
         created = await db[self.collection_name].find_one({"_id": result.inserted_id})
+        event_bus.publish(self.collection_name, "created", created)
         return created
     
     async def get(
         self,
         db: AsyncIOMotorDatabase,
-        comment_id: str
+        comment_id: str,
+        projection: Optional[dict] = None
     ) -> Optional[dict]:
         """Obtener comentario por ID"""
         if not ObjectId.is_valid(comment_id):
             return None
         
-        return await db[self.collection_name].find_one({"_id": ObjectId(comment_id)})
+        return await db[self.collection_name].find_one({"_id": ObjectId(comment_id)}, projection)
     
-    async def get_multi(
+    def _build_query(
         self,
-        db: AsyncIOMotorDatabase,
-        skip: int = 0,
-        limit: int = 100,
         phase_id: Optional[str] = None,
         project_id: Optional[str] = None,
         user_email: Optional[str] = None
-    ) -> List[dict]:
-        """Listar comentarios con filtros"""
+    ) -> dict:
+        """Filtro común para listar y contar"""
         query = {}
         
         if phase_id and ObjectId.is_valid(phase_id):
@@ -68,7 +91,30 @@ class PhaseCommentCRUD:
         if user_email:
             query["user_email"] = user_email
         
-        cursor = db[self.collection_name].find(query).skip(skip).limit(limit).sort("created_at", -1)
+        return query
+    
+    async def get_multi(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 100,
+        phase_id: Optional[str] = None,
+        project_id: Optional[str] = None,
+        user_email: Optional[str] = None,
+        after: Optional[dict] = None,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        """Listar comentarios con filtros"""
+        query = self._build_query(phase_id=phase_id, project_id=project_id, user_email=user_email)
+        
+        # Con cursor se continúa desde la última posición en vez de usar skip
+        if after:
+            query.update(keyset_filter(self.sort_field, self.sort_direction, after))
+            skip = 0
+        
+        cursor = db[self.collection_name].find(query, projection).sort(
+            sort_spec(self.sort_field, self.sort_direction)
+        ).skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
     
     async def get_by_phase(
@@ -90,19 +136,51 @@ class PhaseCommentCRUD:
         self,
         db: AsyncIOMotorDatabase,
         phase_id: Optional[str] = None,
-        project_id: Optional[str] = None
+        project_id: Optional[str] = None,
+        user_email: Optional[str] = None
     ) -> int:
         """Contar comentarios"""
-        query = {}
-        
-        if phase_id and ObjectId.is_valid(phase_id):
-            query["phase_id"] = ObjectId(phase_id)
-        
-        if project_id and ObjectId.is_valid(project_id):
-            query["project_id"] = ObjectId(project_id)
-        
+        query = self._build_query(phase_id=phase_id, project_id=project_id, user_email=user_email)
         return await db[self.collection_name].count_documents(query)
     
+    async def get_page(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 100,
+        phase_id: Optional[str] = None,
+        project_id: Optional[str] = None,
+        user_email: Optional[str] = None,
+        after: Optional[dict] = None,
+        total_mode: str = "exact",
+        projection: Optional[dict] = None
+    ) -> Page:
+        """Página de resultados con el mismo filtro para items y total"""
+        return await paginate(
+            db[self.collection_name],
+            self._build_query(phase_id=phase_id, project_id=project_id, user_email=user_email),
+            self.sort_field,
+            self.sort_direction,
+            skip=skip,
+            limit=limit,
+            after=after,
+            total_mode=total_mode,
+            projection=projection
+        )
+    
+    def export_cursor(
+        self,
+        db: AsyncIOMotorDatabase,
+        projection: Optional[dict] = None,
+        batch_size: int = 1000,
+        **filters
+    ) -> AsyncIOMotorCursor:
+        """Cursor sin límite para exportar, leído del servidor por lotes"""
+        query = self._build_query(**filters)
+        return db[self.collection_name].find(query, projection).sort(
+            sort_spec(self.sort_field, self.sort_direction)
+        ).batch_size(batch_size)
+    
     async def update(
         self,
         db: AsyncIOMotorDatabase,
@@ -120,15 +198,13 @@ class PhaseCommentCRUD:
         # Actualizar timestamp
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await db[self.collection_name].update_one(
+        updated = await db[self.collection_name].find_one_and_update(
             {"_id": ObjectId(comment_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count == 0:
-            return None
-        
-        return await self.get(db, comment_id)
+        event_bus.publish(self.collection_name, "updated", updated)
+        return updated
     
     async def delete(
         self,
@@ -139,8 +215,12 @@ class PhaseCommentCRUD:
         if not ObjectId.is_valid(comment_id):
             return False
         
-        result = await db[self.collection_name].delete_one({"_id": ObjectId(comment_id)})
-        return result.deleted_count > 0
+        deleted = await db[self.collection_name].find_one_and_delete(
+            {"_id": ObjectId(comment_id)},
+            projection={"project_id": 1}
+        )
+        event_bus.publish(self.collection_name, "deleted", deleted)
+        return deleted is not None
 
 
 phase_comment_crud = PhaseCommentCRUD()
@@ -3,12 +3,53 @@ from typing import Optional, List
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
 from app.schemas.project_phase import ProjectPhaseCreate, ProjectPhaseUpdate
+from app.crud.pagination import Page, keyset_filter, paginate, sort_spec
+from app.core.events import event_bus
+from app.crud.project_summary import project_summary_crud
+from app.services.webhooks import webhook_dispatcher
+from app.core.database import run_in_transaction
+
+# Campos de la fase que influyen en la completitud y la fase actual del proyecto
+_ROLLUP_FIELDS = {"status", "completion_percentage", "weight", "order"}
+
+
+def _first_phase_id(condition: dict) -> dict:
+    """_id de la primera fase (en orden) de $phases que cumple la condición"""
+    return {"$arrayElemAt": [
+        {"$map": {
+            "input": {"$filter": {"input": "$phases", "cond": condition}},
+            "in": "$$this._id"
+        }},
+        0
+    ]}
 
 
 class ProjectPhaseCRUD:
     """CRUD para gestionar fases de proyectos"""
     
+    indexes = [
+        IndexModel(
+            [("project_id", ASCENDING), ("order", ASCENDING), ("_id", ASCENDING)],
+            name="project_order"
+        ),
+        IndexModel(
+            [("project_id", ASCENDING), ("status", ASCENDING), ("order", ASCENDING), ("_id", ASCENDING)],
+            name="project_status_order"
+        ),
+        IndexModel([("order", ASCENDING), ("_id", ASCENDING)], name="order"),
+    ]
+    
+    query_shapes = [
+        {"filter": {}, "sort": sort_spec("order", ASCENDING)},
+        {"filter": {"project_id": ObjectId()}, "sort": sort_spec("order", ASCENDING)},
+        {"filter": {"project_id": ObjectId(), "status": "pending"}, "sort": sort_spec("order", ASCENDING)},
+    ]
+    
+    sort_field = "order"
+    sort_direction = ASCENDING
+    
     def __init__(self):
         self.collection_name = "project_phases"
     
@@ -32,28 +73,35 @@ class ProjectPhaseCRUD:
         
         result = await db[self.collection_name].insert_one(phase_dict)
         created = await db[self.collection_name].find_one({"_id": result.inserted_id})
+        await project_summary_crud.apply(
+            db,
+            created.get("project_id"),
+            project_summary_crud.phase_delta(created)
+        )
+        created["project_completion_percentage"] = await self.rollup_project(
+            db, created.get("project_id")
+        )
+        event_bus.publish(self.collection_name, "created", created)
         return created
     
     async def get(
         self,
         db: AsyncIOMotorDatabase,
-        phase_id: str
+        phase_id: str,
+        projection: Optional[dict] = None
     ) -> Optional[dict]:
         """Obtener fase por ID"""
         if not ObjectId.is_valid(phase_id):
             return None
         
-        return await db[self.collection_name].find_one({"_id": ObjectId(phase_id)})
+        return await db[self.collection_name].find_one({"_id": ObjectId(phase_id)}, projection)
     
-    async def get_multi(
+    def _build_query(
         self,
-        db: AsyncIOMotorDatabase,
-        skip: int = 0,
-        limit: int = 100,
         project_id: Optional[str] = None,
         status: Optional[str] = None
-    ) -> List[dict]:
-        """Listar fases con filtros"""
+    ) -> dict:
+        """Filtro común para listar y contar"""
         query = {}
         
         if project_id and ObjectId.is_valid(project_id):
@@ -62,7 +110,29 @@ class ProjectPhaseCRUD:
         if status:
             query["status"] = status
         
-        cursor = db[self.collection_name].find(query).skip(skip).limit(limit).sort("order", 1)
+        return query
+    
+    async def get_multi(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 100,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None,
+        after: Optional[dict] = None,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        """Listar fases con filtros"""
+        query = self._build_query(project_id=project_id, status=status)
+        
+        # Con cursor se continúa desde la última posición en vez de usar skip
+        if after:
+            query.update(keyset_filter(self.sort_field, self.sort_direction, after))
+            skip = 0
+        
+        cursor = db[self.collection_name].find(query, projection).sort(
+            sort_spec(self.sort_field, self.sort_direction)
+        ).skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
     
     async def get_by_project(
@@ -87,16 +157,33 @@ class ProjectPhaseCRUD:
         status: Optional[str] = None
     ) -> int:
         """Contar fases"""
-        query = {}
-        
-        if project_id and ObjectId.is_valid(project_id):
-            query["project_id"] = ObjectId(project_id)
-        
-        if status:
-            query["status"] = status
-        
+        query = self._build_query(project_id=project_id, status=status)
         return await db[self.collection_name].count_documents(query)
     
+    async def get_page(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 100,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None,
+        after: Optional[dict] = None,
+        total_mode: str = "exact",
+        projection: Optional[dict] = None
+    ) -> Page:
+        """Página de resultados con el mismo filtro para items y total"""
+        return await paginate(
+            db[self.collection_name],
+            self._build_query(project_id=project_id, status=status),
+            self.sort_field,
+            self.sort_direction,
+            skip=skip,
+            limit=limit,
+            after=after,
+            total_mode=total_mode,
+            projection=projection
+        )
+    
     async def update(
         self,
         db: AsyncIOMotorDatabase,
@@ -114,15 +201,40 @@ class ProjectPhaseCRUD:
         # Actualizar timestamp
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await db[self.collection_name].update_one(
+        before = await db[self.collection_name].find_one_and_update(
             {"_id": ObjectId(phase_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
         )
-        
-        if result.modified_count == 0:
+        if not before:
             return None
         
-        return await self.get(db, phase_id)
+        updated = {**before, **update_data}
+        await self._apply_summary_change(db, before, updated)
+        if _ROLLUP_FIELDS & update_data.keys():
+            updated["project_completion_percentage"] = await self.rollup_project(
+                db, updated.get("project_id")
+            )
+        event_bus.publish(self.collection_name, "updated", updated)
+        return updated
+    
+    async def _apply_summary_change(
+        self,
+        db: AsyncIOMotorDatabase,
+        before: dict,
+        after: dict
+    ) -> None:
+        """Actualizar el resumen del proyecto si cambió el estado de la fase"""
+        if before.get("status") == after.get("status"):
+            return
+        await project_summary_crud.apply(
+            db,
+            after.get("project_id"),
+            project_summary_crud.change_delta(
+                project_summary_crud.phase_delta(before),
+                project_summary_crud.phase_delta(after)
+            )
+        )
     
     async def delete(
         self,
@@ -133,22 +245,40 @@ class ProjectPhaseCRUD:
         if not ObjectId.is_valid(phase_id):
             return False
         
-        result = await db[self.collection_name].delete_one({"_id": ObjectId(phase_id)})
-        return result.deleted_count > 0
+        deleted = await db[self.collection_name].find_one_and_delete(
+            {"_id": ObjectId(phase_id)},
+            projection={"project_id": 1, "status": 1}
+        )
+        if deleted:
+            await project_summary_crud.apply(
+                db,
+                deleted.get("project_id"),
+                project_summary_crud.phase_delta(deleted, -1)
+            )
+            await self.rollup_project(db, deleted.get("project_id"))
+        event_bus.publish(self.collection_name, "deleted", deleted)
+        return deleted is not None
     
     async def reorder_phases(
         self,
         db: AsyncIOMotorDatabase,
         project_id: str,
         phase_orders: List[dict]
-    ) -> bool:
+    ) -> Optional[List[dict]]:
         """
         Reordenar fases del proyecto.
         phase_orders: [{"phase_id": "xxx", "order": 1}, ...]
+        
+        Todas las fases se validan con una sola consulta $in y el nuevo
+        orden se aplica con un único bulk_write dentro de una transacción,
+        de modo que nunca queda a medio aplicar. Retorna las fases del
+        proyecto con el nuevo orden.
+        Lanza ValueError si algún ID no es válido o no pertenece al proyecto.
         """
         if not ObjectId.is_valid(project_id):
-            return False
+            return None
         
+        new_orders = {}
         for item in phase_orders:
             # Manejar tanto dict como objeto Pydantic
             if hasattr(item, 'phase_id'):
@@ -158,13 +288,44 @@ class ProjectPhaseCRUD:
                 phase_id = item.get("phase_id")
                 new_order = item.get("order")
             
-            if phase_id and ObjectId.is_valid(phase_id) and new_order is not None:
-                await db[self.collection_name].update_one(
-                    {"_id": ObjectId(phase_id), "project_id": ObjectId(project_id)},
-                    {"$set": {"order": new_order, "updated_at": datetime.utcnow()}}
+            if not phase_id or not ObjectId.is_valid(phase_id) or new_order is None:
+                raise ValueError(f"Fase no válida: {phase_id}")
+            new_orders[ObjectId(phase_id)] = new_order
+        
+        if new_orders:
+            project_oid = ObjectId(project_id)
+            cursor = db[self.collection_name].find(
+                {"_id": {"$in": list(new_orders)}, "project_id": project_oid},
+                {"_id": 1}
+            )
+            found = {doc["_id"] for doc in await cursor.to_list(length=None)}
+            missing = [str(phase_id) for phase_id in new_orders if phase_id not in found]
+            if missing:
+                raise ValueError(f"Fases que no pertenecen al proyecto: {', '.join(missing)}")
+            
+            now = datetime.utcnow()
+            operations = [
+                UpdateOne(
+                    {"_id": phase_id, "project_id": project_oid},
+                    {"$set": {"order": new_order, "updated_at": now}}
                 )
+                for phase_id, new_order in new_orders.items()
+            ]
+            
+            async def _apply(session):
+                await db[self.collection_name].bulk_write(operations, ordered=False, session=session)
+            
+            await run_in_transaction(db, _apply)
+            # El orden decide cuál es la fase actual del proyecto
+            await self.rollup_project(db, project_oid)
         
-        return True
+        phases = await self.get_by_project(db, project_id)
+        event_bus.publish_many(
+            self.collection_name,
+            "updated",
+            [phase for phase in phases if phase["_id"] in new_orders]
+        )
+        return phases
     
     async def update_status(
         self,
@@ -186,18 +347,46 @@ class ProjectPhaseCRUD:
             update_data["actual_end_date"] = datetime.utcnow()
             update_data["completion_percentage"] = 100
         
-        # Si se inicia, agregar fecha de inicio
+        # Si se inicia, agregar fecha de inicio sólo si no existía
+        # (update con pipeline para no leer la fase antes de escribir)
+        update = {"$set": update_data}
+        started_at = datetime.utcnow()
         if status == "in_progress":
-            phase = await self.get(db, phase_id)
-            if phase and not phase.get("actual_start_date"):
-                update_data["actual_start_date"] = datetime.utcnow()
+            update = [{"$set": {
+                **update_data,
+                "actual_start_date": {"$ifNull": ["$actual_start_date", started_at]}
+            }}]
         
-        await db[self.collection_name].update_one(
+        # Se pide el documento anterior para calcular el delta del resumen;
+        # el resultado se reconstruye en memoria
+        before = await db[self.collection_name].find_one_and_update(
             {"_id": ObjectId(phase_id)},
-            {"$set": update_data}
+            update,
+            return_document=ReturnDocument.BEFORE
         )
-        
-        return await self.get(db, phase_id)
+        updated = None
+        if before:
+            updated = {**before, **update_data}
+            if status == "in_progress":
+                updated["actual_start_date"] = before.get("actual_start_date") or started_at
+            await self._apply_summary_change(db, before, updated)
+            updated["project_completion_percentage"] = await self.rollup_project(
+                db, updated.get("project_id")
+            )
+        event_bus.publish(self.collection_name, "updated", updated)
+        if updated:
+            webhook_dispatcher.emit(
+                "project_phase.status_changed",
+                {
+                    "phase_id": updated["_id"],
+                    "name": updated.get("name"),
+                    "status": updated["status"],
+                    "completion_percentage": updated.get("completion_percentage"),
+                    "project_completion_percentage": updated["project_completion_percentage"]
+                },
+                project_id=updated.get("project_id")
+            )
+        return updated
     
     async def update_completion(
         self,
@@ -212,15 +401,88 @@ class ProjectPhaseCRUD:
         if completion_percentage < 0 or completion_percentage > 100:
             return None
         
-        await db[self.collection_name].update_one(
+        updated = await db[self.collection_name].find_one_and_update(
             {"_id": ObjectId(phase_id)},
             {"$set": {
                 "completion_percentage": completion_percentage,
                 "updated_at": datetime.utcnow()
-            }}
+            }},
+            return_document=ReturnDocument.AFTER
         )
+        if updated:
+            updated["project_completion_percentage"] = await self.rollup_project(
+                db, updated.get("project_id")
+            )
+        event_bus.publish(self.collection_name, "updated", updated)
+        return updated
+    
+    async def rollup_project(
+        self,
+        db: AsyncIOMotorDatabase,
+        project_id: Optional[ObjectId]
+    ) -> Optional[int]:
+        """
+        Recalcular completion_percentage y current_phase_id del proyecto.
+        
+        La completitud es la media de las fases ponderada por weight. La
+        fase actual es la primera en curso; si no hay, la primera sin
+        completar; si todas lo están, la última. Todo se calcula y se
+        escribe en el servidor con una sola agregación que termina en
+        $merge sobre projects (sin leer y reescribir el proyecto). Los
+        proyectos que no existen en la colección no se crean. Sin fases, el
+        proyecto queda sin fase actual y con completitud 0.
+        Retorna la completitud resultante (None si no hay proyecto).
+        """
+        if not project_id:
+            return None
+        
+        if not await db[self.collection_name].find_one({"project_id": project_id}, {"_id": 1}):
+            # Sin fases $group no emite nada y el $merge no tocaría el proyecto
+            result = await db["projects"].update_one(
+                {"_id": project_id},
+                {
+                    "$set": {"completion_percentage": 0, "updated_at": datetime.utcnow()},
+                    "$unset": {"current_phase_id": ""}
+                }
+            )
+            return 0 if result.matched_count else None
+        
+        weight = {"$ifNull": ["$weight", 1]}
+        pipeline = [
+            {"$match": {"project_id": project_id}},
+            {"$sort": {"order": ASCENDING, "_id": ASCENDING}},
+            {"$group": {
+                "_id": "$project_id",
+                "weighted": {"$sum": {"$multiply": [weight, {"$ifNull": ["$completion_percentage", 0]}]}},
+                "weight": {"$sum": weight},
+                "phases": {"$push": {"_id": "$_id", "status": "$status"}},
+            }},
+            {"$project": {
+                "completion_percentage": {"$cond": [
+                    {"$gt": ["$weight", 0]},
+                    {"$toInt": {"$round": [{"$divide": ["$weighted", "$weight"]}, 0]}},
+                    0
+                ]},
+                "current_phase_id": {"$ifNull": [
+                    _first_phase_id({"$eq": ["$$this.status", "in_progress"]}),
+                    {"$ifNull": [
+                        _first_phase_id({"$ne": ["$$this.status", "completed"]}),
+                        {"$arrayElemAt": ["$phases._id", -1]}
+                    ]}
+                ]},
+                "updated_at": {"$literal": datetime.utcnow()},
+            }},
+            {"$merge": {
+                "into": "projects",
+                "on": "_id",
+                "whenMatched": "merge",
+                "whenNotMatched": "discard"
+            }},
+        ]
+        await db[self.collection_name].aggregate(pipeline).to_list(length=None)
         
-        return await self.get(db, phase_id)
+        project = await db["projects"].find_one({"_id": project_id}, {"completion_percentage": 1})
+        return project.get("completion_percentage") if project else None
 
 
 project_phase_crud = ProjectPhaseCRUD()
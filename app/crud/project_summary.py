@@ -0,0 +1,220 @@
+"""
+Resumen por proyecto para el dashboard (colección project_summaries).
+
+Un documento por proyecto (_id = project_id) con los contadores de
+requerimientos por estado, prioridad, tipo y fase, y de fases por estado.
+Se mantiene con $inc en las mismas rutas de escritura de requerimientos y
+fases, así que leerlo cuesta una búsqueda por _id. rebuild() lo recalcula
+desde cero con una sola agregación ($unionWith + $group + $merge).
+"""
+from typing import Optional, Dict, Iterable, Tuple
+from datetime import datetime
+from collections import defaultdict
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from bson import ObjectId
+from pymongo import UpdateOne
+
+# Dimensiones de los requerimientos que se cuentan: campo -> clave en el resumen
+_REQUIREMENT_DIMENSIONS = {
+    "status": "by_status",
+    "priority": "by_priority",
+    "type": "by_type",
+    "phase_id": "by_phase",
+}
+
+
+def summary_key(value) -> str:
+    """Valor usable como nombre de campo ($inc con rutas con punto)"""
+    if value is None:
+        return "unknown"
+    return str(value).replace(".", "_").replace("$", "_")
+
+
+def _agg_key(expression) -> dict:
+    """summary_key() como expresión de agregación"""
+    as_string = {"$ifNull": [{"$toString": expression}, "unknown"]}
+    no_dots = {"$replaceAll": {"input": as_string, "find": ".", "replacement": "_"}}
+    return {"$replaceAll": {"input": no_dots, "find": {"$literal": "$"}, "replacement": "_"}}
+
+
+class ProjectSummaryCRUD:
+    """Contadores por proyecto mantenidos de forma incremental"""
+
+    def __init__(self):
+        self.collection_name = "project_summaries"
+
+    # Deltas
+
+    def requirement_delta(self, requirement: Optional[dict], sign: int = 1) -> Dict[str, int]:
+        """Incrementos que aporta un requerimiento (sign=-1 para retirarlo)"""
+        if not requirement:
+            return {}
+        delta = {"requirements.total": sign}
+        for field, key in _REQUIREMENT_DIMENSIONS.items():
+            delta[f"requirements.{key}.{summary_key(requirement.get(field))}"] = sign
+        return delta
+
+    def phase_delta(self, phase: Optional[dict], sign: int = 1) -> Dict[str, int]:
+        """Incrementos que aporta una fase (sign=-1 para retirarla)"""
+        if not phase:
+            return {}
+        return {
+            "phases.total": sign,
+            f"phases.by_status.{summary_key(phase.get('status'))}": sign,
+        }
+
+    def change_delta(self, before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+        """Diferencia entre el aporte nuevo y el anterior (sin ceros)"""
+        delta = defaultdict(int)
+        for path, value in after.items():
+            delta[path] += value
+        for path, value in before.items():
+            delta[path] -= value
+        return {path: value for path, value in delta.items() if value}
+
+    # Escritura
+
+    async def apply(
+        self,
+        db: AsyncIOMotorDatabase,
+        project_id: Optional[ObjectId],
+        delta: Dict[str, int],
+        session: Optional[AsyncIOMotorClientSession] = None
+    ) -> None:
+        """Aplicar un delta al resumen del proyecto (lo crea si no existe)"""
+        await self.apply_many(db, [(project_id, delta)], session=session)
+
+    async def apply_many(
+        self,
+        db: AsyncIOMotorDatabase,
+        deltas: Iterable[Tuple[Optional[ObjectId], Dict[str, int]]],
+        session: Optional[AsyncIOMotorClientSession] = None
+    ) -> None:
+        """Sumar los deltas por proyecto y aplicarlos con un único bulk_write"""
+        by_project: Dict[ObjectId, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for project_id, delta in deltas:
+            if not project_id:
+                continue
+            for path, value in delta.items():
+                by_project[project_id][path] += value
+
+        now = datetime.utcnow()
+        operations = []
+        for project_id, delta in by_project.items():
+            inc = {path: value for path, value in delta.items() if value}
+            if inc:
+                operations.append(UpdateOne(
+                    {"_id": project_id},
+                    {"$inc": inc, "$set": {"updated_at": now}},
+                    upsert=True
+                ))
+
+        if operations:
+            await db[self.collection_name].bulk_write(operations, ordered=False, session=session)
+
+    # Lectura
+
+    async def get(
+        self,
+        db: AsyncIOMotorDatabase,
+        project_id: str
+    ) -> Optional[dict]:
+        """Obtener el resumen de un proyecto (búsqueda por _id)"""
+        if not ObjectId.is_valid(project_id):
+            return None
+
+        return await db[self.collection_name].find_one({"_id": ObjectId(project_id)})
+
+    # Reconstrucción
+
+    async def rebuild(
+        self,
+        db: AsyncIOMotorDatabase,
+        project_id: Optional[str] = None
+    ) -> int:
+        """
+        Recalcular los resúmenes desde cero con una sola agregación.
+
+        Se recorren requirements y project_phases ($unionWith), se cuenta
+        por (proyecto, dimensión, valor) y el resultado se escribe con
+        $merge. Después se eliminan los resúmenes de proyectos que ya no
+        tienen requerimientos ni fases. Retorna el número de resúmenes.
+        """
+        match = {"project_id": ObjectId(project_id)} if project_id else {"project_id": {"$ne": None}}
+        # BSON guarda milisegundos: se trunca para poder comparar después
+        rebuilt_at = datetime.utcnow()
+        rebuilt_at = rebuilt_at.replace(microsecond=rebuilt_at.microsecond // 1000 * 1000)
+
+        requirement_pairs = [
+            {"k": f"req_{field}", "v": _agg_key(f"${field}")}
+            for field in _REQUIREMENT_DIMENSIONS
+        ]
+        phase_pairs = [{"k": "phase_status", "v": _agg_key("$status")}]
+
+        def dimension(name: str, part: str, default):
+            return {"$ifNull": [f"$d.{name}.{part}", {"$literal": default}]}
+
+        pipeline = [
+            {"$match": match},
+            {"$project": {"project_id": 1, "pairs": requirement_pairs}},
+            {"$unionWith": {
+                "coll": "project_phases",
+                "pipeline": [
+                    {"$match": match},
+                    {"$project": {"project_id": 1, "pairs": phase_pairs}},
+                ]
+            }},
+            {"$unwind": "$pairs"},
+            {"$group": {
+                "_id": {"p": "$project_id", "k": "$pairs.k", "v": "$pairs.v"},
+                "n": {"$sum": 1}
+            }},
+            {"$group": {
+                "_id": {"p": "$_id.p", "k": "$_id.k"},
+                "counts": {"$push": {"k": "$_id.v", "v": "$n"}},
+                "total": {"$sum": "$n"}
+            }},
+            {"$group": {
+                "_id": "$_id.p",
+                "dims": {"$push": {
+                    "k": "$_id.k",
+                    "v": {"counts": {"$arrayToObject": "$counts"}, "total": "$total"}
+                }}
+            }},
+            {"$project": {"d": {"$arrayToObject": "$dims"}}},
+            {"$project": {
+                "requirements": {
+                    "total": dimension("req_status", "total", 0),
+                    **{
+                        key: dimension(f"req_{field}", "counts", {})
+                        for field, key in _REQUIREMENT_DIMENSIONS.items()
+                    }
+                },
+                "phases": {
+                    "total": dimension("phase_status", "total", 0),
+                    "by_status": dimension("phase_status", "counts", {}),
+                },
+                "updated_at": {"$literal": rebuilt_at},
+                "rebuilt_at": {"$literal": rebuilt_at},
+            }},
+            {"$merge": {
+                "into": self.collection_name,
+                "on": "_id",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }},
+        ]
+
+        await db["requirements"].aggregate(pipeline).to_list(length=None)
+
+        # Resúmenes que no se regeneraron: el proyecto ya no tiene datos
+        stale = {"rebuilt_at": {"$ne": rebuilt_at}}
+        if project_id:
+            stale["_id"] = ObjectId(project_id)
+        await db[self.collection_name].delete_many(stale)
+
+        query = {"_id": ObjectId(project_id)} if project_id else {}
+        return await db[self.collection_name].count_documents(query)
+
+
+project_summary_crud = ProjectSummaryCRUD()
@@ -1,23 +1,55 @@
 """CRUD operations for Requirement"""
-from typing import Optional, List
+from typing import Optional, List, Any, Awaitable, Callable
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCursor, AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError
 from app.schemas.requirement import RequirementCreate, RequirementUpdate
+from app.core.indexes import text_index
+from app.crud.pagination import Page, keyset_filter, paginate, sort_spec
+from app.core.events import event_bus
+from app.crud.project_summary import project_summary_crud
+from app.services.webhooks import webhook_dispatcher
+from app.core.database import run_in_transaction
 
 
 class RequirementCRUD:
     """CRUD para gestionar requerimientos"""
     
+    indexes = [
+        IndexModel([("phase_id", ASCENDING), ("created_at", ASCENDING)], name="phase_created"),
+        IndexModel(
+            [("project_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="project_status_created"
+        ),
+        IndexModel(
+            [("project_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="project_created"
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created"),
+        text_index(["title", "description"], weights={"title": 10, "description": 1}),
+    ]
+    
+    query_shapes = [
+        {"filter": {}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"phase_id": ObjectId()}, "sort": [("created_at", ASCENDING)]},
+        {"filter": {"project_id": ObjectId()}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"project_id": ObjectId(), "status": "pending"}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"$text": {"$search": "requerimiento"}}},
+    ]
+    
+    sort_field = "created_at"
+    sort_direction = DESCENDING
+    
+    # Campos que alimentan el resumen del proyecto (project_summaries)
+    _summary_fields = {"project_id": 1, "phase_id": 1, "status": 1, "priority": 1, "type": 1}
+    
     def __init__(self):
         self.collection_name = "requirements"
     
-    async def create(
-        self,
-        db: AsyncIOMotorDatabase,
-        requirement_in: RequirementCreate
-    ) -> dict:
-        """Crear nuevo requerimiento"""
+    def _prepare_document(self, requirement_in: RequirementCreate, now: datetime) -> dict:
+        """Documento listo para insertar a partir del schema de creación"""
         req_dict = requirement_in.model_dump()
         
         # Convertir IDs
@@ -31,39 +63,53 @@ class RequirementCRUD:
             req_dict["transcription_id"] = ObjectId(req_dict["transcription_id"])
         
         # Timestamps y defaults
-        now = datetime.utcnow()
         req_dict["created_at"] = now
         req_dict["updated_at"] = now
         req_dict["extracted_by_ai"] = req_dict.get("extracted_by_ai", False)
         req_dict["user_edited"] = False
         
+        return req_dict
+    
+    async def create(
+        self,
+        db: AsyncIOMotorDatabase,
+        requirement_in: RequirementCreate
+    ) -> dict:
+        """Crear nuevo requerimiento"""
+        req_dict = self._prepare_document(requirement_in, datetime.utcnow())
+        
         result = await db[self.collection_name].insert_one(req_dict)
         created = await db[self.collection_name].find_one({"_id": result.inserted_id})
+        await project_summary_crud.apply(
+            db,
+            created.get("project_id"),
+            project_summary_crud.requirement_delta(created)
+        )
+        event_bus.publish(self.collection_name, "created", created)
+        webhook_dispatcher.emit("requirement.created", created, project_id=created.get("project_id"))
         return created
     
     async def get(
         self,
         db: AsyncIOMotorDatabase,
-        requirement_id: str
+        requirement_id: str,
+        projection: Optional[dict] = None
     ) -> Optional[dict]:
         """Obtener requerimiento por ID"""
         if not ObjectId.is_valid(requirement_id):
             return None
         
-        return await db[self.collection_name].find_one({"_id": ObjectId(requirement_id)})
+        return await db[self.collection_name].find_one({"_id": ObjectId(requirement_id)}, projection)
     
-    async def get_multi(
+    def _build_query(
         self,
-        db: AsyncIOMotorDatabase,
-        skip: int = 0,
-        limit: int = 100,
         project_id: Optional[str] = None,
         phase_id: Optional[str] = None,
         status: Optional[str] = None,
         priority: Optional[str] = None,
         type: Optional[str] = None
-    ) -> List[dict]:
-        """Listar requerimientos con filtros"""
+    ) -> dict:
+        """Filtro común para listar y contar"""
         query = {}
         
         if project_id and ObjectId.is_valid(project_id):
@@ -81,7 +127,38 @@ class RequirementCRUD:
         if type:
             query["type"] = type
         
-        cursor = db[self.collection_name].find(query).skip(skip).limit(limit).sort("created_at", -1)
+        return query
+    
+    async def get_multi(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 100,
+        project_id: Optional[str] = None,
+        phase_id: Optional[str] = None,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        type: Optional[str] = None,
+        after: Optional[dict] = None,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        """Listar requerimientos con filtros"""
+        query = self._build_query(
+            project_id=project_id,
+            phase_id=phase_id,
+            status=status,
+            priority=priority,
+            type=type
+        )
+        
+        # Con cursor se continúa desde la última posición en vez de usar skip
+        if after:
+            query.update(keyset_filter(self.sort_field, self.sort_direction, after))
+            skip = 0
+        
+        cursor = db[self.collection_name].find(query, projection).sort(
+            sort_spec(self.sort_field, self.sort_direction)
+        ).skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
     
     async def get_by_phase(
@@ -104,21 +181,99 @@ class RequirementCRUD:
         db: AsyncIOMotorDatabase,
         project_id: Optional[str] = None,
         phase_id: Optional[str] = None,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        type: Optional[str] = None
     ) -> int:
         """Contar requerimientos"""
-        query = {}
-        
-        if project_id and ObjectId.is_valid(project_id):
-            query["project_id"] = ObjectId(project_id)
-        
-        if phase_id and ObjectId.is_valid(phase_id):
-            query["phase_id"] = ObjectId(phase_id)
+        query = self._build_query(
+            project_id=project_id,
+            phase_id=phase_id,
+            status=status,
+            priority=priority,
+            type=type
+        )
+        return await db[self.collection_name].count_documents(query)
+    
+    async def get_page(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 100,
+        project_id: Optional[str] = None,
+        phase_id: Optional[str] = None,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        type: Optional[str] = None,
+        after: Optional[dict] = None,
+        total_mode: str = "exact",
+        projection: Optional[dict] = None
+    ) -> Page:
+        """Página de resultados con el mismo filtro para items y total"""
+        query = self._build_query(
+            project_id=project_id,
+            phase_id=phase_id,
+            status=status,
+            priority=priority,
+            type=type
+        )
+        return await paginate(
+            db[self.collection_name],
+            query,
+            self.sort_field,
+            self.sort_direction,
+            skip=skip,
+            limit=limit,
+            after=after,
+            total_mode=total_mode,
+            projection=projection
+        )
+    
+    def export_cursor(
+        self,
+        db: AsyncIOMotorDatabase,
+        projection: Optional[dict] = None,
+        batch_size: int = 1000,
+        **filters
+    ) -> AsyncIOMotorCursor:
+        """Cursor sin límite para exportar, leído del servidor por lotes"""
+        query = self._build_query(**filters)
+        return db[self.collection_name].find(query, projection).sort(
+            sort_spec(self.sort_field, self.sort_direction)
+        ).batch_size(batch_size)
+    
+    async def _set_fields(
+        self,
+        db: AsyncIOMotorDatabase,
+        requirement_id: str,
+        fields: dict
+    ) -> Optional[dict]:
+        """
+        Aplicar un $set y retornar el documento resultante.
         
-        if status:
-            query["status"] = status
+        Se pide el documento anterior (ReturnDocument.BEFORE) y el nuevo se
+        obtiene aplicando el cambio en memoria: con ambos se calcula el
+        delta del resumen del proyecto sin lecturas adicionales.
+        """
+        before = await db[self.collection_name].find_one_and_update(
+            {"_id": ObjectId(requirement_id)},
+            {"$set": fields},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not before:
+            return None
         
-        return await db[self.collection_name].count_documents(query)
+        updated = {**before, **fields}
+        await project_summary_crud.apply(
+            db,
+            updated.get("project_id"),
+            project_summary_crud.change_delta(
+                project_summary_crud.requirement_delta(before),
+                project_summary_crud.requirement_delta(updated)
+            )
+        )
+        event_bus.publish(self.collection_name, "updated", updated)
+        return updated
     
     async def update(
         self,
@@ -145,15 +300,7 @@ class RequirementCRUD:
         # Actualizar timestamp
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await db[self.collection_name].update_one(
-            {"_id": ObjectId(requirement_id)},
-            {"$set": update_data}
-        )
-        
-        if result.modified_count == 0:
-            return None
-        
-        return await self.get(db, requirement_id)
+        return await self._set_fields(db, requirement_id, update_data)
     
     async def delete(
         self,
@@ -164,8 +311,18 @@ class RequirementCRUD:
         if not ObjectId.is_valid(requirement_id):
             return False
         
-        result = await db[self.collection_name].delete_one({"_id": ObjectId(requirement_id)})
-        return result.deleted_count > 0
+        deleted = await db[self.collection_name].find_one_and_delete(
+            {"_id": ObjectId(requirement_id)},
+            projection=self._summary_fields
+        )
+        if deleted:
+            await project_summary_crud.apply(
+                db,
+                deleted.get("project_id"),
+                project_summary_crud.requirement_delta(deleted, -1)
+            )
+        event_bus.publish(self.collection_name, "deleted", deleted)
+        return deleted is not None
     
     async def update_status(
         self,
@@ -177,12 +334,11 @@ class RequirementCRUD:
         if not ObjectId.is_valid(requirement_id):
             return None
         
-        await db[self.collection_name].update_one(
-            {"_id": ObjectId(requirement_id)},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+        return await self._set_fields(
+            db,
+            requirement_id,
+            {"status": status, "updated_at": datetime.utcnow()}
         )
-        
-        return await self.get(db, requirement_id)
     
     async def move_to_phase(
         self,
@@ -194,15 +350,197 @@ class RequirementCRUD:
         if not ObjectId.is_valid(requirement_id) or not ObjectId.is_valid(new_phase_id):
             return None
         
-        await db[self.collection_name].update_one(
-            {"_id": ObjectId(requirement_id)},
-            {"$set": {
-                "phase_id": ObjectId(new_phase_id),
-                "updated_at": datetime.utcnow()
-            }}
+        return await self._set_fields(
+            db,
+            requirement_id,
+            {"phase_id": ObjectId(new_phase_id), "updated_at": datetime.utcnow()}
+        )
+
+    
+    # Operaciones masivas: cada una retorna un resultado por elemento
+    # ({"id", "index", "status", "detail"}) en el orden recibido
+    
+    async def create_many(
+        self,
+        db: AsyncIOMotorDatabase,
+        requirements_in: List[RequirementCreate]
+    ) -> List[dict]:
+        """Crear varios requerimientos con un único insert_many"""
+        now = datetime.utcnow()
+        results = []
+        docs = []
+        
+        for index, requirement_in in enumerate(requirements_in):
+            ids = [requirement_in.project_id, requirement_in.phase_id, requirement_in.transcription_id]
+            if not all(value is None or ObjectId.is_valid(value) for value in ids):
+                results.append({"index": index, "status": "invalid_id"})
+                continue
+            
+            doc = self._prepare_document(requirement_in, now)
+            doc["_id"] = ObjectId()
+            docs.append((index, doc))
+            results.append({"id": str(doc["_id"]), "index": index, "status": "created"})
+        
+        if docs:
+            try:
+                await db[self.collection_name].insert_many(
+                    [doc for _, doc in docs],
+                    ordered=False
+                )
+            except BulkWriteError as e:
+                # Con ordered=False el resto de documentos sí se insertan
+                by_position = {error["index"]: error for error in e.details.get("writeErrors", [])}
+                for position, (index, _) in enumerate(docs):
+                    if position in by_position:
+                        results[index] = {
+                            "index": index,
+                            "status": "error",
+                            "detail": by_position[position].get("errmsg")
+                        }
+        
+        created = {result["id"] for result in results if result["status"] == "created"}
+        created_docs = [doc for _, doc in docs if str(doc["_id"]) in created]
+        await project_summary_crud.apply_many(
+            db,
+            [(doc.get("project_id"), project_summary_crud.requirement_delta(doc)) for doc in created_docs]
         )
+        event_bus.publish_many(self.collection_name, "created", created_docs)
+        for doc in created_docs:
+            webhook_dispatcher.emit("requirement.created", doc, project_id=doc.get("project_id"))
+        
+        return results
+    
+    def _split_ids(self, requirement_ids: List[str]) -> tuple:
+        """Separar IDs válidos (sin duplicados, en orden) de los no válidos"""
+        valid, invalid = [], []
+        for requirement_id in dict.fromkeys(requirement_ids):
+            if ObjectId.is_valid(requirement_id):
+                valid.append(ObjectId(requirement_id))
+            else:
+                invalid.append(requirement_id)
+        return valid, invalid
+    
+    async def _bulk_apply(
+        self,
+        db: AsyncIOMotorDatabase,
+        requirement_ids: List[str],
+        operation: Callable[[List[ObjectId], Optional[AsyncIOMotorClientSession]], Awaitable[Any]],
+        success_status: str,
+        changes: Optional[dict] = None
+    ) -> List[dict]:
+        """
+        Aplicar una operación a varios requerimientos.
+        
+        Los IDs existentes se obtienen con una sola consulta $in y la
+        operación (update_many/delete_many) se ejecuta sobre ellos en la
+        misma transacción, para poder informar el resultado de cada ID.
+        changes son los campos modificados, que se publican en el evento
+        de cada requerimiento.
+        """
+        valid, invalid = self._split_ids(requirement_ids)
+        
+        async def _apply(session):
+            if not valid:
+                return set()
+            cursor = db[self.collection_name].find(
+                {"_id": {"$in": valid}},
+                self._summary_fields,
+                session=session
+            )
+            found = await cursor.to_list(length=None)
+            if found:
+                await operation([doc["_id"] for doc in found], session)
+                
+                # Delta del resumen: aporte anterior frente al nuevo (o nada si se borra)
+                await project_summary_crud.apply_many(
+                    db,
+                    [
+                        (
+                            doc.get("project_id"),
+                            project_summary_crud.change_delta(
+                                project_summary_crud.requirement_delta(doc),
+                                project_summary_crud.requirement_delta(
+                                    None if success_status == "deleted" else {**doc, **(changes or {})}
+                                )
+                            )
+                        )
+                        for doc in found
+                    ],
+                    session=session
+                )
+            return found
+        
+        found_docs = await run_in_transaction(db, _apply)
+        event_bus.publish_many(
+            self.collection_name,
+            success_status,
+            [{**doc, **(changes or {})} for doc in found_docs]
+        )
+        
+        found = {doc["_id"] for doc in found_docs}
+        invalid = set(invalid)
+        results = []
+        for requirement_id in dict.fromkeys(requirement_ids):
+            if requirement_id in invalid:
+                results.append({"id": requirement_id, "status": "invalid_id"})
+            elif ObjectId(requirement_id) in found:
+                results.append({"id": requirement_id, "status": success_status})
+            else:
+                results.append({"id": requirement_id, "status": "not_found"})
+        return results
+    
+    async def update_status_many(
+        self,
+        db: AsyncIOMotorDatabase,
+        requirement_ids: List[str],
+        status: str
+    ) -> List[dict]:
+        """Cambiar el estado de varios requerimientos con un único update_many"""
+        changes = {"status": status, "updated_at": datetime.utcnow()}
+        
+        async def _update(found, session):
+            await db[self.collection_name].update_many(
+                {"_id": {"$in": found}},
+                {"$set": changes},
+                session=session
+            )
+        
+        return await self._bulk_apply(db, requirement_ids, _update, "updated", changes)
+    
+    async def move_many_to_phase(
+        self,
+        db: AsyncIOMotorDatabase,
+        requirement_ids: List[str],
+        new_phase_id: str
+    ) -> Optional[List[dict]]:
+        """Mover varios requerimientos a otra fase con un único update_many"""
+        if not ObjectId.is_valid(new_phase_id):
+            return None
+        
+        changes = {"phase_id": ObjectId(new_phase_id), "updated_at": datetime.utcnow()}
+        
+        async def _move(found, session):
+            await db[self.collection_name].update_many(
+                {"_id": {"$in": found}},
+                {"$set": changes},
+                session=session
+            )
+        
+        return await self._bulk_apply(db, requirement_ids, _move, "updated", changes)
+    
+    async def delete_many(
+        self,
+        db: AsyncIOMotorDatabase,
+        requirement_ids: List[str]
+    ) -> List[dict]:
+        """Eliminar varios requerimientos con un único delete_many"""
+        async def _delete(found, session):
+            await db[self.collection_name].delete_many(
+                {"_id": {"$in": found}},
+                session=session
+            )
         
-        return await self.get(db, requirement_id)
+        return await self._bulk_apply(db, requirement_ids, _delete, "deleted")
 
 
 requirement_crud = RequirementCRUD()
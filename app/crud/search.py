@@ -0,0 +1,204 @@
+"""
+Búsqueda de texto completo sobre transcripciones, requerimientos y
+comentarios de fases.
+
+Cada colección tiene un índice de texto con stemming en español
+(core.indexes.text_index). Las colecciones se consultan en paralelo y los
+resultados se mezclan por relevancia (textScore). La paginación es por
+cursor sobre (score, _id): como los ObjectId son únicos entre colecciones,
+el orden es total y el mismo filtro de rango sirve para todas.
+
+La proyección se aplica en el servidor: el texto completo nunca sale de
+MongoDB, sólo un fragmento alrededor del primer término encontrado.
+"""
+import asyncio
+import html
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DESCENDING
+
+from app.crud.pagination import Page, encode_cursor, keyset_filter
+
+# Tipo de resultado -> colección, campo de texto del fragmento y campos devueltos
+SEARCH_TARGETS: Dict[str, Dict[str, Any]] = {
+    "transcription": {
+        "collection": "transcriptions",
+        "text_field": "transcription_text",
+        "fields": ["project_id", "meeting_id", "status", "created_at"],
+    },
+    "requirement": {
+        "collection": "requirements",
+        "text_field": "description",
+        "fields": ["project_id", "phase_id", "title", "status", "priority", "created_at"],
+    },
+    "phase_comment": {
+        "collection": "phase_comments",
+        "text_field": "comment",
+        "fields": ["project_id", "phase_id", "user_email", "created_at"],
+    },
+}
+
+# Longitud del fragmento y contexto que se deja antes del término
+_SNIPPET_LENGTH = 240
+_SNIPPET_CONTEXT = 80
+_MAX_TERMS = 8
+
+_TERM_PATTERN = re.compile(r'"([^"]+)"|(-?\w+)', re.UNICODE)
+
+
+def search_terms(q: str) -> List[str]:
+    """
+    Términos de la consulta en minúsculas (frases entre comillas
+    incluidas, términos negados con "-" excluidos).
+    """
+    terms = []
+    for phrase, word in _TERM_PATTERN.findall(q):
+        term = phrase or word
+        if not term or term.startswith("-"):
+            continue
+        term = term.lower()
+        if term not in terms:
+            terms.append(term)
+    return terms[:_MAX_TERMS]
+
+
+def _snippet_expression(text_field: str, terms: List[str]) -> Dict[str, Any]:
+    """
+    Expresión que recorta el texto alrededor de la primera aparición de
+    algún término. Si ninguno aparece literalmente (p. ej. sólo coincide
+    la raíz), el fragmento empieza al principio del texto.
+    """
+    return {"$let": {
+        "vars": {"text": {"$ifNull": [f"${text_field}", ""]}},
+        "in": {"$let": {
+            "vars": {"positions": {"$filter": {
+                "input": [
+                    {"$indexOfCP": [{"$toLower": "$$text"}, term]}
+                    for term in terms
+                ],
+                "cond": {"$gte": ["$$this", 0]}
+            }}},
+            "in": {"$substrCP": [
+                "$$text",
+                {"$max": [
+                    0,
+                    {"$subtract": [{"$ifNull": [{"$min": "$$positions"}, 0]}, _SNIPPET_CONTEXT]}
+                ]},
+                _SNIPPET_LENGTH
+            ]}
+        }}
+    }}
+
+
+def highlight(text: Optional[str], terms: List[str]) -> Optional[str]:
+    """
+    Escapar el texto como HTML y marcar con <mark> las palabras que
+    empiezan por algún término (o por su raíz aproximada, para cubrir
+    plurales y conjugaciones que el índice también encuentra).
+    """
+    if not text:
+        return text
+    escaped = html.escape(text)
+    prefixes = sorted(
+        {term if " " in term else term[:max(4, len(term) - 2)] for term in terms},
+        key=len,
+        reverse=True
+    )
+    if not prefixes:
+        return escaped
+    pattern = re.compile(
+        r"\b(" + "|".join(re.escape(html.escape(p)) for p in prefixes) + r")\w*",
+        re.IGNORECASE | re.UNICODE
+    )
+    return pattern.sub(lambda m: f"<mark>{m.group(0)}</mark>", escaped)
+
+
+class SearchCRUD:
+    """Búsqueda de texto completo con resultados ordenados por relevancia"""
+
+    sort_field = "score"
+    sort_direction = DESCENDING
+
+    def _pipeline(
+        self,
+        target: Dict[str, Any],
+        q: str,
+        terms: List[str],
+        project_id: Optional[ObjectId],
+        after: Optional[Dict[str, Any]],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        match: Dict[str, Any] = {"$text": {"$search": q}}
+        if project_id:
+            match["project_id"] = project_id
+
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": match},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+        ]
+        if after:
+            pipeline.append({"$match": keyset_filter(self.sort_field, self.sort_direction, after)})
+        pipeline += [
+            {"$sort": {"score": -1, "_id": -1}},
+            {"$limit": limit},
+            # La proyección va después del $limit: el fragmento sólo se
+            # calcula para los documentos de la página
+            {"$project": {
+                **{field: 1 for field in target["fields"]},
+                "score": 1,
+                "snippet": _snippet_expression(target["text_field"], terms),
+            }},
+        ]
+        return pipeline
+
+    async def search(
+        self,
+        db: AsyncIOMotorDatabase,
+        q: str,
+        types: Optional[Sequence[str]] = None,
+        project_id: Optional[str] = None,
+        after: Optional[Dict[str, Any]] = None,
+        limit: int = 20
+    ) -> Optional[Page]:
+        """
+        Buscar en las colecciones indicadas (todas por defecto).
+        Retorna None si project_id no es válido.
+        """
+        project_oid = None
+        if project_id:
+            if not ObjectId.is_valid(project_id):
+                return None
+            project_oid = ObjectId(project_id)
+
+        terms = search_terms(q)
+        selected = list(types) if types else list(SEARCH_TARGETS)
+
+        # Cada colección aporta como mucho limit + 1 resultados: con eso
+        # basta para construir la página mezclada y saber si hay más
+        results = await asyncio.gather(*[
+            db[SEARCH_TARGETS[name]["collection"]].aggregate(
+                self._pipeline(SEARCH_TARGETS[name], q, terms, project_oid, after, limit + 1)
+            ).to_list(length=limit + 1)
+            for name in selected
+        ])
+
+        hits = []
+        for name, documents in zip(selected, results):
+            for document in documents:
+                document["type"] = name
+                document["snippet"] = highlight(document.get("snippet"), terms)
+                if document.get("title"):
+                    document["title"] = highlight(document["title"], terms)
+                hits.append(document)
+
+        hits.sort(key=lambda hit: (hit["score"], hit["_id"]), reverse=True)
+        has_more = len(hits) > limit
+        hits = hits[:limit]
+        cursor = encode_cursor(hits[-1], self.sort_field) if has_more and hits else None
+        return Page(items=hits, total=None, has_more=has_more, next_cursor=cursor)
+
+
+search_crud = SearchCRUD()
@@ -1,15 +1,64 @@
 """CRUD operations for Transcription"""
-from typing import Optional, List
-from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorDatabase
+import asyncio
+import uuid
+from typing import Optional, List, Tuple
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCursor, AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
 from app.schemas.transcription import TranscriptionCreate, TranscriptionUpdate
-from app.services.openai_service import openai_service
+from app.core.indexes import text_index
+from app.crud.pagination import Page, keyset_filter, paginate, sort_spec
+from app.core.events import event_bus
+from app.crud.project_summary import project_summary_crud
+from app.crud.project_phase import project_phase_crud
+from app.core.config import settings
+from app.core.database import raw_bson, run_in_transaction
+from app.services.openai_service import ItemCallback, openai_service
+from app.services.ai_cache import ai_cache
+from app.services.webhooks import webhook_dispatcher
+
+
+class TranscriptionBusyError(Exception):
+    """La transcripción ya se está procesando"""
 
 
 class TranscriptionCRUD:
     """CRUD para gestionar transcripciones"""
     
+    indexes = [
+        IndexModel(
+            [("project_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="project_status_created"
+        ),
+        IndexModel(
+            [("project_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="project_created"
+        ),
+        IndexModel(
+            [("user_email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_email_created"
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="status_created"
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created"),
+        text_index(["transcription_text"]),
+    ]
+    
+    query_shapes = [
+        {"filter": {}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"project_id": ObjectId()}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"project_id": ObjectId(), "status": "pending"}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"user_email": "user@example.com"}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"status": "pending"}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"$text": {"$search": "requerimiento"}}},
+    ]
+    
+    sort_field = "created_at"
+    sort_direction = DESCENDING
+    
     def __init__(self):
         self.collection_name = "transcriptions"
     
@@ -36,29 +85,28 @@ class TranscriptionCRUD:
         
         result = await db[self.collection_name].insert_one(transcription_dict)
         created = await db[self.collection_name].find_one({"_id": result.inserted_id})
+        event_bus.publish(self.collection_name, "created", created)
         return created
     
     async def get(
-        self, 
-        db: AsyncIOMotorDatabase, 
-        transcription_id: str
+        self,
+        db: AsyncIOMotorDatabase,
+        transcription_id: str,
+        projection: Optional[dict] = None
     ) -> Optional[dict]:
         """Obtener transcripción por ID"""
         if not ObjectId.is_valid(transcription_id):
             return None
         
-        return await db[self.collection_name].find_one({"_id": ObjectId(transcription_id)})
+        return await db[self.collection_name].find_one({"_id": ObjectId(transcription_id)}, projection)
     
-    async def get_multi(
+    def _build_query(
         self,
-        db: AsyncIOMotorDatabase,
-        skip: int = 0,
-        limit: int = 10,
         user_email: Optional[str] = None,
         project_id: Optional[str] = None,
         status: Optional[str] = None
-    ) -> List[dict]:
-        """Listar transcripciones con filtros"""
+    ) -> dict:
+        """Filtro común para listar y contar"""
         query = {}
         
         if user_email:
@@ -70,7 +118,30 @@ class TranscriptionCRUD:
         if status:
             query["status"] = status
         
-        cursor = db[self.collection_name].find(query).skip(skip).limit(limit).sort("created_at", -1)
+        return query
+    
+    async def get_multi(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 10,
+        user_email: Optional[str] = None,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None,
+        after: Optional[dict] = None,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        """Listar transcripciones con filtros"""
+        query = self._build_query(user_email=user_email, project_id=project_id, status=status)
+        
+        # Con cursor se continúa desde la última posición en vez de usar skip
+        if after:
+            query.update(keyset_filter(self.sort_field, self.sort_direction, after))
+            skip = 0
+        
+        cursor = db[self.collection_name].find(query, projection).sort(
+            sort_spec(self.sort_field, self.sort_direction)
+        ).skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
     
     async def count(
@@ -81,19 +152,54 @@ class TranscriptionCRUD:
         status: Optional[str] = None
     ) -> int:
         """Contar transcripciones"""
-        query = {}
-        
-        if user_email:
-            query["user_email"] = user_email
-        
-        if project_id and ObjectId.is_valid(project_id):
-            query["project_id"] = ObjectId(project_id)
-        
-        if status:
-            query["status"] = status
-        
+        query = self._build_query(user_email=user_email, project_id=project_id, status=status)
         return await db[self.collection_name].count_documents(query)
     
+    async def get_page(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 10,
+        user_email: Optional[str] = None,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None,
+        after: Optional[dict] = None,
+        total_mode: str = "exact",
+        projection: Optional[dict] = None,
+        raw: bool = False
+    ) -> Page:
+        """
+        Página de resultados con el mismo filtro para items y total
+        (raw=True: items como RawBSONDocument sin decodificar)
+        """
+        collection = db[self.collection_name]
+        if raw:
+            collection = raw_bson(collection)
+        return await paginate(
+            collection,
+            self._build_query(user_email=user_email, project_id=project_id, status=status),
+            self.sort_field,
+            self.sort_direction,
+            skip=skip,
+            limit=limit,
+            after=after,
+            total_mode=total_mode,
+            projection=projection
+        )
+    
+    def export_cursor(
+        self,
+        db: AsyncIOMotorDatabase,
+        projection: Optional[dict] = None,
+        batch_size: int = 1000,
+        **filters
+    ) -> AsyncIOMotorCursor:
+        """Cursor sin límite para exportar, leído del servidor por lotes"""
+        query = self._build_query(**filters)
+        return db[self.collection_name].find(query, projection).sort(
+            sort_spec(self.sort_field, self.sort_direction)
+        ).batch_size(batch_size)
+    
     async def update(
         self,
         db: AsyncIOMotorDatabase,
@@ -118,15 +224,13 @@ class TranscriptionCRUD:
         # Actualizar timestamp
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await db[self.collection_name].update_one(
+        updated = await db[self.collection_name].find_one_and_update(
             {"_id": ObjectId(transcription_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count == 0:
-            return None
-        
-        return await self.get(db, transcription_id)
+        event_bus.publish(self.collection_name, "updated", updated)
+        return updated
     
     async def delete(
         self,
@@ -137,99 +241,253 @@ class TranscriptionCRUD:
         if not ObjectId.is_valid(transcription_id):
             return False
         
-        result = await db[self.collection_name].delete_one({"_id": ObjectId(transcription_id)})
-        return result.deleted_count > 0
+        deleted = await db[self.collection_name].find_one_and_delete(
+            {"_id": ObjectId(transcription_id)},
+            projection={"project_id": 1}
+        )
+        event_bus.publish(self.collection_name, "deleted", deleted)
+        return deleted is not None
+    
+    async def start_processing(
+        self,
+        db: AsyncIOMotorDatabase,
+        transcription_id: str,
+        owner: str,
+        job_id: Optional[ObjectId] = None
+    ) -> Optional[dict]:
+        """
+        Marcar la transcripción como processing a nombre de owner y obtenerla
+        en un solo paso.
+        
+        La marca (processing_by, processing_job, processing_until) sólo se
+        toma si la transcripción no se está procesando, si la tiene el mismo
+        trabajo (un reintento tras una caída del intento anterior) o si su
+        plazo venció. Retorna None si no existe.
+        Lanza TranscriptionBusyError si otro la está procesando.
+        """
+        if not ObjectId.is_valid(transcription_id):
+            return None
+        
+        now = datetime.utcnow()
+        claimable = [
+            {"status": {"$ne": "processing"}},
+            {"processing_until": {"$lt": now}},
+            # Marcas sin plazo (anteriores a processing_until): nadie las renueva
+            {"processing_until": None},
+        ]
+        if job_id is not None:
+            claimable.append({"processing_job": job_id})
+        
+        transcription = await db[self.collection_name].find_one_and_update(
+            {"_id": ObjectId(transcription_id), "$or": claimable},
+            {"$set": {
+                "status": "processing",
+                "processing_by": owner,
+                "processing_job": job_id,
+                "processing_until": now + timedelta(seconds=settings.AI_PROCESSING_LEASE_SECONDS),
+                "updated_at": now
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+        if not transcription:
+            if await db[self.collection_name].count_documents({"_id": ObjectId(transcription_id)}, limit=1):
+                raise TranscriptionBusyError("La transcripción ya se está procesando")
+            return None
+        event_bus.publish(self.collection_name, "updated", transcription)
+        return transcription
+    
+    async def _keep_processing(
+        self,
+        db: AsyncIOMotorDatabase,
+        transcription_id: str,
+        owner: str
+    ) -> None:
+        """Renovar la marca processing mientras owner procesa la transcripción"""
+        while True:
+            await asyncio.sleep(settings.AI_PROCESSING_LEASE_SECONDS / 3)
+            try:
+                result = await db[self.collection_name].update_one(
+                    {"_id": ObjectId(transcription_id), "processing_by": owner},
+                    {"$set": {
+                        "processing_until": datetime.utcnow()
+                        + timedelta(seconds=settings.AI_PROCESSING_LEASE_SECONDS)
+                    }}
+                )
+            except Exception as e:
+                print(f"⚠️  Warning: No se pudo renovar el procesamiento de {transcription_id}: {e}")
+                continue
+            if not result.matched_count:
+                # Otro la retomó; las escrituras finales de owner ya no aplican
+                return
     
     async def process_with_ai(
         self,
         db: AsyncIOMotorDatabase,
         transcription_id: str,
-        project_context: Optional[str] = None
+        project_context: Optional[str] = None,
+        use_cache: bool = True,
+        notify_failure: bool = True,
+        on_item: Optional[ItemCallback] = None,
+        transcription: Optional[dict] = None,
+        owner: Optional[str] = None,
+        job_id: Optional[ObjectId] = None
     ) -> Optional[dict]:
         """
         Procesar transcripción con OpenAI para extraer requerimientos y fases.
         
         Este método:
         1. Obtiene la transcripción
-        2. La procesa con OpenAI
+        2. La procesa con OpenAI (o reutiliza un análisis cacheado del mismo
+           texto, contexto, modelo y prompt)
         3. Guarda el análisis en ai_analysis
         4. Crea las fases del proyecto automáticamente
         5. Crea los requerimientos extraídos
-        """
-        if not ObjectId.is_valid(transcription_id):
-            return None
         
-        # Obtener transcripción
-        transcription = await self.get(db, transcription_id)
+        Con on_item el análisis se pide en streaming y cada elemento se
+        entrega a on_item en cuanto está completo; la persistencia es la
+        misma y se hace al final con el resultado normalizado.
+        
+        transcription es el documento ya tomado con start_processing por
+        owner; si no se pasa, se toma aquí (TranscriptionBusyError si otro
+        lo procesa). El resultado y el error sólo se guardan mientras owner
+        conserva la marca. Si se cancela (plazo del trabajo perdido, parada
+        del worker o del servidor) la transcripción vuelve a pending.
+        """
+        owner = owner or f"process:{uuid.uuid4().hex}"
+        if transcription is None:
+            transcription = await self.start_processing(db, transcription_id, owner, job_id)
         if not transcription:
             return None
         
+        owned = {"_id": ObjectId(transcription_id), "processing_by": owner}
+        release = {"processing_by": "", "processing_job": "", "processing_until": ""}
+        keep_alive = asyncio.create_task(self._keep_processing(db, transcription_id, owner))
         try:
-            # Actualizar estado a processing
-            await db[self.collection_name].update_one(
-                {"_id": ObjectId(transcription_id)},
-                {"$set": {"status": "processing", "updated_at": datetime.utcnow()}}
-            )
-            
-            # Procesar con OpenAI
-            ai_result = await openai_service.analyze_transcription(
+            # Procesar con OpenAI, pasando por la caché de análisis
+            ai_result, cache_hit = await ai_cache.analyze(
+                db,
                 transcription_text=transcription["transcription_text"],
-                project_context=project_context
+                project_context=project_context,
+                use_cache=use_cache,
+                on_item=on_item
             )
             
-            # Guardar resultado del análisis
-            update_data = {
-                "ai_analysis": ai_result,
-                "status": "completed",
-                "processed_at": datetime.utcnow(),
-                "ai_model_used": openai_service.model,
-                "updated_at": datetime.utcnow()
-            }
-            
-            await db[self.collection_name].update_one(
-                {"_id": ObjectId(transcription_id)},
-                {"$set": update_data}
-            )
-            
-            # Si hay project_id, crear fases y requerimientos automáticamente
-            if transcription.get("project_id"):
-                await self._create_phases_and_requirements(
-                    db=db,
-                    project_id=transcription["project_id"],
-                    transcription_id=ObjectId(transcription_id),
-                    ai_result=ai_result
+            # Guardar el análisis y materializar fases/requerimientos de forma
+            # atómica: o se aplica todo o nada
+            async def _persist(session):
+                phases, requirements = [], []
+                if transcription.get("project_id"):
+                    phases, requirements = await self._create_phases_and_requirements(
+                        db=db,
+                        project_id=transcription["project_id"],
+                        transcription_id=ObjectId(transcription_id),
+                        ai_result=ai_result,
+                        session=session
+                    )
+                
+                now = datetime.utcnow()
+                update_data = {
+                    "ai_analysis": ai_result,
+                    "status": "completed",
+                    "processed_at": now,
+                    "ai_model_used": openai_service.model,
+                    "ai_cache_hit": cache_hit,
+                    "phases_created": len(phases),
+                    "requirements_created": len(requirements),
+                    "updated_at": now
+                }
+                
+                updated = await db[self.collection_name].find_one_and_update(
+                    owned,
+                    {"$set": update_data, "$unset": release},
+                    return_document=ReturnDocument.AFTER,
+                    session=session
                 )
+                if not updated:
+                    # Otro retomó la transcripción: se deshace la transacción
+                    raise TranscriptionBusyError("La transcripción la está procesando otro proceso")
+                return updated, phases, requirements
             
-            return await self.get(db, transcription_id)
+            updated, phases, requirements = await run_in_transaction(db, _persist)
+            if phases:
+                await project_phase_crud.rollup_project(db, transcription["project_id"])
             
+            # Los eventos se publican una vez confirmada la transacción
+            event_bus.publish_many("project_phases", "created", phases)
+            event_bus.publish_many("requirements", "created", requirements)
+            event_bus.publish(self.collection_name, "updated", updated)
+            webhook_dispatcher.emit(
+                "transcription.processed",
+                {
+                    "transcription_id": updated["_id"],
+                    "status": updated["status"],
+                    "phases_created": len(phases),
+                    "requirements_created": len(requirements),
+                    "summary": ai_result.get("summary")
+                },
+                project_id=updated.get("project_id")
+            )
+            return updated
+            
+        except asyncio.CancelledError:
+            # Liberar la marca para que se pueda retomar sin esperar a que
+            # venza (shield: la escritura termina aunque se cancele otra vez)
+            released = await asyncio.shield(db[self.collection_name].find_one_and_update(
+                owned,
+                {"$set": {"status": "pending", "updated_at": datetime.utcnow()}, "$unset": release},
+                return_document=ReturnDocument.AFTER
+            ))
+            event_bus.publish(self.collection_name, "updated", released)
+            raise
         except Exception as e:
             # Guardar error
-            await db[self.collection_name].update_one(
-                {"_id": ObjectId(transcription_id)},
+            failed = await db[self.collection_name].find_one_and_update(
+                owned,
                 {
                     "$set": {
                         "status": "error",
                         "error_message": str(e),
                         "updated_at": datetime.utcnow()
-                    }
-                }
+                    },
+                    "$unset": release
+                },
+                return_document=ReturnDocument.AFTER
             )
+            event_bus.publish(self.collection_name, "updated", failed)
+            if failed and notify_failure:
+                webhook_dispatcher.emit(
+                    "transcription.failed",
+                    {"transcription_id": failed["_id"], "error_message": str(e)},
+                    project_id=failed.get("project_id")
+                )
             raise
+        finally:
+            keep_alive.cancel()
     
     async def _create_phases_and_requirements(
         self,
         db: AsyncIOMotorDatabase,
         project_id: ObjectId,
         transcription_id: ObjectId,
-        ai_result: dict
-    ):
-        """Crear fases y requerimientos extraídos por IA"""
+        ai_result: dict,
+        session: Optional[AsyncIOMotorClientSession] = None
+    ) -> Tuple[List[dict], List[dict]]:
+        """
+        Crear fases y requerimientos extraídos por IA.
+        
+        Los _id de las fases se generan en memoria para asignar cada
+        requerimiento a su fase sin releer, y todo se inserta con dos
+        insert_many en lugar de un insert_one por documento.
+        Retorna los documentos insertados (fases, requerimientos).
+        """
         now = datetime.utcnow()
         
-        # Crear fases
+        # Preparar fases
+        phase_docs = []
         phases_created = {}
         for phase_data in ai_result.get("phases", []):
             phase_doc = {
+                "_id": ObjectId(),
                 "project_id": project_id,
                 "name": phase_data["name"],
                 "description": phase_data.get("description", ""),
@@ -239,22 +497,18 @@ class TranscriptionCRUD:
                 "created_at": now,
                 "updated_at": now
             }
-            
-            result = await db["project_phases"].insert_one(phase_doc)
-            phases_created[phase_data["name"]] = result.inserted_id
+            phase_docs.append(phase_doc)
+            phases_created.setdefault(phase_data["name"], phase_doc["_id"])
         
-        # Crear requerimientos
+        # Preparar requerimientos
+        requirement_docs = []
+        default_phase_id = phase_docs[0]["_id"] if phase_docs else None
         for req_data in ai_result.get("requirements", []):
-            # Buscar fase correspondiente
-            phase_name = req_data.get("phase", "")
-            phase_id = phases_created.get(phase_name)
-            
-            # Si no se encuentra la fase, usar la primera creada o None
-            if not phase_id and phases_created:
-                phase_id = list(phases_created.values())[0]
+            # Buscar fase correspondiente; si no existe, usar la primera creada
+            phase_id = phases_created.get(req_data.get("phase", ""), default_phase_id)
             
             if phase_id:
-                req_doc = {
+                requirement_docs.append({
                     "project_id": project_id,
                     "phase_id": phase_id,
                     "transcription_id": transcription_id,
@@ -267,9 +521,23 @@ class TranscriptionCRUD:
                     "user_edited": False,
                     "created_at": now,
                     "updated_at": now
-                }
-                
-                await db["requirements"].insert_one(req_doc)
+                })
+        
+        if phase_docs:
+            await db["project_phases"].insert_many(phase_docs, ordered=False, session=session)
+        
+        if requirement_docs:
+            await db["requirements"].insert_many(requirement_docs, ordered=False, session=session)
+        
+        # Resumen del proyecto en la misma transacción
+        await project_summary_crud.apply_many(
+            db,
+            [(project_id, project_summary_crud.phase_delta(doc)) for doc in phase_docs]
+            + [(project_id, project_summary_crud.requirement_delta(doc)) for doc in requirement_docs],
+            session=session
+        )
+        
+        return phase_docs, requirement_docs
 
 
 transcription_crud = TranscriptionCRUD()
@@ -0,0 +1,174 @@
+"""CRUD operations for Webhook subscriptions and dead letters"""
+from typing import Optional, List
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from app.schemas.webhook import WebhookSubscriptionCreate, WebhookSubscriptionUpdate
+from app.crud.pagination import sort_spec
+
+
+class WebhookSubscriptionCRUD:
+    """CRUD para gestionar suscripciones de webhooks"""
+    
+    indexes = [
+        IndexModel([("active", ASCENDING)], name="active"),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created"),
+    ]
+    
+    query_shapes = [
+        {"filter": {"active": True}},
+        {"filter": {}, "sort": sort_spec("created_at", DESCENDING)},
+    ]
+    
+    def __init__(self):
+        self.collection_name = "webhook_subscriptions"
+    
+    def _prepare(self, data: dict) -> dict:
+        """Convertir IDs y marcar si hay secreto"""
+        if data.get("project_id"):
+            data["project_id"] = ObjectId(data["project_id"])
+        if "secret" in data:
+            data["has_secret"] = bool(data["secret"])
+        return data
+    
+    async def create(
+        self,
+        db: AsyncIOMotorDatabase,
+        subscription_in: WebhookSubscriptionCreate
+    ) -> dict:
+        """Crear nueva suscripción"""
+        subscription_dict = self._prepare(subscription_in.model_dump())
+        
+        now = datetime.utcnow()
+        subscription_dict["created_at"] = now
+        subscription_dict["updated_at"] = now
+        
+        result = await db[self.collection_name].insert_one(subscription_dict)
+        subscription_dict["_id"] = result.inserted_id
+        return subscription_dict
+    
+    async def get(
+        self,
+        db: AsyncIOMotorDatabase,
+        subscription_id: str
+    ) -> Optional[dict]:
+        """Obtener suscripción por ID"""
+        if not ObjectId.is_valid(subscription_id):
+            return None
+        
+        return await db[self.collection_name].find_one({"_id": ObjectId(subscription_id)})
+    
+    async def get_multi(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[dict]:
+        """Listar suscripciones"""
+        cursor = db[self.collection_name].find().sort(
+            sort_spec("created_at", DESCENDING)
+        ).skip(skip).limit(limit)
+        return await cursor.to_list(length=limit)
+    
+    async def get_active(self, db: AsyncIOMotorDatabase) -> List[dict]:
+        """Suscripciones activas (las usa el dispatcher)"""
+        cursor = db[self.collection_name].find({"active": True})
+        return await cursor.to_list(length=None)
+    
+    async def update(
+        self,
+        db: AsyncIOMotorDatabase,
+        subscription_id: str,
+        subscription_in: WebhookSubscriptionUpdate
+    ) -> Optional[dict]:
+        """Actualizar suscripción"""
+        if not ObjectId.is_valid(subscription_id):
+            return None
+        
+        update_data = self._prepare(subscription_in.model_dump(exclude_unset=True))
+        if not update_data:
+            return await self.get(db, subscription_id)
+        
+        update_data["updated_at"] = datetime.utcnow()
+        
+        return await db[self.collection_name].find_one_and_update(
+            {"_id": ObjectId(subscription_id)},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def delete(
+        self,
+        db: AsyncIOMotorDatabase,
+        subscription_id: str
+    ) -> bool:
+        """Eliminar suscripción"""
+        if not ObjectId.is_valid(subscription_id):
+            return False
+        
+        result = await db[self.collection_name].delete_one({"_id": ObjectId(subscription_id)})
+        return result.deleted_count > 0
+
+
+class WebhookDeadLetterCRUD:
+    """Entregas de webhooks que agotaron los reintentos"""
+    
+    indexes = [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created"),
+        IndexModel(
+            [("subscription_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="subscription_created"
+        ),
+    ]
+    
+    query_shapes = [
+        {"filter": {}, "sort": sort_spec("created_at", DESCENDING)},
+        {"filter": {"subscription_id": ObjectId()}, "sort": sort_spec("created_at", DESCENDING)},
+    ]
+    
+    def __init__(self):
+        self.collection_name = "webhook_dead_letters"
+    
+    async def create(
+        self,
+        db: AsyncIOMotorDatabase,
+        dead_letter: dict
+    ) -> dict:
+        """Guardar una entrega fallida"""
+        dead_letter["created_at"] = datetime.utcnow()
+        result = await db[self.collection_name].insert_one(dead_letter)
+        dead_letter["_id"] = result.inserted_id
+        return dead_letter
+    
+    async def get_multi(
+        self,
+        db: AsyncIOMotorDatabase,
+        skip: int = 0,
+        limit: int = 100,
+        subscription_id: Optional[str] = None
+    ) -> List[dict]:
+        """Listar entregas fallidas"""
+        query = {}
+        if subscription_id and ObjectId.is_valid(subscription_id):
+            query["subscription_id"] = ObjectId(subscription_id)
+        
+        cursor = db[self.collection_name].find(query).sort(
+            sort_spec("created_at", DESCENDING)
+        ).skip(skip).limit(limit)
+        return await cursor.to_list(length=limit)
+    
+    async def pop(
+        self,
+        db: AsyncIOMotorDatabase,
+        dead_letter_id: str
+    ) -> Optional[dict]:
+        """Retirar una entrega fallida para reintentarla"""
+        if not ObjectId.is_valid(dead_letter_id):
+            return None
+        
+        return await db[self.collection_name].find_one_and_delete({"_id": ObjectId(dead_letter_id)})
+
+
+webhook_subscription_crud = WebhookSubscriptionCRUD()
+webhook_dead_letter_crud = WebhookDeadLetterCRUD()
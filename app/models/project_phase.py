@@ -31,6 +31,11 @@ class ProjectPhase(MongoBaseModel):
     
     # Progreso
     completion_percentage: int = Field(default=0, ge=0, le=100)
+    weight: float = Field(
+        default=1,
+        gt=0,
+        description="Peso de la fase en la completitud del proyecto"
+    )
     
     # Timestamps
     created_at: Optional[datetime] = None
@@ -1,30 +1,86 @@
-from app.schemas.common import Message, ErrorResponse, PaginationParams, PaginatedResponse
-from app.schemas.meeting import MeetingCreate, MeetingUpdate, MeetingResponse
-from app.schemas.transcription import TranscriptionCreate, TranscriptionUpdate, TranscriptionResponse, TranscriptionProcessRequest
-from app.schemas.project_phase import ProjectPhaseCreate, ProjectPhaseUpdate, ProjectPhaseResponse, PhaseReorderRequest
-from app.schemas.requirement import RequirementCreate, RequirementUpdate, RequirementResponse
-from app.schemas.phase_comment import PhaseCommentCreate, PhaseCommentUpdate, PhaseCommentResponse
+from app.schemas.common import (
+    Message,
+    ErrorResponse,
+    PaginationParams,
+    PaginatedResponse,
+    BulkItemResult,
+    BulkOperationResponse,
+)
+from app.schemas.meeting import MeetingCreate, MeetingUpdate, MeetingResponse, MeetingPartialResponse
+from app.schemas.transcription import (
+    TranscriptionCreate,
+    TranscriptionUpdate,
+    TranscriptionResponse,
+    TranscriptionPartialResponse,
+    TranscriptionProcessRequest,
+)
+from app.schemas.project_phase import (
+    ProjectPhaseCreate,
+    ProjectPhaseUpdate,
+    ProjectPhaseResponse,
+    ProjectPhasePartialResponse,
+    PhaseReorderRequest,
+)
+from app.schemas.requirement import (
+    RequirementCreate,
+    RequirementUpdate,
+    RequirementResponse,
+    RequirementPartialResponse,
+    RequirementBulkCreate,
+    RequirementBulkStatusUpdate,
+    RequirementBulkMove,
+    RequirementBulkDelete,
+)
+from app.schemas.webhook import (
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionUpdate,
+    WebhookSubscriptionResponse,
+    WebhookDeadLetterResponse,
+)
+from app.schemas.project_summary import ProjectSummaryResponse
+from app.schemas.search import SearchHit, SearchResponse
+from app.schemas.job import JobResponse
+from app.schemas.phase_comment import PhaseCommentCreate, PhaseCommentUpdate, PhaseCommentResponse, PhaseCommentPartialResponse
 
 __all__ = [
     "Message",
     "ErrorResponse",
     "PaginationParams",
     "PaginatedResponse",
+    "BulkItemResult",
+    "BulkOperationResponse",
     "MeetingCreate",
     "MeetingUpdate",
     "MeetingResponse",
+    "MeetingPartialResponse",
     "TranscriptionCreate",
     "TranscriptionUpdate",
     "TranscriptionResponse",
+    "TranscriptionPartialResponse",
     "TranscriptionProcessRequest",
     "ProjectPhaseCreate",
     "ProjectPhaseUpdate",
     "ProjectPhaseResponse",
+    "ProjectPhasePartialResponse",
     "PhaseReorderRequest",
     "RequirementCreate",
     "RequirementUpdate",
     "RequirementResponse",
+    "RequirementPartialResponse",
+    "RequirementBulkCreate",
+    "RequirementBulkStatusUpdate",
+    "RequirementBulkMove",
+    "RequirementBulkDelete",
     "PhaseCommentCreate",
     "PhaseCommentUpdate",
     "PhaseCommentResponse",
+    "PhaseCommentPartialResponse",
+    "WebhookSubscriptionCreate",
+    "WebhookSubscriptionUpdate",
+    "WebhookSubscriptionResponse",
+    "WebhookDeadLetterResponse",
+    "ProjectSummaryResponse",
+    "SearchHit",
+    "SearchResponse",
+    "JobResponse",
 ]
@@ -1,8 +1,14 @@
-from typing import Optional, Any, Generic, TypeVar, List
+from typing import Optional, Any, Generic, TypeVar, List, Literal
 from pydantic import BaseModel
 
 T = TypeVar('T')
 
+# exact: conteo exacto | estimated: aproximado/cacheado | none: sin total, sólo has_more
+TotalMode = Literal["exact", "estimated", "none"]
+
+# Formatos de exportación en streaming
+ExportFormat = Literal["ndjson", "csv"]
+
 
 class Message(BaseModel):
     message: str
@@ -21,7 +27,48 @@ class PaginationParams(BaseModel):
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    has_more: Optional[bool] = None
+    total_mode: TotalMode = "exact"
+    next_cursor: Optional[str] = None
+    
+    @classmethod
+    def from_page(cls, page: Any, skip: int, limit: int, total_mode: TotalMode = "exact"):
+        """Construir la respuesta a partir del resultado de pagination.paginate"""
+        total = page.total
+        return cls(
+            items=page.items,
+            total=total,
+            page=skip // limit + 1,
+            size=limit,
+            pages=(total + limit - 1) // limit if total is not None else None,
+            has_more=page.has_more,
+            total_mode=total_mode,
+            next_cursor=page.next_cursor
+        )
+
+
+# Resultado por elemento de una operación masiva
+BulkItemStatus = Literal["created", "updated", "deleted", "not_found", "invalid_id", "error"]
+
+
+class BulkItemResult(BaseModel):
+    id: Optional[str] = None
+    index: Optional[int] = None
+    status: BulkItemStatus
+    detail: Optional[str] = None
+
+
+class BulkOperationResponse(BaseModel):
+    results: List[BulkItemResult]
+    succeeded: int
+    failed: int
+    
+    @classmethod
+    def from_results(cls, results: List[dict]):
+        """Construir la respuesta contando los elementos aplicados y fallidos"""
+        succeeded = sum(1 for r in results if r["status"] in ("created", "updated", "deleted"))
+        return cls(results=results, succeeded=succeeded, failed=len(results) - succeeded)
@@ -0,0 +1,32 @@
+from typing import Optional, Any, Dict, Literal
+from datetime import datetime
+from pydantic import BaseModel, Field, field_serializer
+from bson import ObjectId
+
+JobStatus = Literal["queued", "running", "completed", "failed"]
+
+
+class JobResponse(BaseModel):
+    """Schema de respuesta para trabajos de la cola"""
+    id: Any = Field(alias="_id")
+    type: str
+    status: JobStatus
+    attempts: int = 0
+    max_attempts: int
+    payload: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    run_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    @field_serializer('id')
+    def serialize_object_id(self, value: Any) -> Optional[str]:
+        return str(value) if isinstance(value, ObjectId) else value
+    
+    class Config:
+        populate_by_name = True
+        json_encoders = {ObjectId: str}
+        arbitrary_types_allowed = True
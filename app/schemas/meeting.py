@@ -76,3 +76,10 @@ class MeetingResponse(BaseModel):
         populate_by_name = True
         json_encoders = {ObjectId: str}
         arbitrary_types_allowed = True
+
+
+class MeetingPartialResponse(MeetingResponse):
+    """Respuesta con proyección de campos (fields/exclude): todo opcional salvo el id"""
+    title: Optional[str] = None
+    scheduled_at: Optional[datetime] = None
+    status: Optional[str] = None
@@ -38,3 +38,12 @@ class PhaseCommentResponse(BaseModel):
         populate_by_name = True
         json_encoders = {ObjectId: str}
         arbitrary_types_allowed = True
+
+
+class PhaseCommentPartialResponse(PhaseCommentResponse):
+    """Respuesta con proyección de campos (fields/exclude): todo opcional salvo el id"""
+    phase_id: Optional[Any] = None
+    project_id: Optional[Any] = None
+    user_email: Optional[str] = None
+    comment: Optional[str] = None
+    is_internal: Optional[bool] = None
@@ -11,6 +11,7 @@ class ProjectPhaseCreate(BaseModel):
     description: Optional[str] = None
     order: int = Field(..., ge=1)
     status: str = Field(default="pending")
+    weight: float = Field(default=1, gt=0)
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
 
@@ -26,6 +27,7 @@ class ProjectPhaseUpdate(BaseModel):
     actual_start_date: Optional[datetime] = None
     actual_end_date: Optional[datetime] = None
     completion_percentage: Optional[int] = Field(None, ge=0, le=100)
+    weight: Optional[float] = Field(None, gt=0)
 
 
 class ProjectPhaseResponse(BaseModel):
@@ -41,6 +43,10 @@ class ProjectPhaseResponse(BaseModel):
     actual_start_date: Optional[datetime] = None
     actual_end_date: Optional[datetime] = None
     completion_percentage: int
+    weight: float = 1
+    # Completitud del proyecto recalculada tras cambiar la fase (sólo en
+    # las respuestas de escritura que la recalculan)
+    project_completion_percentage: Optional[int] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
@@ -54,6 +60,16 @@ class ProjectPhaseResponse(BaseModel):
         arbitrary_types_allowed = True
 
 
+class ProjectPhasePartialResponse(ProjectPhaseResponse):
+    """Respuesta con proyección de campos (fields/exclude): todo opcional salvo el id"""
+    project_id: Optional[Any] = None
+    name: Optional[str] = None
+    status: Optional[str] = None
+    order: Optional[int] = None
+    completion_percentage: Optional[int] = None
+    weight: Optional[float] = None
+
+
 class PhaseReorderItem(BaseModel):
     """Item individual para reordenar"""
     phase_id: str
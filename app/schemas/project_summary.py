@@ -0,0 +1,37 @@
+from typing import Optional, Dict, Any
+from datetime import datetime
+from pydantic import BaseModel, Field, field_serializer
+from bson import ObjectId
+
+
+class RequirementCounts(BaseModel):
+    """Contadores de requerimientos de un proyecto"""
+    total: int = 0
+    by_status: Dict[str, int] = {}
+    by_priority: Dict[str, int] = {}
+    by_type: Dict[str, int] = {}
+    by_phase: Dict[str, int] = {}
+
+
+class PhaseCounts(BaseModel):
+    """Contadores de fases de un proyecto"""
+    total: int = 0
+    by_status: Dict[str, int] = {}
+
+
+class ProjectSummaryResponse(BaseModel):
+    """Schema de respuesta para el resumen del proyecto (dashboard)"""
+    project_id: Any = Field(alias="_id")
+    requirements: RequirementCounts = RequirementCounts()
+    phases: PhaseCounts = PhaseCounts()
+    updated_at: Optional[datetime] = None
+    rebuilt_at: Optional[datetime] = None
+    
+    @field_serializer('project_id')
+    def serialize_object_id(self, value: Any) -> Optional[str]:
+        return str(value) if isinstance(value, ObjectId) else value
+    
+    class Config:
+        populate_by_name = True
+        json_encoders = {ObjectId: str}
+        arbitrary_types_allowed = True
@@ -27,6 +27,28 @@ class RequirementUpdate(BaseModel):
     user_edited: Optional[bool] = None
 
 
+class RequirementBulkCreate(BaseModel):
+    """Schema para crear varios requerimientos"""
+    items: list[RequirementCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class RequirementBulkStatusUpdate(BaseModel):
+    """Schema para cambiar el estado de varios requerimientos"""
+    ids: list[str] = Field(..., min_length=1, max_length=1000)
+    status: str = Field(..., pattern="^(pending|in_progress|completed|rejected)$")
+
+
+class RequirementBulkMove(BaseModel):
+    """Schema para mover varios requerimientos a otra fase"""
+    ids: list[str] = Field(..., min_length=1, max_length=1000)
+    new_phase_id: str
+
+
+class RequirementBulkDelete(BaseModel):
+    """Schema para eliminar varios requerimientos"""
+    ids: list[str] = Field(..., min_length=1, max_length=1000)
+
+
 class RequirementResponse(BaseModel):
     """Schema de respuesta para requerimiento"""
     id: Any = Field(alias="_id")
@@ -51,3 +73,16 @@ class RequirementResponse(BaseModel):
         populate_by_name = True
         json_encoders = {ObjectId: str}
         arbitrary_types_allowed = True
+
+
+class RequirementPartialResponse(RequirementResponse):
+    """Respuesta con proyección de campos (fields/exclude): todo opcional salvo el id"""
+    project_id: Optional[Any] = None
+    phase_id: Optional[Any] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    type: Optional[str] = None
+    priority: Optional[str] = None
+    status: Optional[str] = None
+    extracted_by_ai: Optional[bool] = None
+    user_edited: Optional[bool] = None
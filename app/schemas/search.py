@@ -0,0 +1,42 @@
+from typing import Optional, Any, List, Literal
+from datetime import datetime
+from pydantic import BaseModel, Field, field_serializer
+from bson import ObjectId
+
+SearchType = Literal["transcription", "requirement", "phase_comment"]
+
+
+class SearchHit(BaseModel):
+    """
+    Resultado de búsqueda. snippet (y title en requerimientos) vienen
+    escapados como HTML con los términos marcados con <mark>.
+    """
+    id: Any = Field(alias="_id")
+    type: SearchType
+    score: float
+    snippet: Optional[str] = None
+    title: Optional[str] = None
+    project_id: Optional[Any] = None
+    phase_id: Optional[Any] = None
+    meeting_id: Optional[Any] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    user_email: Optional[str] = None
+    created_at: Optional[datetime] = None
+    
+    @field_serializer('id', 'project_id', 'phase_id', 'meeting_id')
+    def serialize_object_id(self, value: Any) -> Optional[str]:
+        return str(value) if isinstance(value, ObjectId) else value
+    
+    class Config:
+        populate_by_name = True
+        json_encoders = {ObjectId: str}
+        arbitrary_types_allowed = True
+
+
+class SearchResponse(BaseModel):
+    """Página de resultados ordenados por relevancia"""
+    items: List[SearchHit]
+    size: int
+    has_more: bool
+    next_cursor: Optional[str] = None
@@ -38,6 +38,9 @@ class TranscriptionResponse(BaseModel):
     error_message: Optional[str] = None
     ai_analysis: Optional[Dict[str, Any]] = None
     ai_model_used: Optional[str] = None
+    ai_cache_hit: Optional[bool] = None
+    phases_created: Optional[int] = None
+    requirements_created: Optional[int] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
@@ -59,3 +62,16 @@ class TranscriptionProcessRequest(BaseModel):
         None,
         description="Contexto adicional del proyecto para mejorar el análisis"
     )
+    use_cache: bool = Field(
+        True,
+        description="Reutilizar un análisis previo del mismo texto y contexto (False fuerza una nueva llamada a OpenAI)"
+    )
+
+
+class TranscriptionPartialResponse(TranscriptionResponse):
+    """Respuesta con proyección de campos (fields/exclude): todo opcional salvo el id"""
+    transcription_text: Optional[str] = None
+    user_email: Optional[str] = None
+    language: Optional[str] = None
+    source: Optional[str] = None
+    status: Optional[str] = None
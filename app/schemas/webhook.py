@@ -0,0 +1,71 @@
+from typing import Optional, Any
+from datetime import datetime
+from pydantic import BaseModel, Field, field_serializer
+from bson import ObjectId
+
+
+class WebhookSubscriptionCreate(BaseModel):
+    """Schema para crear suscripción de webhook"""
+    url: str = Field(..., pattern="^https?://")
+    events: list[str] = Field(
+        default=["*"],
+        min_length=1,
+        description='Tipos de evento: exactos ("requirement.created"), por prefijo ("transcription.*") o "*"'
+    )
+    project_id: Optional[str] = None
+    secret: Optional[str] = Field(default=None, description="Clave para firmar el cuerpo (X-Webhook-Signature)")
+    description: Optional[str] = None
+    active: bool = Field(default=True)
+
+
+class WebhookSubscriptionUpdate(BaseModel):
+    """Schema para actualizar suscripción de webhook"""
+    url: Optional[str] = Field(default=None, pattern="^https?://")
+    events: Optional[list[str]] = None
+    project_id: Optional[str] = None
+    secret: Optional[str] = None
+    description: Optional[str] = None
+    active: Optional[bool] = None
+
+
+class WebhookSubscriptionResponse(BaseModel):
+    """Schema de respuesta para suscripción (el secreto no se devuelve)"""
+    id: Any = Field(alias="_id")
+    url: str
+    events: list[str]
+    project_id: Optional[Any] = None
+    description: Optional[str] = None
+    active: bool
+    has_secret: bool = False
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    @field_serializer('id', 'project_id')
+    def serialize_object_id(self, value: Any) -> Optional[str]:
+        return str(value) if isinstance(value, ObjectId) else value
+    
+    class Config:
+        populate_by_name = True
+        json_encoders = {ObjectId: str}
+        arbitrary_types_allowed = True
+
+
+class WebhookDeadLetterResponse(BaseModel):
+    """Schema de respuesta para entregas fallidas (dead letters)"""
+    id: Any = Field(alias="_id")
+    subscription_id: Any
+    url: str
+    events: list[dict]
+    attempts: int
+    last_error: Optional[str] = None
+    last_status_code: Optional[int] = None
+    created_at: Optional[datetime] = None
+    
+    @field_serializer('id', 'subscription_id')
+    def serialize_object_id(self, value: Any) -> Optional[str]:
+        return str(value) if isinstance(value, ObjectId) else value
+    
+    class Config:
+        populate_by_name = True
+        json_encoders = {ObjectId: str}
+        arbitrary_types_allowed = True
@@ -0,0 +1,221 @@
+"""
+Caché de análisis de IA.
+
+Evita repetir llamadas a OpenAI cuando se procesa el mismo texto con el
+mismo contexto (reintentos de n8n, reprocesados). La clave es un hash de:
+- el texto normalizado (Unicode NFC y espacios colapsados)
+- el contexto del proyecto normalizado
+- el modelo
+- la versión del prompt (hash de las plantillas de prompt)
+
+Si cambia el prompt o el modelo, las entradas anteriores dejan de usarse
+sin necesidad de invalidarlas.
+
+Los análisis se guardan en MongoDB (colección ai_analysis_cache, con TTL y
+límite de entradas). Opcionalmente, con AI_CACHE_REDIS_ENABLED, se usa
+Redis (REDIS_URL) delante de MongoDB como primer nivel.
+"""
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.openai_service import ItemCallback, openai_service
+
+_WHITESPACE = re.compile(r"\s+")
+_REDIS_PREFIX = "ai-cache:"
+
+
+def _crud():
+    """CRUD de la caché (import diferido: los CRUD importan este módulo)"""
+    from app.crud.ai_cache import ai_analysis_cache_crud
+    return ai_analysis_cache_crud
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Normalizar el texto para que variaciones triviales den la misma clave"""
+    if not text:
+        return ""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(
+    text: str,
+    project_context: Optional[str],
+    model: str,
+    prompt_version: str
+) -> str:
+    """Hash SHA-256 de la entrada del análisis"""
+    payload = json.dumps(
+        [normalize_text(text), normalize_text(project_context), model, prompt_version],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AICache:
+    """Caché de dos niveles (Redis opcional + MongoDB) con contadores"""
+    
+    def __init__(self):
+        self._redis = None
+        self._redis_checked = False
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "redis_hits": 0,
+            "mongo_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+    
+    # Redis (opcional)
+    
+    def _get_redis(self):
+        if self._redis_checked:
+            return self._redis
+        self._redis_checked = True
+        if not settings.AI_CACHE_REDIS_ENABLED:
+            return None
+        try:
+            from redis import asyncio as redis_asyncio
+            self._redis = redis_asyncio.from_url(settings.REDIS_URL)
+            print(f"🧠 Caché de IA: Redis activado ({settings.REDIS_URL})")
+        except ImportError:
+            print("⚠️  Warning: Paquete redis no instalado. La caché de IA usará sólo MongoDB.")
+        return self._redis
+    
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+        self._redis_checked = False
+    
+    async def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        redis = self._get_redis()
+        if redis is None:
+            return None
+        try:
+            value = await redis.get(_REDIS_PREFIX + key)
+        except Exception as e:
+            # Redis es sólo un primer nivel: si falla se sigue con MongoDB
+            self._stats["errors"] += 1
+            print(f"⚠️  Warning: Error leyendo caché de IA en Redis: {e}")
+            return None
+        return json.loads(value) if value else None
+    
+    async def _redis_set(self, key: str, result: Dict[str, Any]) -> None:
+        redis = self._get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(
+                _REDIS_PREFIX + key,
+                json.dumps(result, ensure_ascii=False),
+                ex=min(settings.AI_CACHE_REDIS_TTL_SECONDS, settings.AI_CACHE_TTL_SECONDS)
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            print(f"⚠️  Warning: Error guardando caché de IA en Redis: {e}")
+    
+    # Lectura / escritura
+    
+    async def get(self, db: AsyncIOMotorDatabase, key: str) -> Optional[Dict[str, Any]]:
+        """Análisis cacheado para la clave (None si no existe o caducó)"""
+        result = await self._redis_get(key)
+        if result is not None:
+            self._stats["hits"] += 1
+            self._stats["redis_hits"] += 1
+            try:
+                await _crud().touch(db, key)
+            except Exception as e:
+                self._stats["errors"] += 1
+                print(f"⚠️  Warning: Error registrando uso de caché de IA: {e}")
+            return result
+        
+        entry = await _crud().get(db, key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        
+        self._stats["hits"] += 1
+        self._stats["mongo_hits"] += 1
+        await self._redis_set(key, entry["result"])
+        return entry["result"]
+    
+    async def set(
+        self,
+        db: AsyncIOMotorDatabase,
+        key: str,
+        result: Dict[str, Any],
+        model: str,
+        prompt_version: str
+    ) -> None:
+        """Guardar un análisis y aplicar el límite de entradas"""
+        await _crud().set(
+            db, key, result, model, prompt_version, settings.AI_CACHE_TTL_SECONDS
+        )
+        await self._redis_set(key, result)
+        self._stats["stores"] += 1
+        self._stats["evictions"] += await _crud().evict_overflow(
+            db, settings.AI_CACHE_MAX_ENTRIES
+        )
+    
+    async def analyze(
+        self,
+        db: AsyncIOMotorDatabase,
+        transcription_text: str,
+        project_context: Optional[str] = None,
+        use_cache: bool = True,
+        on_item: Optional[ItemCallback] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Analizar una transcripción usando la caché.
+        Retorna (resultado, si vino de la caché). Con use_cache=False se
+        llama siempre a OpenAI, pero el resultado se guarda igualmente.
+        Con on_item el análisis se hace en streaming; si viene de la caché
+        sus elementos se emiten igualmente, todos de una vez.
+        """
+        model = openai_service.model
+        prompt_version = openai_service.prompt_version
+        key = cache_key(transcription_text, project_context, model, prompt_version)
+        
+        if not settings.AI_CACHE_ENABLED:
+            use_cache = False
+        
+        if use_cache:
+            cached = await self.get(db, key)
+            if cached is not None:
+                if on_item is not None:
+                    await openai_service.replay_items(cached, on_item)
+                return cached, True
+        else:
+            self._stats["bypassed"] += 1
+        
+        result = await openai_service.analyze_transcription(
+            transcription_text=transcription_text,
+            project_context=project_context,
+            on_item=on_item
+        )
+        
+        if settings.AI_CACHE_ENABLED:
+            await self.set(db, key, result, model, prompt_version)
+        return result, False
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores de la caché"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else None,
+            "redis_enabled": self._redis is not None,
+        }
+
+
+# Instancia global
+ai_cache = AICache()
@@ -0,0 +1,113 @@
+"""
+Exportación en streaming (NDJSON / CSV).
+
+Los documentos se leen de un cursor de Motor por lotes (batch_size) y se
+escriben en la respuesta a medida que llegan, agrupados en bloques de
+tamaño acotado. La memoria del worker no depende del tamaño de la
+exportación.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+
+from bson import ObjectId
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorCursor
+from pydantic import BaseModel
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Tamaño aproximado de cada bloque escrito en la respuesta
+_CHUNK_SIZE = 64 * 1024
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convertir ObjectId/datetime (también anidados) a tipos JSON"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    """Valor de celda CSV: los objetos y listas se escriben como JSON"""
+    value = to_jsonable(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return "" if value is None else value
+
+
+def export_columns(model: Type[BaseModel], projection: Optional[Dict[str, int]] = None) -> List[str]:
+    """
+    Columnas del CSV según el schema de respuesta y la proyección
+    (fields/exclude) pedida.
+    """
+    fields = [name for name in model.model_fields if name != "id"]
+    if projection:
+        if any(projection.values()):
+            fields = [name for name in fields if projection.get(name)]
+        else:
+            fields = [name for name in fields if name not in projection]
+    return ["_id"] + fields
+
+
+async def _ndjson_chunks(cursor: AsyncIOMotorCursor) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    async for document in cursor:
+        buffer.write(json.dumps(to_jsonable(document), ensure_ascii=False))
+        buffer.write("\n")
+        if buffer.tell() >= _CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer = io.StringIO()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def _csv_chunks(cursor: AsyncIOMotorCursor, columns: List[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for document in cursor:
+        writer.writerow([_csv_value(document.get(column)) for column in columns])
+        if buffer.tell() >= _CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(
+    cursor: AsyncIOMotorCursor,
+    format: str,
+    columns: List[str],
+    filename: str
+) -> StreamingResponse:
+    """
+    Respuesta en streaming con el contenido del cursor.
+
+    El cursor se cierra al terminar o si el cliente corta la descarga.
+    """
+    async def body() -> AsyncIterator[str]:
+        chunks = _csv_chunks(cursor, columns) if format == "csv" else _ndjson_chunks(cursor)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await cursor.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
@@ -0,0 +1,253 @@
+"""
+Servidor simulado de LLM con la API de chat completions de OpenAI.
+
+Responde con análisis válidos según el esquema del prompt del sistema,
+deterministas para un mismo prompt (se derivan del texto de la
+transcripción), con la latencia y la proporción de errores configuradas
+(FAKE_LLM_*). Sirve para medir el procesamiento con IA y sus reintentos
+sin coste ni API key:
+
+- En proceso: LLM_BACKEND=fake (el cliente habla con esta app sin red)
+- Como servidor aparte: python -m app.services.fake_llm --port 8001 y
+  LLM_BACKEND=openai_compatible con LLM_BASE_URL=http://localhost:8001/v1
+
+Con stream=true responde por SSE en trozos, como la API real.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.config import settings
+from app.services.transcript_chunker import estimate_tokens
+
+_SEPARATOR = "=" * 80
+_SENTENCE = re.compile(r"(?<=[.!?…])\s+|\n+")
+_PHASES = [
+    ("Análisis", "Levantamiento y análisis de requerimientos", "2 semanas"),
+    ("Diseño", "Diseño de la arquitectura y de la interfaz", "2 semanas"),
+    ("Desarrollo", "Implementación de las funcionalidades acordadas", "6 semanas"),
+    ("Testing", "Pruebas funcionales y de rendimiento", "2 semanas"),
+    ("Despliegue", "Puesta en producción y seguimiento", "1 semana"),
+]
+_TYPES = ["functional", "non_functional", "technical", "business"]
+_PRIORITIES = ["low", "medium", "high", "critical"]
+# Trozos de la respuesta en streaming y Retry-After de los 429 simulados
+_STREAM_CHUNK_CHARS = 24
+_RETRY_AFTER_SECONDS = 0.2
+
+
+def _transcript(prompt: str) -> str:
+    """Texto de la transcripción dentro del prompt del usuario"""
+    parts = prompt.split(_SEPARATOR)
+    return parts[1].strip() if len(parts) >= 3 else prompt
+
+
+def fake_analysis(prompt: str) -> Dict[str, Any]:
+    """Análisis con el esquema esperado, determinista para un mismo prompt"""
+    transcript = _transcript(prompt)
+    rng = random.Random(hashlib.sha256(transcript.encode("utf-8")).hexdigest())
+    sentences = [s.strip() for s in _SENTENCE.split(transcript) if len(s.strip()) > 15]
+
+    phase_count = rng.randint(2, len(_PHASES))
+    phases = [
+        {"name": name, "description": description, "order": order, "estimated_duration": duration}
+        for order, (name, description, duration) in enumerate(_PHASES[:phase_count], start=1)
+    ]
+    phase_names = [phase["name"] for phase in phases]
+
+    picked = rng.sample(sentences, k=min(len(sentences), rng.randint(2, 8))) if sentences else []
+    requirements = [
+        {
+            "title": " ".join(sentence.split()[:8]).rstrip(".,;:"),
+            "description": sentence,
+            "type": rng.choice(_TYPES),
+            "priority": rng.choice(_PRIORITIES),
+            "phase": rng.choice(phase_names),
+        }
+        for sentence in picked
+    ]
+
+    return {
+        "summary": " ".join(sentences[:2]) or "Reunión sin contenido relevante",
+        "phases": phases,
+        "requirements": requirements,
+        "technical_decisions": [
+            {"topic": f"Decisión {index}", "decision": sentence, "rationale": "Acordado en la reunión"}
+            for index, sentence in enumerate(picked[:rng.randint(0, 2)], start=1)
+        ],
+        "action_items": [
+            {"task": f"Seguimiento: {sentence[:60]}", "assigned_to": None, "deadline": None}
+            for sentence in picked[:rng.randint(0, 3)]
+        ],
+    }
+
+
+class FakeLLM:
+    """Estado del servidor simulado: generador aleatorio y contadores"""
+
+    def __init__(
+        self,
+        distribution: str,
+        latency_ms: float,
+        spread: float,
+        rate_limit_rate: float,
+        error_rate: float,
+        seed: Optional[int] = None
+    ):
+        self.distribution = distribution
+        self.latency_ms = latency_ms
+        self.spread = spread
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.stats: Dict[str, int] = {"requests": 0, "rate_limited": 0, "errors": 0, "completed": 0}
+
+    @classmethod
+    def from_settings(cls) -> "FakeLLM":
+        return cls(
+            distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+            latency_ms=settings.FAKE_LLM_LATENCY_MS,
+            spread=settings.FAKE_LLM_LATENCY_SPREAD,
+            rate_limit_rate=settings.FAKE_LLM_RATE_LIMIT_RATE,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            seed=settings.FAKE_LLM_SEED
+        )
+
+    def latency(self) -> float:
+        """Latencia de una respuesta en segundos"""
+        if self.distribution == "uniform":
+            low = self.latency_ms * max(0.0, 1 - self.spread)
+            milliseconds = self.random.uniform(low, self.latency_ms * (1 + self.spread))
+        elif self.distribution == "lognormal":
+            milliseconds = self.random.lognormvariate(math.log(max(self.latency_ms, 1)), self.spread)
+        else:
+            milliseconds = self.latency_ms
+        return milliseconds / 1000
+
+    def outcome(self) -> Optional[int]:
+        """Código de error simulado para esta petición (None si va bien)"""
+        draw = self.random.random()
+        if draw < self.rate_limit_rate:
+            return 429
+        if draw < self.rate_limit_rate + self.error_rate:
+            return self.random.choice([500, 502, 503])
+        return None
+
+
+def _error_response(status_code: int) -> JSONResponse:
+    headers = {}
+    if status_code == 429:
+        headers = {
+            "retry-after": str(_RETRY_AFTER_SECONDS),
+            "x-ratelimit-remaining-requests": "0",
+        }
+        error = {"message": "Rate limit simulado", "type": "requests", "code": "rate_limit_exceeded"}
+    else:
+        error = {"message": "Error simulado del servidor", "type": "server_error", "code": None}
+    return JSONResponse({"error": error}, status_code=status_code, headers=headers)
+
+
+def create_app(fake: Optional[FakeLLM] = None) -> FastAPI:
+    """App ASGI del servidor simulado"""
+    fake = fake or FakeLLM.from_settings()
+    app = FastAPI(title="Fake LLM", docs_url=None, redoc_url=None)
+    app.state.fake = fake
+
+    @app.get("/v1/stats")
+    async def stats():
+        return fake.stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        fake.stats["requests"] += 1
+        messages: List[Dict[str, Any]] = body.get("messages") or []
+        prompt = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        model = body.get("model") or "fake-llm"
+        latency = fake.latency()
+
+        status_code = fake.outcome()
+        if status_code is not None:
+            # Los errores llegan antes que una respuesta completa
+            await asyncio.sleep(latency / 4)
+            fake.stats["rate_limited" if status_code == 429 else "errors"] += 1
+            return _error_response(status_code)
+
+        content = json.dumps(fake_analysis(prompt), ensure_ascii=False)
+        completion_id = f"chatcmpl-fake-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": sum(estimate_tokens(m.get("content") or "") for m in messages),
+            "completion_tokens": estimate_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        headers = {"x-ratelimit-remaining-requests": "10000", "x-ratelimit-remaining-tokens": "10000000"}
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            fake.stats["completed"] += 1
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }, headers=headers)
+
+        pieces = [content[i:i + _STREAM_CHUNK_CHARS] for i in range(0, len(content), _STREAM_CHUNK_CHARS)]
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def events():
+            # Un cuarto de la latencia hasta el primer token y el resto
+            # repartido entre los trozos
+            await asyncio.sleep(latency / 4)
+            yield chunk({"role": "assistant", "content": ""})
+            step = latency * 3 / 4 / max(len(pieces), 1)
+            for piece in pieces:
+                await asyncio.sleep(step)
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+            fake.stats["completed"] += 1
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor simulado de LLM (API de OpenAI)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Handlers de los tipos de trabajo de la cola (ver services.job_queue)"""
+from typing import Any, Dict
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.crud.transcription import TranscriptionBusyError, transcription_crud
+from app.services.job_queue import job_handler
+
+TRANSCRIPTION_PROCESS = "transcription.process"
+
+
+@job_handler(TRANSCRIPTION_PROCESS)
+async def process_transcription(db: AsyncIOMotorDatabase, job: Dict[str, Any]) -> Dict[str, Any]:
+    """Procesar una transcripción con IA (lo que antes hacía el endpoint)"""
+    payload = job["payload"]
+    try:
+        processed = await transcription_crud.process_with_ai(
+            db,
+            payload["transcription_id"],
+            project_context=payload.get("project_context"),
+            use_cache=payload.get("use_cache", True),
+            # transcription.failed sólo se notifica cuando no quedan reintentos
+            notify_failure=job["attempts"] >= job["max_attempts"],
+            # Un reintento de este mismo trabajo retoma su propia marca
+            owner=f"job:{job['_id']}:{job['attempts']}",
+            job_id=job["_id"]
+        )
+    except TranscriptionBusyError:
+        # Otra petición (p. ej. /process/stream) la está procesando con la
+        # marca vigente: no se reintenta, el resultado lo guarda quien la tomó
+        return {"transcription_id": payload["transcription_id"], "status": "processing", "skipped": True}
+    if not processed:
+        raise ValueError("Transcripción no encontrada")
+
+    return {
+        "transcription_id": str(processed["_id"]),
+        "status": processed["status"],
+        "phases_created": processed.get("phases_created"),
+        "requirements_created": processed.get("requirements_created"),
+        "ai_cache_hit": processed.get("ai_cache_hit"),
+    }
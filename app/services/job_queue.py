@@ -0,0 +1,197 @@
+"""
+Pool de workers para la cola de trabajos (colección jobs).
+
+Los endpoints encolan el trabajo y responden 202 al momento; los workers
+lo toman de MongoDB y lo ejecutan. Pueden correr:
+- dentro del proceso de la API (JOBS_INPROCESS_WORKERS > 0), o
+- como proceso aparte: python -m app.worker
+
+En ambos casos la coordinación es sólo a través de MongoDB, así que se
+pueden combinar varios procesos sin que un trabajo se ejecute dos veces
+a la vez.
+
+Cada tipo de trabajo tiene un handler registrado con @job_handler(tipo)
+que recibe (db, job) y retorna el resultado que se guarda en el trabajo.
+Si el handler lanza una excepción el trabajo se reintenta con backoff
+hasta max_attempts.
+"""
+import asyncio
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+
+JobHandler = Callable[[AsyncIOMotorDatabase, Dict[str, Any]], Awaitable[Any]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """Registrar el handler de un tipo de trabajo"""
+    def register(handler: JobHandler) -> JobHandler:
+        _handlers[job_type] = handler
+        return handler
+    return register
+
+
+def _crud():
+    """CRUD de trabajos (import diferido: los CRUD importan servicios)"""
+    from app.crud.job import job_crud
+    return job_crud
+
+
+def _load_handlers() -> None:
+    """Importar los módulos que registran handlers"""
+    from app.services import job_handlers  # noqa: F401
+
+
+class JobWorkerPool:
+    """Workers que toman trabajos de MongoDB y los ejecutan"""
+
+    def __init__(self):
+        self.worker_prefix = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._running = 0
+        self._stats: Dict[str, int] = {"claimed": 0, "completed": 0, "retried": 0, "failed": 0, "lost": 0}
+
+    # Ciclo de vida
+
+    async def start(self, db: AsyncIOMotorDatabase, workers: int) -> None:
+        if workers <= 0 or self._tasks:
+            return
+        _load_handlers()
+        self._db = db
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{self.worker_prefix}-{index}"))
+            for index in range(workers)
+        ]
+        print(f"🧵 Cola de trabajos: {workers} workers")
+
+    async def stop(self) -> None:
+        """
+        Detener los workers. Un trabajo interrumpido queda en running y
+        se reanuda (por este u otro proceso) cuando vence su plazo.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Despertar a los workers de este proceso (hay un trabajo nuevo)"""
+        self._wakeup.set()
+
+    # Workers
+
+    async def _worker(self, worker_id: str) -> None:
+        job_crud = _crud()
+        while True:
+            try:
+                job = await job_crud.claim(self._db, worker_id, settings.JOBS_LEASE_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Warning: Error tomando trabajos de la cola: {e}")
+                job = None
+
+            if job is None:
+                # Sin trabajo: cerrar los que agotaron intentos y esperar un
+                # aviso de este proceso o sondear
+                try:
+                    self._stats["failed"] += await job_crud.fail_expired(self._db)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"⚠️  Warning: Error cerrando trabajos vencidos: {e}")
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOBS_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._stats["claimed"] += 1
+            self._running += 1
+            try:
+                await self._run(job, worker_id)
+            finally:
+                self._running -= 1
+
+    async def _keep_lease(self, job: Dict[str, Any], worker_id: str, work: asyncio.Task) -> None:
+        """
+        Renovar el plazo del trabajo mientras se ejecuta. Si la renovación
+        no encuentra el trabajo a nombre de este worker (el plazo venció y
+        otro lo tomó), se cancela el handler y la tarea termina.
+        """
+        job_crud = _crud()
+        while True:
+            await asyncio.sleep(settings.JOBS_LEASE_SECONDS / 3)
+            try:
+                renewed = await job_crud.extend_lease(self._db, job["_id"], worker_id, settings.JOBS_LEASE_SECONDS)
+            except Exception as e:
+                print(f"⚠️  Warning: No se pudo renovar el trabajo {job['_id']}: {e}")
+                continue
+            if not renewed:
+                print(f"⚠️  Warning: El trabajo {job['_id']} ya no es de {worker_id}; se cancela")
+                work.cancel()
+                return
+
+    async def _run(self, job: Dict[str, Any], worker_id: str) -> None:
+        job_crud = _crud()
+        handler = _handlers.get(job["type"])
+
+        async def _execute() -> Any:
+            if handler is None:
+                raise ValueError(f"Tipo de trabajo desconocido: {job['type']}")
+            return await handler(self._db, job)
+
+        work = asyncio.create_task(_execute())
+        lease = asyncio.create_task(self._keep_lease(job, worker_id, work))
+        try:
+            result = await work
+        except asyncio.CancelledError:
+            if not lease.done():
+                # Se detiene el worker: esperar a que el handler termine de
+                # limpiar (p. ej. liberar la transcripción) antes de salir
+                work.cancel()
+                await asyncio.wait([work])
+                raise
+            # Trabajo perdido: su estado ya no lo escribe este worker
+            self._stats["lost"] += 1
+            return
+        except Exception as e:
+            if job["attempts"] < job["max_attempts"]:
+                delay = min(
+                    settings.JOBS_RETRY_BACKOFF_SECONDS * 2 ** (job["attempts"] - 1),
+                    settings.JOBS_RETRY_BACKOFF_MAX_SECONDS
+                )
+                await job_crud.fail(self._db, job, worker_id, str(e), retry_delay=delay)
+                self._stats["retried"] += 1
+            else:
+                await job_crud.fail(self._db, job, worker_id, str(e))
+                self._stats["failed"] += 1
+                print(f"❌ Trabajo {job['_id']} ({job['type']}) fallido: {e}")
+        else:
+            await job_crud.complete(self._db, job["_id"], worker_id, result)
+            self._stats["completed"] += 1
+        finally:
+            lease.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores de este proceso"""
+        return {
+            **self._stats,
+            "workers": len(self._tasks),
+            "running": self._running,
+        }
+
+
+# Instancia global (API o proceso app.worker)
+job_worker_pool = JobWorkerPool()
@@ -0,0 +1,95 @@
+"""
+Parser incremental del objeto JSON que devuelve el modelo en streaming.
+
+El texto llega en trozos arbitrarios (a mitad de una cadena, de un número
+o de un escape). JSONItemParser recorre cada carácter una sola vez
+siguiendo el anidamiento y las cadenas, y en cuanto se cierra un elemento
+de una lista de primer nivel (una fase, un requerimiento...) o un texto de
+primer nivel (el resumen) lo devuelve ya decodificado, sin esperar al
+final de la respuesta.
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class JSONItemParser:
+    """
+    feed(trozo) retorna los (clave, valor) completados en ese trozo:
+    - (clave de la lista, elemento) por cada elemento de una lista de
+      primer nivel
+    - (clave, texto) por cada valor de texto de primer nivel
+
+    El texto acumulado queda en text para decodificar la respuesta
+    completa al final.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._item_start: Optional[int] = None
+        self._expect_key = False
+        self._key: Optional[str] = None
+
+    def _in_top_level_list(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "["
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        completed: List[Tuple[str, Any]] = []
+        text = self.text
+
+        for index in range(self._pos, len(text)):
+            char = text[index]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        value = json.loads(text[self._string_start:index + 1])
+                        if self._expect_key:
+                            self._key = value
+                        elif self._key is not None:
+                            completed.append((self._key, value))
+                    elif self._in_top_level_list() and self._key is not None:
+                        completed.append((self._key, json.loads(text[self._string_start:index + 1])))
+                continue
+
+            if not self._stack and char != "{":
+                # Lo que preceda al objeto (espacios, ```json...) se ignora
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in "{[":
+                self._stack.append(char)
+                if len(self._stack) == 1:
+                    self._expect_key = True
+                elif len(self._stack) == 3 and self._stack[1] == "[":
+                    self._item_start = index
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if self._in_top_level_list() and self._item_start is not None:
+                    try:
+                        completed.append((self._key, json.loads(text[self._item_start:index + 1])))
+                    except ValueError:
+                        # Elemento mal formado: la decodificación final decidirá
+                        pass
+                    self._item_start = None
+            elif len(self._stack) == 1:
+                if char == ":":
+                    self._expect_key = False
+                elif char == ",":
+                    self._expect_key = True
+
+        self._pos = len(text)
+        return completed
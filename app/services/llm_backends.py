@@ -0,0 +1,102 @@
+"""
+Backends de LLM para OpenAIService (LLM_BACKEND).
+
+Todos exponen la API de chat completions de OpenAI, así que el servicio
+usa el mismo cliente (AsyncOpenAI) con distinto destino:
+- openai: la API de OpenAI (OPENAI_API_KEY)
+- openai_compatible: cualquier servidor compatible en LLM_BASE_URL
+  (vLLM, Ollama, LM Studio, el servidor simulado...)
+- fake: el servidor simulado de services.fake_llm dentro del proceso,
+  sin red ni API key (el transporte ASGI de httpx entrega la respuesta
+  entera, así que en streaming los elementos llegan todos juntos; para
+  medir el streaming, levantar el servidor aparte y usar
+  openai_compatible)
+
+Los reintentos del SDK se desactivan siempre: los gestiona el limitador.
+"""
+from typing import Dict, Optional, Type
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+
+
+class LLMBackend:
+    """Crea el cliente de chat completions y define el modelo a usar"""
+
+    name = ""
+
+    @property
+    def model(self) -> str:
+        return settings.LLM_MODEL or settings.OPENAI_MODEL
+
+    def create_client(self) -> Optional[AsyncOpenAI]:
+        """Cliente listo para usar, o None si falta configuración"""
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    name = "openai"
+
+    def create_client(self) -> Optional[AsyncOpenAI]:
+        api_key = settings.OPENAI_API_KEY
+        if not api_key or api_key == "tu-api-key-aqui":
+            print("⚠️  Warning: OpenAI API key no configurada. El procesamiento con IA no estará disponible.")
+            return None
+        return AsyncOpenAI(api_key=api_key, max_retries=0)
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    name = "openai_compatible"
+
+    def create_client(self) -> Optional[AsyncOpenAI]:
+        if not settings.LLM_BASE_URL:
+            print("⚠️  Warning: LLM_BASE_URL no configurada. El procesamiento con IA no estará disponible.")
+            return None
+        return AsyncOpenAI(
+            # Muchos servidores locales no piden clave, pero el SDK exige una
+            api_key=settings.LLM_API_KEY or settings.OPENAI_API_KEY or "no-key",
+            base_url=settings.LLM_BASE_URL,
+            max_retries=0
+        )
+
+
+class FakeBackend(LLMBackend):
+    name = "fake"
+
+    @property
+    def model(self) -> str:
+        # Modelo propio: los análisis simulados no se mezclan en la caché
+        # con los reales
+        return "fake-llm"
+
+    def create_client(self) -> Optional[AsyncOpenAI]:
+        from app.services.fake_llm import create_app
+
+        print("🧪 LLM simulado en proceso (LLM_BACKEND=fake)")
+        http_client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_app()),
+            base_url="http://fake-llm/v1",
+            timeout=None
+        )
+        return AsyncOpenAI(
+            api_key="fake",
+            base_url="http://fake-llm/v1",
+            http_client=http_client,
+            max_retries=0
+        )
+
+
+LLM_BACKENDS: Dict[str, Type[LLMBackend]] = {
+    backend.name: backend
+    for backend in (OpenAIBackend, OpenAICompatibleBackend, FakeBackend)
+}
+
+
+def get_backend(name: Optional[str] = None) -> LLMBackend:
+    """Backend configurado (LLM_BACKEND por defecto)"""
+    name = name or settings.LLM_BACKEND
+    if name not in LLM_BACKENDS:
+        raise ValueError(f"LLM_BACKEND no válido: {name} (opciones: {', '.join(LLM_BACKENDS)})")
+    return LLM_BACKENDS[name]()
@@ -2,10 +2,40 @@
 Servicio para procesar transcripciones con OpenAI.
 Extrae requerimientos, fases del proyecto y documentación.
 """
-from typing import Dict, Any, List, Optional
-from openai import AsyncOpenAI
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
+from openai import APIConnectionError, APIStatusError
+import asyncio
+import hashlib
 import json
+import unicodedata
 from app.core.config import settings
+from app.services.transcript_chunker import chunk_transcript, estimate_tokens
+from app.services.rate_limiter import AdaptiveLimiter, RetryableError, is_retryable_status, parse_duration
+from app.services.json_stream import JSONItemParser
+from app.services.llm_backends import get_backend
+
+_PRIORITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# Clave de primer nivel de la respuesta -> tipo de elemento emitido en streaming
+STREAM_ITEMS = {
+    "summary": "summary",
+    "phases": "phase",
+    "requirements": "requirement",
+    "technical_decisions": "technical_decision",
+    "action_items": "action_item",
+}
+
+# Recibe (tipo de elemento, elemento) durante el análisis en streaming
+ItemCallback = Callable[[str, Any], Awaitable[None]]
+
+
+def _dedup_key(value: Optional[str]) -> str:
+    """Clave para detectar duplicados: sin acentos, mayúsculas ni espacios extra"""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.casefold().split())
 
 
 class OpenAIService:
@@ -13,24 +43,47 @@ class OpenAIService:
     
     def __init__(self):
         # Inicialización opcional - no falla si no hay API key
-        self.api_key = settings.OPENAI_API_KEY if hasattr(settings, 'OPENAI_API_KEY') else None
+        self.backend = get_backend()
         self.client = None
-        self.model = getattr(settings, 'OPENAI_MODEL', 'gpt-4-turbo-preview')
-        
-        # Solo inicializar cliente si hay API key válida
-        if self.api_key and self.api_key != "tu-api-key-aqui":
-            try:
-                self.client = AsyncOpenAI(api_key=self.api_key)
-            except Exception as e:
-                print(f"⚠️  Warning: No se pudo inicializar OpenAI client: {e}")
-                self.client = None
-        else:
-            print("⚠️  Warning: OpenAI API key no configurada. El procesamiento con IA no estará disponible.")
+        self.model = self.backend.model
+        
+        # Presupuestos, concurrencia y reintentos de todas las llamadas
+        self.limiter = AdaptiveLimiter(
+            rpm=settings.OPENAI_RPM_LIMIT,
+            tpm=settings.OPENAI_TPM_LIMIT,
+            max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            backoff_base=settings.OPENAI_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.OPENAI_BACKOFF_MAX_SECONDS
+        )
+        
+        # Solo hay cliente si el backend está configurado (API key, URL...)
+        try:
+            self.client = self.backend.create_client()
+        except Exception as e:
+            print(f"⚠️  Warning: No se pudo inicializar el cliente de LLM ({self.backend.name}): {e}")
+            self.client = None
+    
+    @property
+    def prompt_version(self) -> str:
+        """
+        Versión del prompt: hash de las plantillas. Cambia sola al editar
+        los prompts, lo que invalida los análisis cacheados.
+        """
+        templates = (
+            self._build_system_prompt()
+            + self._build_user_prompt("{transcription}", "{context}")
+            + self._build_user_prompt("{transcription}", "{context}", part=(0, 0))
+            + f"chunk={settings.OPENAI_CHUNK_MAX_TOKENS}/{settings.OPENAI_CHUNK_THRESHOLD_TOKENS}"
+        )
+        return hashlib.sha256(templates.encode("utf-8")).hexdigest()[:12]
     
     async def analyze_transcription(
         self, 
         transcription_text: str,
-        project_context: Optional[str] = None
+        project_context: Optional[str] = None,
+        chunked: Optional[bool] = None,
+        on_item: Optional[ItemCallback] = None
     ) -> Dict[str, Any]:
         """
         Analiza una transcripción y extrae:
@@ -38,30 +91,104 @@ class OpenAIService:
         - Fases del proyecto identificadas
         - Requerimientos funcionales y no funcionales
         - Documentación técnica
+        
+        Modo por fragmentos (map-reduce): si la transcripción supera
+        OPENAI_CHUNK_THRESHOLD_TOKENS (o chunked=True) se divide en
+        ventanas de OPENAI_CHUNK_MAX_TOKENS por cambios de orador y marcas
+        de tiempo, los fragmentos se analizan en paralelo (el limitador
+        decide cuántos a la vez) y los resultados se combinan sin
+        duplicados. El tiempo total depende del tamaño del fragmento, no
+        de la duración de la reunión.
+        
+        Con on_item la respuesta se pide en streaming y se llama a
+        on_item(tipo, elemento) con cada fase, requerimiento, decisión,
+        acción y resumen en cuanto el modelo termina de escribirlo (sin
+        repetir los que ya aparecieron en otro fragmento). El resultado
+        retornado es el mismo que sin streaming.
         """
         
         # Verificar si el cliente está disponible
         if not self.client:
             raise Exception(
-                "OpenAI API key no configurada. "
-                "Por favor configura OPENAI_API_KEY en el archivo .env para usar esta funcionalidad."
+                f"LLM no configurado (LLM_BACKEND={self.backend.name}). "
+                "Por favor configura OPENAI_API_KEY (o LLM_BASE_URL) en el archivo .env para usar esta funcionalidad."
             )
         
-        system_prompt = self._build_system_prompt()
-        user_prompt = self._build_user_prompt(transcription_text, project_context)
+        if chunked is None:
+            chunked = estimate_tokens(transcription_text) > settings.OPENAI_CHUNK_THRESHOLD_TOKENS
+        
+        if on_item is not None:
+            on_item = self._unique_items(on_item)
         
+        chunks = chunk_transcript(transcription_text, settings.OPENAI_CHUNK_MAX_TOKENS) if chunked else []
+        if len(chunks) <= 1:
+            return await self._analyze(self._build_user_prompt(transcription_text, project_context), on_item)
+        
+        results = await asyncio.gather(*[
+            self._analyze(self._build_user_prompt(chunk, project_context, part=(index + 1, len(chunks))), on_item)
+            for index, chunk in enumerate(chunks)
+        ])
+        return self._merge_results(results)
+    
+    async def replay_items(self, result: Dict[str, Any], on_item: ItemCallback) -> None:
+        """Emitir los elementos de un análisis ya hecho (p. ej. cacheado)"""
+        for key, item_type in STREAM_ITEMS.items():
+            if key == "summary":
+                if result.get("summary"):
+                    await on_item(item_type, result["summary"])
+                continue
+            for item in result.get(key) or []:
+                await on_item(item_type, item)
+    
+    async def _request(self, system_prompt: str, user_prompt: str, stream: bool = False) -> Tuple[Any, Dict[str, str]]:
+        """
+        Petición a la API. Retorna (respuesta, cabeceras) y convierte los
+        fallos que merecen reintento en RetryableError para el limitador.
+        """
         try:
-            response = await self.client.chat.completions.create(
+            raw = await self.client.chat.completions.with_raw_response.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.3,  # Baja temperatura para respuestas más determinísticas
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                stream=stream
             )
+        except APIStatusError as e:
+            if not is_retryable_status(e.status_code):
+                raise
+            headers = {key.lower(): value for key, value in e.response.headers.items()}
+            raise RetryableError(
+                str(e),
+                status_code=e.status_code,
+                retry_after=parse_duration(headers.get("retry-after")),
+                headers=headers
+            )
+        except APIConnectionError as e:
+            raise RetryableError(str(e))
+        
+        headers = {key.lower(): value for key, value in raw.headers.items()}
+        return raw.parse(), headers
+    
+    async def _analyze(self, user_prompt: str, on_item: Optional[ItemCallback] = None) -> Dict[str, Any]:
+        """
+        Una llamada a OpenAI con el prompt del sistema y el resultado
+        normalizado. Pasa por el limitador: espera presupuesto y turno, y
+        reintenta 429/5xx/errores de red con backoff.
+        """
+        system_prompt = self._build_system_prompt()
+        tokens = estimate_tokens(system_prompt + user_prompt) + settings.OPENAI_COMPLETION_TOKENS_ESTIMATE
+        
+        try:
+            if on_item is not None:
+                content = await self._stream_content(system_prompt, user_prompt, tokens, on_item)
+            else:
+                response = await self.limiter.run(lambda: self._request(system_prompt, user_prompt), tokens)
+                content = response.choices[0].message.content
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
             
             # Validar estructura
             return self._validate_and_normalize_response(result)
@@ -69,6 +196,60 @@ class OpenAIService:
         except Exception as e:
             raise Exception(f"Error al procesar con OpenAI: {str(e)}")
     
+    async def _stream_content(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tokens: int,
+        on_item: ItemCallback
+    ) -> str:
+        """
+        Consumir la respuesta en streaming, emitiendo cada elemento
+        (normalizado) en cuanto se cierra. Retorna el JSON completo.
+        """
+        parser = JSONItemParser()
+        async with self.limiter.stream(lambda: self._request(system_prompt, user_prompt, stream=True), tokens) as stream:
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                for key, value in parser.feed(chunk.choices[0].delta.content):
+                    item_type = STREAM_ITEMS.get(key)
+                    if item_type is None:
+                        continue
+                    if item_type == "phase":
+                        value = self._normalize_phase(value)
+                    elif item_type == "requirement":
+                        value = self._normalize_requirement(value)
+                    await on_item(item_type, value)
+        return parser.text
+    
+    def _unique_items(self, on_item: ItemCallback) -> ItemCallback:
+        """
+        Envolver on_item para no repetir elementos: en modo por fragmentos
+        la misma fase o requerimiento puede aparecer en varios (se usan las
+        mismas claves que _merge_results).
+        """
+        seen = set()
+        
+        async def emit(item_type: str, item: Any) -> None:
+            if item_type == "phase":
+                key = _dedup_key(item.get("name"))
+            elif item_type == "requirement":
+                key = _dedup_key(item.get("title"))
+            elif item_type == "technical_decision":
+                key = (_dedup_key(item.get("topic")), _dedup_key(item.get("decision")))
+            elif item_type == "action_item":
+                key = _dedup_key(item.get("task"))
+            else:
+                key = None
+            if key is not None:
+                if (item_type, key) in seen:
+                    return
+                seen.add((item_type, key))
+            await on_item(item_type, item)
+        
+        return emit
+    
     def _build_system_prompt(self) -> str:
         """Construye el prompt del sistema con instrucciones detalladas"""
         return """Eres un analista de software experto especializado en extraer información de reuniones de desarrollo.
@@ -129,11 +310,19 @@ Devuelve la respuesta en formato JSON con esta estructura exacta:
     def _build_user_prompt(
         self, 
         transcription_text: str,
-        project_context: Optional[str] = None
+        project_context: Optional[str] = None,
+        part: Optional[Tuple[int, int]] = None
     ) -> str:
         """Construye el prompt del usuario con el contexto"""
         
-        prompt = "Analiza la siguiente transcripción de reunión:\n\n"
+        if part:
+            prompt = (
+                f"Analiza el fragmento {part[0]} de {part[1]} de una transcripción de reunión más larga. "
+                "Extrae sólo lo que aparece en este fragmento; los resultados de todos los "
+                "fragmentos se combinarán después:\n\n"
+            )
+        else:
+            prompt = "Analiza la siguiente transcripción de reunión:\n\n"
         prompt += "=" * 80 + "\n"
         prompt += transcription_text
         prompt += "\n" + "=" * 80 + "\n\n"
@@ -159,24 +348,101 @@ Devuelve la respuesta en formato JSON con esta estructura exacta:
         
         # Normalizar fases
         for phase in response.get("phases", []):
-            normalized["phases"].append({
-                "name": phase.get("name", ""),
-                "description": phase.get("description", ""),
-                "order": phase.get("order", 1),
-                "estimated_duration": phase.get("estimated_duration")
-            })
+            normalized["phases"].append(self._normalize_phase(phase))
         
         # Normalizar requerimientos
         for req in response.get("requirements", []):
-            normalized["requirements"].append({
-                "title": req.get("title", ""),
-                "description": req.get("description", ""),
-                "type": req.get("type", "functional"),
-                "priority": req.get("priority", "medium"),
-                "phase": req.get("phase", "")
-            })
+            normalized["requirements"].append(self._normalize_requirement(req))
         
         return normalized
+    
+    def _normalize_phase(self, phase: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": phase.get("name", ""),
+            "description": phase.get("description", ""),
+            "order": phase.get("order", 1),
+            "estimated_duration": phase.get("estimated_duration")
+        }
+    
+    def _normalize_requirement(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "title": req.get("title", ""),
+            "description": req.get("description", ""),
+            "type": req.get("type", "functional"),
+            "priority": req.get("priority", "medium"),
+            "phase": req.get("phase", "")
+        }
+    
+    def _merge_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combinar los análisis de los fragmentos en la estructura normalizada.
+        
+        - Fases: se unifican por nombre y se renumeran según su orden (y el
+          primer fragmento en que aparecen)
+        - Requerimientos: se unifican por título, conservando la prioridad
+          más alta y la descripción más completa
+        - Decisiones y acciones: se eliminan las repetidas
+        """
+        phases: Dict[str, Dict[str, Any]] = {}
+        ranks: Dict[str, Tuple[int, int]] = {}
+        for chunk_index, result in enumerate(results):
+            for phase in result["phases"]:
+                key = _dedup_key(phase["name"])
+                if not key:
+                    continue
+                rank = (phase.get("order") or 1, chunk_index)
+                existing = phases.get(key)
+                if existing is None:
+                    phases[key] = dict(phase)
+                    ranks[key] = rank
+                    continue
+                ranks[key] = min(ranks[key], rank)
+                if len(phase.get("description") or "") > len(existing.get("description") or ""):
+                    existing["description"] = phase["description"]
+                existing["estimated_duration"] = existing.get("estimated_duration") or phase.get("estimated_duration")
+        
+        merged_phases = [phases[key] for key in sorted(phases, key=lambda key: ranks[key])]
+        for order, phase in enumerate(merged_phases, start=1):
+            phase["order"] = order
+        phase_names = {_dedup_key(phase["name"]): phase["name"] for phase in merged_phases}
+        
+        requirements: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            for req in result["requirements"]:
+                key = _dedup_key(req["title"])
+                if not key:
+                    continue
+                req = {**req, "phase": phase_names.get(_dedup_key(req.get("phase")), req.get("phase", ""))}
+                existing = requirements.get(key)
+                if existing is None:
+                    requirements[key] = req
+                    continue
+                if _PRIORITY_RANK.get(req["priority"], 1) > _PRIORITY_RANK.get(existing["priority"], 1):
+                    existing["priority"] = req["priority"]
+                if len(req.get("description") or "") > len(existing.get("description") or ""):
+                    existing["description"] = req["description"]
+                existing["phase"] = existing.get("phase") or req.get("phase", "")
+        
+        decisions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        action_items: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            for decision in result["technical_decisions"]:
+                key = (_dedup_key(decision.get("topic")), _dedup_key(decision.get("decision")))
+                decisions.setdefault(key, decision)
+            for item in result["action_items"]:
+                key = _dedup_key(item.get("task"))
+                existing = action_items.setdefault(key, dict(item))
+                for field in ("assigned_to", "deadline"):
+                    existing[field] = existing.get(field) or item.get(field)
+        
+        return {
+            "summary": " ".join(r["summary"].strip() for r in results if r.get("summary")),
+            "phases": merged_phases,
+            "requirements": list(requirements.values()),
+            "technical_decisions": list(decisions.values()),
+            "action_items": list(action_items.values()),
+            "chunks_analyzed": len(results)
+        }
 
 
 # Instancia singleton
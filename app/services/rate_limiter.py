@@ -0,0 +1,290 @@
+"""
+Limitador de llamadas a OpenAI.
+
+- Presupuestos por minuto: dos token buckets, uno de peticiones
+  (OPENAI_RPM_LIMIT) y otro de tokens (OPENAI_TPM_LIMIT). Cada llamada
+  reserva 1 petición y los tokens estimados de prompt + respuesta.
+- Concurrencia adaptativa (AIMD): el límite de llamadas simultáneas sube
+  de forma aditiva con cada respuesta correcta y se divide a la mitad con
+  cada 429. Las cabeceras x-ratelimit-remaining-* de OpenAI ajustan los
+  buckets a lo que el servidor dice que queda.
+- Reintentos: 429, 5xx y errores de conexión se reintentan con backoff
+  exponencial con jitter completo, respetando Retry-After si viene.
+
+Las métricas separan el tiempo de espera en el limitador (cola) de la
+latencia del modelo.
+"""
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Duraciones de las cabeceras de OpenAI ("1s", "6m0s", "20ms") en segundos"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _percentiles(values: Deque[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"samples": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def at(percentile: float) -> float:
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return round(ordered[index], 3)
+
+    return {"samples": len(ordered), "p50": at(50), "p95": at(95), "p99": at(99), "max": round(ordered[-1], 3)}
+
+
+class RetryableError(Exception):
+    """Error de la llamada que merece reintento (429, 5xx, red)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.headers = headers or {}
+
+
+class TokenBucket:
+    """Bucket que se rellena de forma continua hasta su capacidad"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Segundos hasta poder consumir amount (0 si ya se puede)"""
+        self._refill()
+        # Una petición mayor que la capacidad se deja pasar con el bucket lleno
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def sync(self, remaining: float) -> None:
+        """Ajustar al remanente que informa el servidor (nunca hacia arriba)"""
+        self._refill()
+        self.level = min(self.level, remaining)
+
+
+class AdaptiveLimiter:
+    """Presupuestos RPM/TPM, concurrencia AIMD y reintentos con jitter"""
+
+    def __init__(
+        self,
+        rpm: float,
+        tpm: float,
+        max_concurrency: int,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0
+    ):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._in_flight = 0
+        self._waiting = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._queue_wait_ms: Deque[float] = deque(maxlen=1000)
+        self._latency_ms: Deque[float] = deque(maxlen=1000)
+        self._stats: Dict[str, int] = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "connection_errors": 0,
+            "failed": 0,
+        }
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    # Admisión
+
+    async def _acquire(self, tokens: float) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._in_flight < max(1, int(self.concurrency_limit)):
+                        delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                        if delay <= 0:
+                            break
+                        # Esperar a que se rellenen los buckets (o a que
+                        # termine otra llamada y cambie el estado)
+                        try:
+                            await asyncio.wait_for(condition.wait(), timeout=delay)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await condition.wait()
+            finally:
+                self._waiting -= 1
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self._in_flight += 1
+
+    async def _release(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    # Adaptación
+
+    def _on_success(self, headers: Dict[str, str]) -> None:
+        # Aumento aditivo: +1 por cada "ventana" de llamadas correctas
+        self.concurrency_limit = min(
+            float(self.max_concurrency),
+            self.concurrency_limit + 1 / max(1.0, self.concurrency_limit)
+        )
+        self._apply_headers(headers)
+
+    def _on_rate_limited(self, headers: Dict[str, str]) -> None:
+        # Disminución multiplicativa
+        self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+        self._apply_headers(headers)
+
+    def _apply_headers(self, headers: Dict[str, str]) -> None:
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        try:
+            if remaining_requests is not None:
+                self.requests.sync(float(remaining_requests))
+            if remaining_tokens is not None:
+                self.tokens.sync(float(remaining_tokens))
+        except ValueError:
+            pass
+
+    def _backoff(self, attempt: int, error: RetryableError) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        reset = error.retry_after or parse_duration(error.headers.get("x-ratelimit-reset-requests"))
+        if error.status_code == 429 and reset:
+            delay = max(delay, reset)
+        return delay
+
+    # Ejecución
+
+    async def _open(self, call: Callable[[], Awaitable[Any]], tokens: float) -> Tuple[Any, float]:
+        """
+        Intentar call() hasta obtener respuesta. Retorna (resultado, inicio
+        del intento) con el turno todavía tomado: quien llama debe liberarlo.
+        """
+        self._stats["calls"] += 1
+        attempt = 0
+        while True:
+            queued_at = time.perf_counter()
+            await self._acquire(tokens)
+            started_at = time.perf_counter()
+            self._queue_wait_ms.append((started_at - queued_at) * 1000)
+            self._stats["attempts"] += 1
+            try:
+                result, headers = await call()
+            except RetryableError as e:
+                await self._release()
+                if e.status_code == 429:
+                    self._stats["rate_limited"] += 1
+                    self._on_rate_limited(e.headers)
+                elif e.status_code is None:
+                    self._stats["connection_errors"] += 1
+                else:
+                    self._stats["server_errors"] += 1
+
+                if attempt >= self.max_retries:
+                    self._stats["failed"] += 1
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                self._stats["retries"] += 1
+            except BaseException as e:
+                await self._release()
+                if isinstance(e, Exception):
+                    self._stats["failed"] += 1
+                raise
+            else:
+                self._on_success(headers)
+                return result, started_at
+
+            await asyncio.sleep(delay)
+
+    async def run(self, call: Callable[[], Awaitable[Any]], tokens: float) -> Any:
+        """
+        Ejecutar call() respetando presupuestos y concurrencia.
+
+        call debe retornar (resultado, cabeceras) o lanzar RetryableError
+        para los fallos que merecen reintento; cualquier otra excepción se
+        propaga sin reintentar.
+        """
+        result, started_at = await self._open(call, tokens)
+        self._latency_ms.append((time.perf_counter() - started_at) * 1000)
+        await self._release()
+        return result
+
+    @asynccontextmanager
+    async def stream(self, call: Callable[[], Awaitable[Any]], tokens: float) -> AsyncIterator[Any]:
+        """
+        Como run, para respuestas en streaming: los reintentos cubren la
+        apertura y el turno se mantiene hasta terminar de consumir el
+        stream (la latencia registrada es la de la generación completa).
+        """
+        stream, started_at = await self._open(call, tokens)
+        try:
+            yield stream
+        finally:
+            self._latency_ms.append((time.perf_counter() - started_at) * 1000)
+            await self._release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "concurrency_limit": round(self.concurrency_limit, 2),
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "requests_available": round(self.requests.level, 1),
+            "tokens_available": round(self.tokens.level),
+            "queue_wait_ms": _percentiles(self._queue_wait_ms),
+            "model_latency_ms": _percentiles(self._latency_ms),
+        }
+
+
+def is_retryable_status(status_code: Optional[int]) -> bool:
+    return status_code is not None and (status_code in _RETRYABLE_STATUS or status_code >= 500)
@@ -0,0 +1,93 @@
+"""
+División de transcripciones largas en ventanas acotadas por tokens.
+
+Los cortes se hacen en fronteras naturales de la reunión: cambios de
+orador y marcas de tiempo (formatos de Teams: WebVTT con <v Nombre> y
+"Nombre  0:05"), o líneas en blanco. Sólo si un turno de palabra no cabe
+en una ventana se corta por frases y, en último caso, por caracteres.
+"""
+import re
+from typing import List
+
+# Aproximación sin tokenizador: ~4 caracteres por token en español/inglés
+CHARS_PER_TOKEN = 4
+
+_TIMESTAMP = r"\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d{1,3})?"
+_BOUNDARY = re.compile(
+    rf"^\s*(?:"
+    rf"{_TIMESTAMP}\s*-->"               # cue de WebVTT
+    rf"|<v\s"                            # orador de WebVTT
+    rf"|\[?{_TIMESTAMP}\]?\s"            # "[00:01:02] Nombre: ..."
+    rf"|[^\s:][^:\n]{{0,60}}\s{{2,}}{_TIMESTAMP}\s*$"  # "Nombre Apellido   0:05"
+    rf"|[A-ZÁÉÍÓÚÑ][\wÁÉÍÓÚÑáéíóúñ .'-]{{0,40}}:\s"     # "Nombre: ..."
+    rf")"
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_segments(text: str) -> List[str]:
+    """Dividir en turnos de palabra (o párrafos si no hay marcas)"""
+    segments: List[str] = []
+    current: List[str] = []
+    for line in text.splitlines():
+        if not line.strip():
+            if current:
+                segments.append("\n".join(current))
+                current = []
+            continue
+        if current and _BOUNDARY.match(line):
+            # Un cue de WebVTT va seguido de su orador: no separarlos
+            if not re.match(rf"^\s*{_TIMESTAMP}\s*-->", current[-1]):
+                segments.append("\n".join(current))
+                current = []
+        current.append(line)
+    if current:
+        segments.append("\n".join(current))
+    return segments
+
+
+def _split_oversized(segment: str, max_chars: int) -> List[str]:
+    """Cortar un turno demasiado largo por frases (o por caracteres)"""
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(segment):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_transcript(text: str, max_tokens: int) -> List[str]:
+    """
+    Agrupar los turnos de palabra en ventanas de como mucho max_tokens
+    (estimados), sin partir un turno salvo que por sí solo no quepa.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for segment in split_segments(text):
+        pieces = [segment] if len(segment) <= max_chars else _split_oversized(segment, max_chars)
+        for piece in pieces:
+            if current and size + len(piece) + 1 > max_chars:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
@@ -0,0 +1,338 @@
+"""
+Envío de eventos a webhooks externos (n8n, etc.).
+
+- emit() encola el evento sin bloquear la petición que lo genera
+- Un batcher agrupa los eventos por suscripción y los envía juntos en un
+  solo POST cuando se llena el lote (WEBHOOK_BATCH_SIZE) o pasa la ventana
+  de agrupación (WEBHOOK_BATCH_WINDOW_SECONDS)
+- Un pool acotado de workers (WEBHOOK_WORKERS) hace los POST con un único
+  httpx.AsyncClient compartido, reutilizando conexiones
+- Los fallos se reintentan con backoff exponencial; al agotar los intentos
+  el lote se guarda en la colección webhook_dead_letters
+
+Cuerpo de cada POST:
+    {"subscription_id": "...", "sent_at": "...", "events": [{"id", "type",
+     "project_id", "data", "timestamp"}, ...]}
+Si la suscripción tiene secreto se añade la cabecera X-Webhook-Signature
+(sha256=<HMAC-SHA256 del cuerpo>).
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.export import to_jsonable
+
+
+def _cruds():
+    """CRUDs de webhooks (import diferido: los CRUD importan este módulo)"""
+    from app.crud.webhook import webhook_subscription_crud, webhook_dead_letter_crud
+    return webhook_subscription_crud, webhook_dead_letter_crud
+
+
+def _matches(subscription: Dict[str, Any], event: Dict[str, Any]) -> bool:
+    """Indica si el evento corresponde a la suscripción (tipo y proyecto)"""
+    project_id = subscription.get("project_id")
+    if project_id and event["project_id"] != str(project_id):
+        return False
+
+    for pattern in subscription.get("events") or ["*"]:
+        if pattern == "*" or pattern == event["type"]:
+            return True
+        if pattern.endswith(".*") and event["type"].startswith(pattern[:-1]):
+            return True
+    return False
+
+
+class _Delivery:
+    """Lote de eventos pendiente de entregar a una suscripción"""
+
+    def __init__(self, subscription: Dict[str, Any], events: List[Dict[str, Any]]):
+        self.subscription = subscription
+        self.events = events
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+        self.last_status_code: Optional[int] = None
+
+
+class WebhookDispatcher:
+    """Cola de eventos, agrupación por destino y entrega con reintentos"""
+
+    def __init__(self):
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._events: Optional[asyncio.Queue] = None
+        self._deliveries: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retry_handles: Dict[asyncio.TimerHandle, _Delivery] = {}
+
+        # Caché de suscripciones activas
+        self._subscriptions: List[Dict[str, Any]] = []
+        self._subscriptions_loaded_at = 0.0
+        self._matches_by_type: Dict[tuple, List[Dict[str, Any]]] = {}
+
+        self.stats = {
+            "emitted": 0,
+            "dropped": 0,
+            "batches_sent": 0,
+            "events_delivered": 0,
+            "retries": 0,
+            "dead_letters": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    # Ciclo de vida
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        """Crear el cliente HTTP compartido y arrancar batcher y workers"""
+        if not settings.WEBHOOKS_ENABLED or self.running:
+            return
+
+        self._db = db
+        self._client = httpx.AsyncClient(
+            timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.WEBHOOK_WORKERS,
+                max_keepalive_connections=settings.WEBHOOK_WORKERS
+            )
+        )
+        self._events = asyncio.Queue(maxsize=settings.WEBHOOK_QUEUE_SIZE)
+        self._deliveries = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._batcher())] + [
+            asyncio.create_task(self._worker()) for _ in range(settings.WEBHOOK_WORKERS)
+        ]
+        print(f"🪝 Webhooks: {settings.WEBHOOK_WORKERS} workers")
+
+    async def stop(self) -> None:
+        """Enviar lo pendiente (con un límite de tiempo) y cerrar"""
+        if not self.running:
+            return
+
+        try:
+            await asyncio.wait_for(self._events.join(), timeout=settings.WEBHOOK_TIMEOUT_SECONDS)
+            # Dejar que el batcher envíe los lotes abiertos
+            await asyncio.sleep(settings.WEBHOOK_BATCH_WINDOW_SECONDS)
+            await asyncio.wait_for(self._deliveries.join(), timeout=settings.WEBHOOK_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            print("⚠️  Warning: Quedaron webhooks sin entregar al apagar")
+
+        # Los reintentos programados se guardan como dead letters para
+        # poder reenviarlos después
+        for handle, delivery in list(self._retry_handles.items()):
+            handle.cancel()
+            await self._dead_letter(delivery)
+        self._retry_handles.clear()
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        await self._client.aclose()
+        self._client = None
+
+    # Emisión
+
+    def emit(
+        self,
+        event_type: str,
+        data: Dict[str, Any],
+        project_id: Optional[Any] = None
+    ) -> None:
+        """Encolar un evento para los webhooks suscritos (no bloquea)"""
+        if not self.running:
+            return
+
+        event = {
+            "id": uuid.uuid4().hex,
+            "type": event_type,
+            "project_id": str(project_id) if project_id else None,
+            "data": to_jsonable(data),
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        try:
+            self._events.put_nowait(event)
+            self.stats["emitted"] += 1
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            print(f"⚠️  Warning: Cola de webhooks llena, se descarta {event_type}")
+
+    # Suscripciones
+
+    def invalidate_subscriptions(self) -> None:
+        """Forzar la recarga de suscripciones (tras crear/editar/eliminar)"""
+        self._subscriptions_loaded_at = 0.0
+
+    async def _load_subscriptions(self) -> None:
+        if time.monotonic() - self._subscriptions_loaded_at < settings.WEBHOOK_SUBSCRIPTION_CACHE_SECONDS:
+            return
+        subscription_crud, _ = _cruds()
+        self._subscriptions = await subscription_crud.get_active(self._db)
+        self._subscriptions_loaded_at = time.monotonic()
+        self._matches_by_type = {}
+
+    def _subscribers_for(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        key = (event["type"], event["project_id"])
+        if key not in self._matches_by_type:
+            self._matches_by_type[key] = [
+                subscription for subscription in self._subscriptions
+                if _matches(subscription, event)
+            ]
+        return self._matches_by_type[key]
+
+    # Agrupación
+
+    async def _batcher(self) -> None:
+        """Agrupar eventos por suscripción y pasar los lotes a los workers"""
+        pending: Dict[ObjectId, _Delivery] = {}
+        deadline: Optional[float] = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                event = await asyncio.wait_for(self._events.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                event = None
+
+            if event is not None:
+                try:
+                    await self._load_subscriptions()
+                    for subscription in self._subscribers_for(event):
+                        delivery = pending.get(subscription["_id"])
+                        if delivery is None:
+                            delivery = pending[subscription["_id"]] = _Delivery(subscription, [])
+                        delivery.events.append(event)
+                        if len(delivery.events) >= settings.WEBHOOK_BATCH_SIZE:
+                            self._deliveries.put_nowait(pending.pop(subscription["_id"]))
+                except Exception as e:
+                    print(f"⚠️  Warning: No se pudo agrupar el evento {event['type']}: {e}")
+                finally:
+                    self._events.task_done()
+
+                if pending and deadline is None:
+                    deadline = time.monotonic() + settings.WEBHOOK_BATCH_WINDOW_SECONDS
+
+            # Vencida la ventana, enviar todos los lotes abiertos
+            if pending and time.monotonic() >= deadline:
+                for delivery in pending.values():
+                    self._deliveries.put_nowait(delivery)
+                pending = {}
+            if not pending:
+                deadline = None
+
+    # Entrega
+
+    def _backoff(self, attempts: int) -> float:
+        """Backoff exponencial con jitter"""
+        delay = min(
+            settings.WEBHOOK_BACKOFF_MAX_SECONDS,
+            settings.WEBHOOK_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1)
+        )
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _worker(self) -> None:
+        while True:
+            delivery = await self._deliveries.get()
+            try:
+                await self._deliver(delivery)
+            except Exception as e:
+                print(f"⚠️  Warning: Error inesperado entregando webhook: {e}")
+            finally:
+                self._deliveries.task_done()
+
+    async def _deliver(self, delivery: _Delivery) -> None:
+        subscription = delivery.subscription
+        body = json.dumps({
+            "subscription_id": str(subscription["_id"]),
+            "sent_at": datetime.utcnow().isoformat(),
+            "events": delivery.events,
+        }, ensure_ascii=False).encode()
+
+        headers = {"Content-Type": "application/json"}
+        if subscription.get("secret"):
+            signature = hmac.new(subscription["secret"].encode(), body, hashlib.sha256).hexdigest()
+            headers["X-Webhook-Signature"] = f"sha256={signature}"
+
+        delivery.attempts += 1
+        retryable = True
+        try:
+            response = await self._client.post(subscription["url"], content=body, headers=headers)
+            delivery.last_status_code = response.status_code
+            if response.is_success:
+                self.stats["batches_sent"] += 1
+                self.stats["events_delivered"] += len(delivery.events)
+                return
+            delivery.last_error = f"HTTP {response.status_code}"
+            # Los 4xx (salvo 408/429) no se arreglan reintentando
+            retryable = response.status_code >= 500 or response.status_code in (408, 429)
+        except httpx.HTTPError as e:
+            delivery.last_error = f"{type(e).__name__}: {e}"
+
+        if retryable and delivery.attempts < settings.WEBHOOK_MAX_ATTEMPTS:
+            self._schedule_retry(delivery)
+        else:
+            await self._dead_letter(delivery)
+
+    def _schedule_retry(self, delivery: _Delivery) -> None:
+        """Reencolar el lote tras el backoff sin ocupar un worker esperando"""
+        self.stats["retries"] += 1
+        loop = asyncio.get_running_loop()
+
+        def _requeue():
+            self._retry_handles.pop(handle, None)
+            self._deliveries.put_nowait(delivery)
+
+        handle = loop.call_later(self._backoff(delivery.attempts), _requeue)
+        self._retry_handles[handle] = delivery
+
+    async def _dead_letter(self, delivery: _Delivery) -> None:
+        self.stats["dead_letters"] += 1
+        print(f"⚠️  Warning: Webhook a {delivery.subscription['url']} falló {delivery.attempts} veces: {delivery.last_error}")
+        _, dead_letter_crud = _cruds()
+        await dead_letter_crud.create(self._db, {
+            "subscription_id": delivery.subscription["_id"],
+            "url": delivery.subscription["url"],
+            "events": delivery.events,
+            "attempts": delivery.attempts,
+            "last_error": delivery.last_error,
+            "last_status_code": delivery.last_status_code,
+        })
+
+    async def redeliver(self, dead_letter: Dict[str, Any]) -> bool:
+        """Reencolar una entrega fallida (con la configuración actual de la suscripción)"""
+        if not self.running:
+            return False
+        subscription_crud, _ = _cruds()
+        subscription = await subscription_crud.get(self._db, str(dead_letter["subscription_id"]))
+        if not subscription:
+            return False
+        self._deliveries.put_nowait(_Delivery(subscription, dead_letter["events"]))
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores y tamaño de las colas"""
+        return {
+            **self.stats,
+            "running": self.running,
+            "queued_events": self._events.qsize() if self._events else 0,
+            "queued_deliveries": self._deliveries.qsize() if self._deliveries else 0,
+            "scheduled_retries": len(self._retry_handles),
+            "subscriptions_cached": len(self._subscriptions),
+        }
+
+
+# Instancia global
+webhook_dispatcher = WebhookDispatcher()
@@ -0,0 +1,60 @@
+"""
+Proceso de workers de la cola de trabajos.
+
+Uso:
+    python -m app.worker                  # JOBS_WORKER_CONCURRENCY workers
+    python -m app.worker --concurrency 8
+
+Toma trabajos de la colección jobs igual que los workers en proceso de la
+API; se pueden lanzar tantos procesos como se quiera. Para que la API no
+ejecute trabajos, configurar JOBS_INPROCESS_WORKERS=0.
+"""
+import argparse
+import asyncio
+import signal
+
+from app.core.config import settings
+from app.core.database import connect_to_mongo, close_mongo_connection, get_database
+from app.core.events import event_bus
+from app.services.webhooks import webhook_dispatcher
+from app.services.ai_cache import ai_cache
+from app.services.job_queue import job_worker_pool
+
+
+async def run(concurrency: int) -> None:
+    await connect_to_mongo()
+    db = await get_database()
+    await event_bus.start(db)
+    await webhook_dispatcher.start(db)
+    await job_worker_pool.start(db, concurrency)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await stop.wait()
+    finally:
+        print("🛑 Deteniendo workers...")
+        await job_worker_pool.stop()
+        await webhook_dispatcher.stop()
+        await event_bus.stop()
+        await ai_cache.close()
+        await close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Workers de la cola de trabajos")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.JOBS_WORKER_CONCURRENCY,
+        help="Número de trabajos en paralelo"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
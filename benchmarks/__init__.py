@@ -0,0 +1,5 @@
+"""
+Benchmarks de los endpoints de la API.
+
+Uso: python -m benchmarks.run --help (ver benchmarks/README.md)
+"""
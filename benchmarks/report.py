@@ -0,0 +1,157 @@
+"""Estadísticas por ruta, comparación con la línea base y tablas de resultados"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def percentile(ordered: List[float], value: float) -> float:
+    """Percentil con interpolación lineal sobre una lista ordenada"""
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * value / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(
+    latencies_ms: List[float],
+    elapsed_seconds: float,
+    errors: int,
+    statuses: Dict[str, int],
+    cpu_seconds: float = 0.0
+) -> Dict[str, Any]:
+    ordered = sorted(latencies_ms)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "statuses": statuses,
+        "rps": round(len(ordered) / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+        "cpu_ms": round(cpu_seconds * 1000 / len(ordered), 3) if ordered else 0.0,
+    }
+
+
+def load(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with path.open(encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save(path: Path, results: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+        file.write("\n")
+
+
+# Parámetros que deben coincidir para que la comparación tenga sentido
+COMPARABLE_META = ("database", "requirements", "projects", "concurrency", "requests")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """
+    Comparar cada ruta con la línea base. Es regresión si p95 sube o rps
+    baja más de threshold (proporción, p. ej. 0.1 = 10 %), o si aparecen
+    errores que antes no había.
+    """
+    mismatched = [
+        key for key in COMPARABLE_META
+        if current["meta"].get(key) != baseline["meta"].get(key)
+    ]
+    rows = []
+    for name, stats in current["routes"].items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            rows.append({"route": name, "status": "new"})
+            continue
+        p95_change = _change(before["p95_ms"], stats["p95_ms"])
+        rps_change = _change(before["rps"], stats["rps"])
+        regressed = (
+            p95_change > threshold
+            or rps_change < -threshold
+            or (stats["errors"] > 0 and before["errors"] == 0)
+        )
+        improved = p95_change < -threshold and rps_change > -threshold
+        rows.append({
+            "route": name,
+            "status": "regression" if regressed else "improved" if improved else "ok",
+            "p95_before_ms": before["p95_ms"],
+            "p95_ms": stats["p95_ms"],
+            "p95_change": round(p95_change, 4),
+            "rps_before": before["rps"],
+            "rps": stats["rps"],
+            "rps_change": round(rps_change, 4),
+            "cpu_before_ms": before.get("cpu_ms"),
+            "cpu_ms": stats.get("cpu_ms"),
+        })
+    missing = sorted(set(baseline["routes"]) - set(current["routes"]))
+    return {
+        "threshold": threshold,
+        "mismatched_meta": mismatched,
+        "routes": rows,
+        "missing": missing,
+        "regressions": [row["route"] for row in rows if row["status"] == "regression"],
+    }
+
+
+def _change(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    width = max((len(name) for name in results["routes"]), default=10)
+    print(
+        f"\n{'Ruta':<{width}}  {'rps':>9}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  "
+        f"{'CPU ms':>8}  {'errores':>7}"
+    )
+    for name, stats in results["routes"].items():
+        print(
+            f"{name:<{width}}  {stats['rps']:>9.1f}  {stats['p50_ms']:>9.2f}  "
+            f"{stats['p95_ms']:>9.2f}  {stats['p99_ms']:>9.2f}  {stats.get('cpu_ms', 0.0):>8.3f}  {stats['errors']:>7}"
+        )
+    for name, error in results.get("failed", {}).items():
+        print(f"❌ {name}: no se pudo medir ({error})")
+
+
+def print_comparison(comparison: Dict[str, Any]) -> None:
+    if comparison["mismatched_meta"]:
+        print(
+            "\n⚠️  Warning: la línea base se midió con otros parámetros "
+            f"({', '.join(comparison['mismatched_meta'])}); la comparación es orientativa"
+        )
+    rows = [row for row in comparison["routes"] if row["status"] != "new"]
+    width = max((len(row["route"]) for row in rows), default=10)
+    marks = {"regression": "❌", "improved": "✅", "ok": "  "}
+    print(
+        f"\n   {'Ruta':<{width}}  {'p95 antes':>10}  {'p95':>9}  {'Δp95':>7}  {'rps antes':>10}  {'rps':>9}  {'Δrps':>7}"
+        f"  {'CPU antes':>10}  {'CPU ms':>8}"
+    )
+    for row in rows:
+        cpu_before = _ms(row.get("cpu_before_ms"))
+        cpu = _ms(row.get("cpu_ms"))
+        print(
+            f"{marks[row['status']]} {row['route']:<{width}}  {row['p95_before_ms']:>10.2f}  {row['p95_ms']:>9.2f}  "
+            f"{row['p95_change']:>+7.1%}  {row['rps_before']:>10.1f}  {row['rps']:>9.1f}  {row['rps_change']:>+7.1%}"
+            f"  {cpu_before:>10}  {cpu:>8}"
+        )
+    for row in comparison["routes"]:
+        if row["status"] == "new":
+            print(f"🆕 {row['route']} (sin línea base)")
+    for name in comparison["missing"]:
+        print(f"⚠️  {name}: está en la línea base pero no se midió")
+    if comparison["regressions"]:
+        print(f"\n❌ {len(comparison['regressions'])} rutas con regresión (umbral {comparison['threshold']:.0%})")
+    else:
+        print(f"\n✅ Sin regresiones (umbral {comparison['threshold']:.0%})")
@@ -0,0 +1,261 @@
+"""
+Benchmark de los endpoints de la API.
+
+Uso:
+    python -m benchmarks.run                           # MongoDB local, BD v1tr0_bench
+    python -m benchmarks.run --requirements 1000000 --concurrency 32
+    python -m benchmarks.run --routes requirements --requests 500
+    python -m benchmarks.run --in-memory --requirements 5000   # sin MongoDB (mongomock-motor)
+    python -m benchmarks.run --save-baseline           # guardar como nueva línea base
+
+Siembra la base de datos, recorre cada ruta de la API con un cliente httpx
+sobre la app ASGI (sin red) a concurrencia fija y guarda p50/p95/p99 y
+peticiones por segundo en JSON. Si hay línea base, informa de las
+regresiones por ruta.
+
+El procesamiento con IA usa el LLM simulado (LLM_BACKEND=fake) con latencia
+fija, y los workers de la cola no corren en proceso: se mide la API, no el
+modelo.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de los endpoints de la API")
+    parser.add_argument("--mongo-url", default=None, help="URL de MongoDB (por defecto MONGODB_URL)")
+    parser.add_argument("--db", default="v1tr0_bench", help="Base de datos del benchmark (se vacía al sembrar)")
+    parser.add_argument("--in-memory", action="store_true", help="Usar mongomock-motor en lugar de MongoDB")
+    parser.add_argument("--requirements", type=int, default=100_000)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reseed", action="store_true", help="Volver a sembrar aunque los datos coincidan")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones medidas por ruta")
+    parser.add_argument("--warmup", type=int, default=10, help="Peticiones de calentamiento por ruta")
+    parser.add_argument("--routes", default=None, help="Expresión regular sobre el nombre de la ruta")
+    parser.add_argument("--llm-latency-ms", type=float, default=50, help="Latencia del LLM simulado")
+    parser.add_argument("--output", type=Path, default=BENCH_DIR / "results" / "latest.json")
+    parser.add_argument("--baseline", type=Path, default=BENCH_DIR / "baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar el resultado como línea base")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Umbral de regresión (0.10 = 10 %%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Salir con código 1 si hay regresiones")
+    parser.add_argument(
+        "--allow-any-db",
+        action="store_true",
+        help="Permitir una base de datos cuyo nombre no contenga 'bench' (se vacía)"
+    )
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Configuración de la app para el benchmark (antes de importarla)"""
+    os.environ["MONGODB_DB"] = args.db
+    if args.mongo_url:
+        os.environ["MONGODB_URL"] = args.mongo_url
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_DISTRIBUTION"] = "fixed"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["FAKE_LLM_RATE_LIMIT_RATE"] = "0"
+    os.environ["FAKE_LLM_ERROR_RATE"] = "0"
+    os.environ["JOBS_INPROCESS_WORKERS"] = "0"
+    os.environ["WEBHOOK_MAX_ATTEMPTS"] = "1"
+
+
+@asynccontextmanager
+async def running_app(in_memory: bool):
+    """La app arrancada como en producción (lifespan) o sobre mongomock"""
+    import main
+    from app.core import database
+    from app.core.events import event_bus
+    from app.services.webhooks import webhook_dispatcher
+
+    if not in_memory:
+        async with main.app.router.lifespan_context(main.app):
+            yield main.app
+        return
+
+    from mongomock_motor import AsyncMongoMockClient
+
+    database.mongodb_client = AsyncMongoMockClient()
+    database._replicated = False
+    db = await database.get_database()
+    await event_bus.start(db)
+    await webhook_dispatcher.start(db)
+    try:
+        yield main.app
+    finally:
+        await webhook_dispatcher.stop()
+        await event_bus.stop()
+
+
+async def run_scenario(client, db, context, scenario, args: argparse.Namespace) -> Dict[str, Any]:
+    from benchmarks.report import summarize
+
+    total = args.warmup + args.requests
+    fixtures = await scenario.prepare(db, context, total) if scenario.prepare else None
+
+    def build(index: int):
+        fixture = fixtures[index] if fixtures is not None else None
+        spec = scenario.request(context, index, fixture)
+        return scenario.route.format(**spec.get("path", {})), spec
+
+    async def send(index: int):
+        url, spec = build(index)
+        started = time.perf_counter()
+        try:
+            response = await client.request(scenario.method, url, params=spec.get("params"), json=spec.get("json"))
+            status, ok = str(response.status_code), response.status_code < 400
+        except Exception as e:
+            status, ok = type(e).__name__, False
+        return (time.perf_counter() - started) * 1000, status, ok
+
+    for index in range(args.warmup):
+        await send(index)
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    counter = itertools.count(args.warmup)
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            if index >= total:
+                return
+            latency, status, ok = await send(index)
+            latencies.append(latency)
+            statuses[status] = statuses.get(status, 0) + 1
+            errors += 0 if ok else 1
+
+    # CPU del proceso (app + cliente + driver): sirve para comparar
+    # ejecuciones entre sí, no como coste absoluto de la ruta
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+    return summarize(
+        latencies, time.perf_counter() - started, errors, statuses,
+        cpu_seconds=time.process_time() - cpu_started
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR.parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args: argparse.Namespace) -> int:
+    import httpx
+    from app.core.config import settings
+    from app.core.database import get_database
+    from benchmarks import report
+    from benchmarks.scenarios import SCENARIOS, SKIPPED, check_coverage
+    from benchmarks.seed import seed
+
+    async with running_app(args.in_memory) as app:
+        db = await get_database()
+        missing = check_coverage(app, SCENARIOS)
+        for route in missing:
+            print(f"⚠️  Warning: ruta sin escenario de benchmark: {route}")
+        for (method, path), reason in SKIPPED.items():
+            print(f"⏭️  {method} {path}: {reason}")
+
+        context = await seed(db, args.requirements, args.projects, args.seed, force=args.reseed or args.in_memory)
+
+        scenarios = SCENARIOS
+        if args.routes:
+            pattern = re.compile(args.routes)
+            scenarios = [scenario for scenario in SCENARIOS if pattern.search(scenario.name)]
+
+        server_version = None
+        if not args.in_memory:
+            server_version = (await db.command("buildInfo")).get("version")
+
+        results: Dict[str, Any] = {
+            "meta": {
+                "timestamp": datetime.utcnow().isoformat(),
+                "git_commit": _git_commit(),
+                "python": platform.python_version(),
+                "database": "memory" if args.in_memory else "mongodb",
+                "mongodb_version": server_version,
+                "requirements": args.requirements,
+                "projects": args.projects,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "warmup": args.warmup,
+                "llm_latency_ms": args.llm_latency_ms,
+                "fast_responses": settings.FAST_RESPONSES,
+                "raw_bson_reads": settings.RAW_BSON_READS,
+            },
+            "routes": {},
+            # Escenarios que no se pudieron medir (p. ej. operadores que
+            # mongomock no implementa)
+            "failed": {},
+        }
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost", timeout=None) as client:
+            for scenario in scenarios:
+                try:
+                    stats = await run_scenario(client, db, context, scenario, args)
+                except Exception as e:
+                    results["failed"][scenario.name] = str(e)
+                    print(f"❌ {scenario.name}: no se pudo medir: {e}")
+                    continue
+                results["routes"][scenario.name] = stats
+                print(
+                    f"⏱️  {scenario.name}: {stats['rps']:.1f} req/s, "
+                    f"p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms"
+                    + (f", {stats['errors']} errores {stats['statuses']}" if stats["errors"] else "")
+                )
+
+    report.print_results(results)
+    report.save(args.output, results)
+    print(f"\n💾 Resultados en {args.output}")
+
+    exit_code = 0
+    baseline = report.load(args.baseline)
+    if baseline and not args.save_baseline:
+        comparison = report.compare(results, baseline, args.threshold)
+        report.print_comparison(comparison)
+        results["comparison"] = comparison
+        report.save(args.output, results)
+        if comparison["regressions"] and args.fail_on_regression:
+            exit_code = 1
+    elif not baseline:
+        print(f"ℹ️  Sin línea base en {args.baseline} (usar --save-baseline)")
+
+    if args.save_baseline:
+        report.save(args.baseline, results)
+        print(f"📌 Línea base guardada en {args.baseline}")
+    return exit_code
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if not args.in_memory and "bench" not in args.db and not args.allow_any_db:
+        print(f"❌ La base de datos '{args.db}' se vacía al sembrar; usa un nombre con 'bench' o --allow-any-db")
+        sys.exit(2)
+    configure_environment(args)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Escenarios del benchmark: una petición representativa por ruta.
+
+Cada escenario construye la petición i-ésima a partir de los datos
+sembrados. Las rutas que modifican o borran un documento concreto tienen
+prepare(), que crea antes de medir (con los CRUD, para que contadores y
+avance queden coherentes) un documento por petición.
+
+check_coverage() compara los escenarios con las rutas de la app: una ruta
+nueva sin escenario (ni motivo en SKIPPED) se avisa al ejecutar.
+"""
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.crud import (
+    job_crud,
+    meeting_crud,
+    phase_comment_crud,
+    project_phase_crud,
+    requirement_crud,
+    transcription_crud,
+    webhook_dead_letter_crud,
+    webhook_subscription_crud,
+)
+from app.schemas.meeting import MeetingCreate
+from app.schemas.phase_comment import PhaseCommentCreate
+from app.schemas.project_phase import ProjectPhaseCreate
+from app.schemas.requirement import RequirementCreate
+from app.schemas.transcription import TranscriptionCreate
+from app.schemas.webhook import WebhookSubscriptionCreate
+from benchmarks.seed import (
+    MEETING_STATUSES,
+    PHASE_STATUSES,
+    REQUIREMENT_STATUSES,
+    SeedContext,
+    requirement_text,
+    transcription_text,
+)
+
+API = settings.API_V1_STR
+BULK_SIZE = 100
+
+Request = Dict[str, Any]
+Prepare = Callable[[AsyncIOMotorDatabase, SeedContext, int], Awaitable[List[Any]]]
+
+
+@dataclass
+class Scenario:
+    method: str
+    route: str
+    # (contexto, índice de la petición, documento preparado) -> path/params/json
+    request: Callable[[SeedContext, int, Any], Request]
+    prepare: Optional[Prepare] = None
+    variant: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        name = f"{self.method} {self.route}"
+        return f"{name} [{self.variant}]" if self.variant else name
+
+
+# Rutas que no se miden y por qué
+SKIPPED: Dict[Tuple[str, str], str] = {
+    ("GET", f"{API}/events/stream"): "stream SSE sin fin: no hay latencia por petición",
+}
+
+
+def _requirement_in(context: SeedContext, index: int) -> Dict[str, Any]:
+    rng = random.Random(index)
+    return {
+        "project_id": context.project(index),
+        "phase_id": context.phase(index),
+        **requirement_text(rng),
+        "priority": rng.choice(["low", "medium", "high"]),
+    }
+
+
+def _str_ids(documents: List[dict]) -> List[str]:
+    return [str(document["_id"]) for document in documents]
+
+
+# Preparación de documentos (uno por petición)
+
+async def _prepare_meetings(db, context, count):
+    return _str_ids([
+        await meeting_crud.create(db, MeetingCreate(
+            title=f"Reunión a borrar {index}",
+            project_id=context.project(index),
+            scheduled_at=datetime.utcnow() + timedelta(days=1)
+        ))
+        for index in range(count)
+    ])
+
+
+async def _prepare_transcriptions(db, context, count):
+    return _str_ids([
+        await transcription_crud.create(db, TranscriptionCreate(
+            transcription_text=transcription_text(random.Random(f"bench-{index}-{datetime.utcnow()}"), turns=20),
+            user_email="bench@example.com",
+            project_id=context.project(index)
+        ))
+        for index in range(count)
+    ])
+
+
+async def _prepare_phases(db, context, count):
+    return _str_ids([
+        await project_phase_crud.create(db, ProjectPhaseCreate(
+            project_id=context.project(index),
+            name=f"Fase a borrar {index}",
+            order=100 + index
+        ))
+        for index in range(count)
+    ])
+
+
+async def _prepare_requirements(db, context, count):
+    results = await requirement_crud.create_many(
+        db, [RequirementCreate(**_requirement_in(context, index)) for index in range(count)]
+    )
+    return [str(result["id"]) for result in results if result.get("status") == "created"]
+
+
+async def _prepare_requirement_batches(db, context, count):
+    ids = await _prepare_requirements(db, context, count * BULK_SIZE)
+    return [ids[index * BULK_SIZE:(index + 1) * BULK_SIZE] for index in range(count)]
+
+
+async def _prepare_comments(db, context, count):
+    return _str_ids([
+        await phase_comment_crud.create(db, PhaseCommentCreate(
+            phase_id=context.phase(index),
+            project_id=context.project(index),
+            user_email="bench@example.com",
+            comment=f"Comentario a borrar {index}"
+        ))
+        for index in range(count)
+    ])
+
+
+async def _prepare_webhooks(db, context, count):
+    return _str_ids([
+        await webhook_subscription_crud.create(db, WebhookSubscriptionCreate(
+            url=f"http://127.0.0.1:9/bench/delete/{index}",
+            events=["bench.none"]
+        ))
+        for index in range(count)
+    ])
+
+
+async def _prepare_dead_letters(db, context, count):
+    return _str_ids([
+        await webhook_dead_letter_crud.create(db, {
+            "subscription_id": ObjectId(context.webhook_ids[0]),
+            "url": "http://127.0.0.1:9/bench",
+            "events": [{"type": "bench.none", "data": {}}],
+            "attempts": 1,
+            "last_error": "bench",
+            "last_status_code": None,
+        })
+        for _ in range(count)
+    ])
+
+
+async def _prepare_jobs(db, context, count):
+    return _str_ids([await job_crud.enqueue(db, "bench.noop", {"index": index}) for index in range(count)])
+
+
+def _path(**params: str) -> Request:
+    return {"path": params}
+
+
+SCENARIOS: List[Scenario] = [
+    # Salud
+    Scenario("GET", "/", lambda c, i, f: {}),
+    Scenario("GET", "/health", lambda c, i, f: {}),
+
+    # Reuniones
+    Scenario("POST", f"{API}/meetings/", lambda c, i, f: {"json": {
+        "title": f"Reunión bench {i}",
+        "project_id": c.project(i),
+        "scheduled_at": (datetime.utcnow() + timedelta(days=i % 30)).isoformat(),
+        "agenda": ["Estado", "Riesgos"],
+    }}),
+    Scenario("GET", f"{API}/meetings/", lambda c, i, f: {"params": {"project_id": c.project(i)}}),
+    Scenario("GET", f"{API}/meetings/{{meeting_id}}", lambda c, i, f: _path(meeting_id=c.meeting_ids[i % len(c.meeting_ids)])),
+    Scenario("PUT", f"{API}/meetings/{{meeting_id}}", lambda c, i, f: {
+        **_path(meeting_id=c.meeting_ids[i % len(c.meeting_ids)]),
+        "json": {"notes": f"Notas actualizadas {i}"},
+    }),
+    Scenario("DELETE", f"{API}/meetings/{{meeting_id}}", lambda c, i, f: _path(meeting_id=f), _prepare_meetings),
+    Scenario("PATCH", f"{API}/meetings/{{meeting_id}}/status", lambda c, i, f: {
+        **_path(meeting_id=c.meeting_ids[i % len(c.meeting_ids)]),
+        "params": {"status": MEETING_STATUSES[i % len(MEETING_STATUSES)]},
+    }),
+
+    # Transcripciones
+    Scenario("POST", f"{API}/transcriptions/", lambda c, i, f: {"json": {
+        "transcription_text": transcription_text(random.Random(i), turns=10),
+        "user_email": "bench@example.com",
+        "project_id": c.project(i),
+    }}),
+    Scenario("GET", f"{API}/transcriptions/", lambda c, i, f: {"params": {"project_id": c.project(i)}}),
+    Scenario("GET", f"{API}/transcriptions/export", lambda c, i, f: {"params": {"project_id": c.project(i)}}),
+    Scenario("GET", f"{API}/transcriptions/{{transcription_id}}", lambda c, i, f: _path(
+        transcription_id=c.transcription_ids[i % len(c.transcription_ids)]
+    )),
+    Scenario("PUT", f"{API}/transcriptions/{{transcription_id}}", lambda c, i, f: {
+        **_path(transcription_id=c.transcription_ids[i % len(c.transcription_ids)]),
+        "json": {"language": "es"},
+    }),
+    Scenario("DELETE", f"{API}/transcriptions/{{transcription_id}}", lambda c, i, f: _path(transcription_id=f),
+             _prepare_transcriptions),
+    Scenario("POST", f"{API}/transcriptions/{{transcription_id}}/process", lambda c, i, f: {
+        **_path(transcription_id=f), "json": {},
+    }, _prepare_transcriptions),
+    Scenario("POST", f"{API}/transcriptions/{{transcription_id}}/process/stream", lambda c, i, f: {
+        **_path(transcription_id=f), "json": {},
+    }, _prepare_transcriptions),
+
+    # Fases
+    Scenario("POST", f"{API}/project-phases/", lambda c, i, f: {"json": {
+        "project_id": c.project(i), "name": f"Fase bench {i}", "order": 10 + i,
+    }}),
+    Scenario("GET", f"{API}/project-phases/", lambda c, i, f: {"params": {"project_id": c.project(i)}}),
+    Scenario("GET", f"{API}/project-phases/project/{{project_id}}", lambda c, i, f: _path(project_id=c.project(i))),
+    Scenario("GET", f"{API}/project-phases/{{phase_id}}", lambda c, i, f: _path(phase_id=c.phase(i))),
+    Scenario("PUT", f"{API}/project-phases/{{phase_id}}", lambda c, i, f: {
+        **_path(phase_id=c.phase(i)), "json": {"description": f"Descripción actualizada {i}"},
+    }),
+    Scenario("DELETE", f"{API}/project-phases/{{phase_id}}", lambda c, i, f: _path(phase_id=f), _prepare_phases),
+    Scenario("PATCH", f"{API}/project-phases/{{phase_id}}/status", lambda c, i, f: {
+        **_path(phase_id=c.phase(i)), "params": {"status": PHASE_STATUSES[i % len(PHASE_STATUSES)]},
+    }),
+    Scenario("PATCH", f"{API}/project-phases/{{phase_id}}/completion", lambda c, i, f: {
+        **_path(phase_id=c.phase(i)), "params": {"completion": (i * 7) % 101},
+    }),
+    Scenario("POST", f"{API}/project-phases/reorder", lambda c, i, f: {
+        "params": {"project_id": c.project(i)},
+        "json": {"phase_orders": [
+            {"phase_id": phase_id, "order": order}
+            for order, phase_id in enumerate(
+                c.phase_ids[c.project(i)] if i % 2 == 0 else reversed(c.phase_ids[c.project(i)]),
+                start=1
+            )
+        ]},
+    }),
+
+    # Requerimientos
+    Scenario("POST", f"{API}/requirements/", lambda c, i, f: {"json": _requirement_in(c, i)}),
+    Scenario("POST", f"{API}/requirements/bulk", lambda c, i, f: {"json": {
+        "items": [_requirement_in(c, i * BULK_SIZE + k) for k in range(BULK_SIZE)],
+    }}),
+    Scenario("PATCH", f"{API}/requirements/bulk/status", lambda c, i, f: {"json": {
+        "ids": c.requirements(i)[:BULK_SIZE],
+        "status": REQUIREMENT_STATUSES[i % len(REQUIREMENT_STATUSES)],
+    }}),
+    Scenario("PATCH", f"{API}/requirements/bulk/move", lambda c, i, f: {"json": {
+        "ids": c.requirements(i)[:BULK_SIZE],
+        "new_phase_id": c.other_phase(i),
+    }}),
+    Scenario("DELETE", f"{API}/requirements/bulk", lambda c, i, f: {"json": {"ids": f}},
+             _prepare_requirement_batches),
+    Scenario("GET", f"{API}/requirements/", lambda c, i, f: {"params": {"project_id": c.project(i)}},
+             variant="project"),
+    Scenario("GET", f"{API}/requirements/", lambda c, i, f: {"params": {
+        "phase_id": c.phase(i), "status": REQUIREMENT_STATUSES[i % len(REQUIREMENT_STATUSES)],
+    }}, variant="phase+status"),
+    Scenario("GET", f"{API}/requirements/", lambda c, i, f: {"params": {
+        "project_id": c.project(i), "skip": 1000,
+    }}, variant="skip=1000"),
+    Scenario("GET", f"{API}/requirements/export", lambda c, i, f: {"params": {"phase_id": c.phase(i)}}),
+    Scenario("GET", f"{API}/requirements/phase/{{phase_id}}", lambda c, i, f: _path(phase_id=c.phase(i))),
+    Scenario("GET", f"{API}/requirements/{{requirement_id}}", lambda c, i, f: _path(requirement_id=c.requirement(i))),
+    Scenario("PUT", f"{API}/requirements/{{requirement_id}}", lambda c, i, f: {
+        **_path(requirement_id=c.requirement(i)),
+        "json": {"description": f"Descripción revisada {i}", "user_edited": True},
+    }),
+    Scenario("DELETE", f"{API}/requirements/{{requirement_id}}", lambda c, i, f: _path(requirement_id=f),
+             _prepare_requirements),
+    Scenario("PATCH", f"{API}/requirements/{{requirement_id}}/status", lambda c, i, f: {
+        **_path(requirement_id=c.requirement(i)),
+        "params": {"status": REQUIREMENT_STATUSES[i % len(REQUIREMENT_STATUSES)]},
+    }),
+    Scenario("PATCH", f"{API}/requirements/{{requirement_id}}/move", lambda c, i, f: {
+        **_path(requirement_id=c.requirement(i)),
+        "params": {"new_phase_id": c.other_phase(i)},
+    }),
+
+    # Comentarios de fases
+    Scenario("POST", f"{API}/phase-comments/", lambda c, i, f: {"json": {
+        "phase_id": c.phase(i), "project_id": c.project(i),
+        "user_email": "bench@example.com", "comment": f"Comentario bench {i}",
+    }}),
+    Scenario("GET", f"{API}/phase-comments/", lambda c, i, f: {"params": {"phase_id": c.phase(i)}}),
+    Scenario("GET", f"{API}/phase-comments/export", lambda c, i, f: {"params": {"project_id": c.project(i)}}),
+    Scenario("GET", f"{API}/phase-comments/phase/{{phase_id}}", lambda c, i, f: _path(phase_id=c.phase(i))),
+    Scenario("GET", f"{API}/phase-comments/{{comment_id}}", lambda c, i, f: _path(
+        comment_id=c.comment_ids[i % len(c.comment_ids)]
+    )),
+    Scenario("PUT", f"{API}/phase-comments/{{comment_id}}", lambda c, i, f: {
+        **_path(comment_id=c.comment_ids[i % len(c.comment_ids)]),
+        "json": {"comment": f"Comentario editado {i}"},
+    }),
+    Scenario("DELETE", f"{API}/phase-comments/{{comment_id}}", lambda c, i, f: _path(comment_id=f),
+             _prepare_comments),
+
+    # Proyectos, búsqueda y trabajos
+    Scenario("GET", f"{API}/projects/{{project_id}}/summary", lambda c, i, f: _path(project_id=c.project(i))),
+    Scenario("GET", f"{API}/search/", lambda c, i, f: {"params": {
+        "q": random.Random(i).choice(["facturas", "exportar pdf", "usuarios sso", "pagos auditoría"]),
+        "project_id": c.project(i),
+    }}, variant="project"),
+    Scenario("GET", f"{API}/search/", lambda c, i, f: {"params": {
+        "q": random.Random(i).choice(["facturas", "exportar pdf", "usuarios sso", "pagos auditoría"]),
+    }}, variant="global"),
+    Scenario("GET", f"{API}/jobs/{{job_id}}", lambda c, i, f: _path(job_id=f), _prepare_jobs),
+
+    # Métricas
+    Scenario("GET", f"{API}/metrics/db-pool", lambda c, i, f: {}),
+    Scenario("GET", f"{API}/metrics/webhooks", lambda c, i, f: {}),
+    Scenario("GET", f"{API}/metrics/ai-cache", lambda c, i, f: {}),
+    Scenario("GET", f"{API}/metrics/openai", lambda c, i, f: {}),
+    Scenario("GET", f"{API}/metrics/jobs", lambda c, i, f: {}),
+
+    # Webhooks
+    Scenario("POST", f"{API}/webhooks/", lambda c, i, f: {"json": {
+        "url": f"http://127.0.0.1:9/bench/{i}", "events": ["bench.none"],
+    }}),
+    Scenario("GET", f"{API}/webhooks/", lambda c, i, f: {}),
+    Scenario("GET", f"{API}/webhooks/dead-letters", lambda c, i, f: {}),
+    Scenario("POST", f"{API}/webhooks/dead-letters/{{dead_letter_id}}/retry", lambda c, i, f: _path(dead_letter_id=f),
+             _prepare_dead_letters),
+    Scenario("GET", f"{API}/webhooks/{{subscription_id}}", lambda c, i, f: _path(
+        subscription_id=c.webhook_ids[i % len(c.webhook_ids)]
+    )),
+    Scenario("PUT", f"{API}/webhooks/{{subscription_id}}", lambda c, i, f: {
+        **_path(subscription_id=c.webhook_ids[i % len(c.webhook_ids)]),
+        "json": {"description": f"Actualizada {i}"},
+    }),
+    Scenario("DELETE", f"{API}/webhooks/{{subscription_id}}", lambda c, i, f: _path(subscription_id=f),
+             _prepare_webhooks),
+]
+
+
+def check_coverage(app: FastAPI, scenarios: List[Scenario]) -> List[str]:
+    """Rutas de la app sin escenario ni motivo en SKIPPED"""
+    covered = {(scenario.method, scenario.route) for scenario in scenarios}
+    missing = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in sorted(route.methods):
+            if (method, route.path) not in covered and (method, route.path) not in SKIPPED:
+                missing.append(f"{method} {route.path}")
+    return missing
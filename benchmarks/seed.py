@@ -0,0 +1,322 @@
+"""
+Datos de prueba con volúmenes realistas.
+
+Los documentos se insertan directamente con insert_many (con la misma
+forma que crean los CRUD) para poder cargar 10^5-10^6 requerimientos en
+poco tiempo; después se reconstruyen los contadores por proyecto y el
+avance de cada proyecto como lo haría manage.py.
+
+Los parámetros del sembrado se guardan en la colección _bench_meta: si
+coinciden con los de la siguiente ejecución los datos se reutilizan.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.crud import CRUD_REGISTRY, project_phase_crud, project_summary_crud
+
+META_COLLECTION = "_bench_meta"
+BATCH_SIZE = 10000
+# Ids por tipo que se cargan en el contexto para las peticiones de lectura
+SAMPLE_SIZE = 5000
+
+PHASE_NAMES = ["Análisis", "Diseño", "Desarrollo", "Testing", "Despliegue"]
+PHASE_STATUSES = ["pending", "in_progress", "completed", "blocked"]
+REQUIREMENT_TYPES = ["functional", "non_functional", "technical", "business"]
+PRIORITIES = ["low", "medium", "high", "critical"]
+REQUIREMENT_STATUSES = ["pending", "in_progress", "completed", "rejected"]
+MEETING_STATUSES = ["scheduled", "in_progress", "completed", "cancelled"]
+PEOPLE = ["Ana", "Luis", "María", "Jorge", "Lucía", "Pedro", "Sofía", "Diego"]
+
+_ACTIONS = [
+    "exportar", "importar", "filtrar", "aprobar", "notificar", "sincronizar",
+    "auditar", "validar", "archivar", "buscar", "calcular", "firmar",
+]
+_OBJECTS = [
+    "facturas", "usuarios", "reportes mensuales", "pedidos", "contratos",
+    "inventario", "pagos", "clientes", "tickets de soporte", "presupuestos",
+]
+_CONDITIONS = [
+    "desde el panel de administración", "en menos de dos segundos",
+    "con autenticación SSO corporativa", "desde la app móvil",
+    "respetando los permisos por rol", "con registro de auditoría",
+    "en formato PDF y Excel", "sin conexión a internet",
+]
+
+
+@dataclass
+class SeedContext:
+    """Ids disponibles para construir las peticiones"""
+    project_ids: List[str] = field(default_factory=list)
+    phase_ids: Dict[str, List[str]] = field(default_factory=dict)
+    requirement_ids: Dict[str, List[str]] = field(default_factory=dict)
+    transcription_ids: List[str] = field(default_factory=list)
+    meeting_ids: List[str] = field(default_factory=list)
+    comment_ids: List[str] = field(default_factory=list)
+    webhook_ids: List[str] = field(default_factory=list)
+
+    def project(self, index: int) -> str:
+        return self.project_ids[index % len(self.project_ids)]
+
+    def phase(self, index: int) -> str:
+        phases = self.phase_ids[self.project(index)]
+        return phases[index % len(phases)]
+
+    def other_phase(self, index: int) -> str:
+        """Otra fase del mismo proyecto que phase(index)"""
+        phases = self.phase_ids[self.project(index)]
+        return phases[(index + 1) % len(phases)]
+
+    def requirements(self, index: int) -> List[str]:
+        """Requerimientos de muestra del proyecto project(index)"""
+        return self.requirement_ids.get(self.project(index)) or []
+
+    def requirement(self, index: int) -> str:
+        requirements = self.requirements(index)
+        return requirements[(index // len(self.project_ids)) % len(requirements)]
+
+
+def requirement_text(rng: random.Random) -> Dict[str, str]:
+    action, obj, condition = rng.choice(_ACTIONS), rng.choice(_OBJECTS), rng.choice(_CONDITIONS)
+    return {
+        "title": f"Permitir {action} {obj}",
+        "description": f"El sistema debe permitir {action} {obj} {condition}.",
+    }
+
+
+def transcription_text(rng: random.Random, turns: int = 40) -> str:
+    """Transcripción con el formato de Teams ("Nombre  0:05" + texto)"""
+    lines = []
+    for turn in range(turns):
+        text = requirement_text(rng)["description"]
+        lines.append(f"{rng.choice(PEOPLE)}  {turn // 2}:{(turn * 17) % 60:02d}")
+        lines.append(f"Necesitamos que {text[0].lower()}{text[1:]} También hay que revisarlo con el cliente.")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _batches(documents: Iterator[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _insert(db: AsyncIOMotorDatabase, collection: str, documents: Iterator[Dict[str, Any]]) -> int:
+    inserted = 0
+    for batch in _batches(documents):
+        await db[collection].insert_many(batch, ordered=False)
+        inserted += len(batch)
+    return inserted
+
+
+def _params(requirements: int, projects: int, seed: int) -> Dict[str, int]:
+    return {"requirements": requirements, "projects": projects, "seed": seed}
+
+
+async def _drop(db: AsyncIOMotorDatabase) -> None:
+    collections = {crud.collection_name for crud in CRUD_REGISTRY}
+    collections |= {"projects", project_summary_crud.collection_name, META_COLLECTION}
+    for name in collections:
+        # delete_many y no drop: los índices creados al arrancar se conservan
+        await db[name].delete_many({})
+
+
+async def seed(
+    db: AsyncIOMotorDatabase,
+    requirements: int,
+    projects: int,
+    seed: int = 42,
+    force: bool = False
+) -> SeedContext:
+    """Sembrar la base de datos (o reutilizar lo sembrado con los mismos parámetros)"""
+    params = _params(requirements, projects, seed)
+    meta = await db[META_COLLECTION].find_one({"_id": "seed"})
+    if meta and not force and meta.get("params") == params:
+        print(f"♻️  Reutilizando datos sembrados: {params}")
+        return await load_context(db)
+
+    print(f"🌱 Sembrando {requirements} requerimientos en {projects} proyectos...")
+    await _drop(db)
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    project_ids = [ObjectId() for _ in range(projects)]
+    await _insert(db, "projects", (
+        {
+            "_id": project_id,
+            "title": f"Proyecto {index + 1}",
+            "status": "in-progress",
+            "priority": rng.choice(["low", "medium", "high"]),
+            "is_active": True,
+            "completion_percentage": 0,
+            "created_at": now - timedelta(days=365),
+        }
+        for index, project_id in enumerate(project_ids)
+    ))
+
+    phases: Dict[ObjectId, List[ObjectId]] = {project_id: [] for project_id in project_ids}
+
+    def phase_documents():
+        for project_id in project_ids:
+            for order, name in enumerate(PHASE_NAMES, start=1):
+                status = rng.choice(PHASE_STATUSES)
+                phase_id = ObjectId()
+                phases[project_id].append(phase_id)
+                yield {
+                    "_id": phase_id,
+                    "project_id": project_id,
+                    "name": name,
+                    "description": f"Fase de {name.lower()} del proyecto",
+                    "order": order,
+                    "status": status,
+                    "weight": float(rng.choice([1, 1, 2, 3])),
+                    "completion_percentage": 100 if status == "completed" else rng.randint(0, 90),
+                    "start_date": now - timedelta(days=300 - order * 40),
+                    "end_date": now - timedelta(days=260 - order * 40),
+                    "created_at": now - timedelta(days=300),
+                    "updated_at": now - timedelta(days=rng.randint(0, 60)),
+                }
+
+    await _insert(db, "project_phases", phase_documents())
+
+    transcription_ids: List[ObjectId] = []
+    meeting_ids: List[ObjectId] = []
+
+    def meeting_documents():
+        for project_id in project_ids:
+            for index in range(10):
+                meeting_id = ObjectId()
+                meeting_ids.append(meeting_id)
+                yield {
+                    "_id": meeting_id,
+                    "title": f"Reunión de seguimiento {index + 1}",
+                    "project_id": project_id,
+                    "scheduled_at": now - timedelta(days=7 * index),
+                    "duration_minutes": 60,
+                    "status": rng.choice(MEETING_STATUSES),
+                    "participant_ids": [],
+                    "agenda": ["Estado del proyecto", "Nuevos requerimientos"],
+                    "action_items": [],
+                    "created_at": now - timedelta(days=7 * index + 1),
+                    "updated_at": now - timedelta(days=7 * index),
+                }
+
+    await _insert(db, "meetings", meeting_documents())
+
+    def transcription_documents():
+        for meeting_id, project_id in zip(meeting_ids, (p for p in project_ids for _ in range(10))):
+            transcription_id = ObjectId()
+            transcription_ids.append(transcription_id)
+            yield {
+                "_id": transcription_id,
+                "transcription_text": transcription_text(rng),
+                "user_email": f"{rng.choice(PEOPLE).lower()}@example.com",
+                "meeting_id": meeting_id,
+                "project_id": project_id,
+                "language": "es",
+                "source": "teams",
+                "status": "completed",
+                "created_at": now - timedelta(days=rng.randint(0, 365)),
+                "updated_at": now,
+            }
+
+    await _insert(db, "transcriptions", transcription_documents())
+
+    def requirement_documents():
+        for index in range(requirements):
+            project_id = project_ids[index % projects]
+            created_at = now - timedelta(minutes=requirements - index)
+            yield {
+                "project_id": project_id,
+                "phase_id": rng.choice(phases[project_id]),
+                "transcription_id": rng.choice(transcription_ids) if rng.random() < 0.7 else None,
+                **requirement_text(rng),
+                "type": rng.choice(REQUIREMENT_TYPES),
+                "priority": rng.choice(PRIORITIES),
+                "status": rng.choice(REQUIREMENT_STATUSES),
+                "extracted_by_ai": rng.random() < 0.7,
+                "user_edited": rng.random() < 0.2,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    await _insert(db, "requirements", requirement_documents())
+
+    def comment_documents():
+        for project_id in project_ids:
+            for phase_id in phases[project_id]:
+                for index in range(20):
+                    yield {
+                        "phase_id": phase_id,
+                        "project_id": project_id,
+                        "user_email": f"{rng.choice(PEOPLE).lower()}@example.com",
+                        "comment": f"Revisado: {requirement_text(rng)['description']}",
+                        "is_internal": rng.random() < 0.3,
+                        "created_at": now - timedelta(hours=index),
+                        "updated_at": now - timedelta(hours=index),
+                    }
+
+    await _insert(db, "phase_comments", comment_documents())
+
+    await _insert(db, "webhook_subscriptions", (
+        {
+            "url": f"http://127.0.0.1:9/bench/{index}",
+            # Eventos que nunca se emiten: las suscripciones no generan entregas
+            "events": ["bench.none"],
+            "project_id": None,
+            "secret": None,
+            "has_secret": False,
+            "description": "Suscripción del benchmark",
+            "active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(20)
+    ))
+
+    try:
+        await project_summary_crud.rebuild(db)
+        for project_id in project_ids:
+            await project_phase_crud.rollup_project(db, project_id)
+    except Exception as e:
+        # mongomock no implementa $merge: los resúmenes quedan sin calcular
+        print(f"⚠️  Warning: No se pudieron reconstruir resúmenes y avance: {e}")
+
+    await db[META_COLLECTION].replace_one(
+        {"_id": "seed"},
+        {"_id": "seed", "params": params, "seeded_at": datetime.utcnow()},
+        upsert=True
+    )
+    print("✅ Datos sembrados")
+    return await load_context(db)
+
+
+async def _ids(db: AsyncIOMotorDatabase, collection: str, query: Optional[dict] = None, limit: int = SAMPLE_SIZE) -> List[str]:
+    cursor = db[collection].find(query or {}, {"_id": 1}).sort("_id", 1).limit(limit)
+    return [str(document["_id"]) async for document in cursor]
+
+
+async def load_context(db: AsyncIOMotorDatabase) -> SeedContext:
+    """Cargar una muestra de ids de los datos sembrados"""
+    context = SeedContext()
+    context.project_ids = await _ids(db, "projects")
+    per_project = max(SAMPLE_SIZE // max(len(context.project_ids), 1), 20)
+    for project_id in context.project_ids:
+        context.phase_ids[project_id] = await _ids(db, "project_phases", {"project_id": ObjectId(project_id)})
+        context.requirement_ids[project_id] = await _ids(
+            db, "requirements", {"project_id": ObjectId(project_id)}, per_project
+        )
+    context.transcription_ids = await _ids(db, "transcriptions")
+    context.meeting_ids = await _ids(db, "meetings")
+    context.comment_ids = await _ids(db, "phase_comments")
+    context.webhook_ids = await _ids(db, "webhook_subscriptions")
+    return context
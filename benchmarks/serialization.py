@@ -0,0 +1,287 @@
+"""
+CPU por petición de la serialización de respuestas, sin base de datos.
+
+Uso:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --items 100 --iterations 500
+
+Mide, con documentos como los que devuelve MongoDB, las tres formas de
+responder de un mismo handler:
+
+- validated-json:    response_model validado por FastAPI + json estándar
+                     (el comportamiento original)
+- validated-orjson:  response_model validado + ORJSONResponse
+                     (default_response_class de la app)
+- fast-orjson:       fast_response (forma del schema + orjson, sin validar)
+
+Además compara, desde los bytes BSON que recibe el driver, la lectura
+normal (dicts) con RAW_BSON_READS (RawBSONDocument): CPU y pico de memoria
+(tracemalloc) por petición.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CPU por petición de la serialización de respuestas")
+    parser.add_argument("--items", type=int, default=100, help="Documentos por listado")
+    parser.add_argument("--iterations", type=int, default=200, help="Peticiones simuladas por caso")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=BENCH_DIR / "results" / "serialization.json")
+    return parser.parse_args(argv)
+
+
+def _transcriptions(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    from app.services.fake_llm import fake_analysis
+    from benchmarks.seed import transcription_text
+
+    now = datetime.utcnow().replace(microsecond=123000)
+    documents = []
+    for index in range(count):
+        text = transcription_text(rng)
+        documents.append({
+            "_id": ObjectId(),
+            "transcription_text": text,
+            "user_email": f"user{index}@example.com",
+            "meeting_id": ObjectId(),
+            "project_id": ObjectId(),
+            "language": "es",
+            "source": "teams",
+            "status": "completed",
+            "processed_at": now,
+            "ai_analysis": fake_analysis(text),
+            "ai_model_used": "fake-llm",
+            "phases_created": 3,
+            "requirements_created": 8,
+            "text_hash": "0" * 64,
+            "created_at": now - timedelta(days=index),
+            "updated_at": now,
+        })
+    return documents
+
+
+def _requirements(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    from benchmarks.seed import requirement_text
+
+    now = datetime.utcnow().replace(microsecond=456000)
+    return [
+        {
+            "_id": ObjectId(),
+            "project_id": ObjectId(),
+            "phase_id": ObjectId(),
+            "transcription_id": ObjectId() if index % 3 else None,
+            **requirement_text(rng),
+            "type": "functional",
+            "priority": "medium",
+            "status": "pending",
+            "extracted_by_ai": True,
+            "user_edited": False,
+            "created_at": now - timedelta(minutes=index),
+            "updated_at": now,
+        }
+        for index in range(count)
+    ]
+
+
+def _route(app, method: str, path: str):
+    from fastapi.routing import APIRoute
+
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == path and method in route.methods:
+            return route
+    raise LookupError(f"{method} {path} no existe")
+
+
+async def _validated(route, content: Any, response_class) -> bytes:
+    """Lo que hace FastAPI con el valor devuelto por el handler"""
+    from fastapi.routing import serialize_response
+
+    body = await serialize_response(
+        field=route.response_field,
+        response_content=content,
+        by_alias=route.response_model_by_alias,
+        exclude_unset=route.response_model_exclude_unset,
+        exclude_defaults=route.response_model_exclude_defaults,
+        exclude_none=route.response_model_exclude_none,
+    )
+    return response_class(body).body
+
+
+async def _cpu_ms(render: Callable[[], Any], iterations: int) -> float:
+    await render()
+    started = time.process_time()
+    for _ in range(iterations):
+        await render()
+    return (time.process_time() - started) * 1000 / iterations
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from fastapi.responses import JSONResponse
+
+    import main
+    from app.core.responses import ORJSONResponse, fast_response
+    from app.crud.pagination import Page
+    from app.schemas.common import PaginatedResponse
+
+    rng = random.Random(args.seed)
+    transcriptions = _transcriptions(rng, args.items)
+    requirements = _requirements(rng, args.items)
+    api = "/api/v1"
+
+    def page(items):
+        return lambda: PaginatedResponse.from_page(
+            Page(items=items, total=len(items) * 10, has_more=True, next_cursor=None),
+            skip=0, limit=len(items)
+        )
+
+    # (nombre, ruta del handler, contenido devuelto por el handler)
+    cases = [
+        (f"GET /transcriptions/ ({args.items}, fields=*)", "/transcriptions/", page(transcriptions)),
+        (f"GET /requirements/ ({args.items})", "/requirements/", page(requirements)),
+        ("GET /transcriptions/{id}", "/transcriptions/{transcription_id}", lambda: transcriptions[0]),
+        ("GET /requirements/{id}", "/requirements/{requirement_id}", lambda: requirements[0]),
+    ]
+
+    results: Dict[str, Any] = {"meta": {"items": args.items, "iterations": args.iterations}, "cases": {}}
+    for name, path, content in cases:
+        route = _route(main.app, "GET", api + path)
+
+        async def validated_json():
+            return await _validated(route, content(), JSONResponse)
+
+        async def validated_orjson():
+            return await _validated(route, content(), ORJSONResponse)
+
+        async def fast_orjson():
+            return fast_response(route.response_model, content()).body
+
+        # Las tres variantes deben producir el mismo JSON (con orjson, los
+        # mismos bytes)
+        if json.loads(await validated_json()) != json.loads(await validated_orjson()):
+            raise AssertionError(f"{name}: las respuestas no coinciden")
+        if await validated_orjson() != await fast_orjson():
+            raise AssertionError(f"{name}: fast_response no coincide con la validación")
+
+        row = {
+            "bytes": len(await fast_orjson()),
+            "validated_json_cpu_ms": round(await _cpu_ms(validated_json, args.iterations), 4),
+            "validated_orjson_cpu_ms": round(await _cpu_ms(validated_orjson, args.iterations), 4),
+            "fast_orjson_cpu_ms": round(await _cpu_ms(fast_orjson, args.iterations), 4),
+        }
+        row["speedup"] = round(row["validated_json_cpu_ms"] / row["fast_orjson_cpu_ms"], 2)
+        results["cases"][name] = row
+
+    results["bson_cases"] = _bson_cases(transcriptions, args.iterations)
+    return results
+
+
+def _peak_kb(render: Callable[[], Any]) -> float:
+    """Pico de memoria asignada (KB) durante una petición"""
+    tracemalloc.start()
+    try:
+        render()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _bson_cases(transcriptions: List[Dict[str, Any]], iterations: int) -> Dict[str, Any]:
+    """
+    Lectura normal frente a RAW_BSON_READS desde el lote BSON que entrega el
+    servidor: decodificación del driver + respuesta. La respuesta con raw
+    decodifica un documento cada vez; la normal tiene el lote entero en dicts.
+    """
+    from app.core.responses import fast_response
+    from app.schemas.transcription import TranscriptionPartialResponse
+
+    raw_options = CodecOptions(document_class=RawBSONDocument)
+    # (nombre, lote BSON, schema de la respuesta, es un listado)
+    cases = [
+        (
+            f"GET /transcriptions/ ({len(transcriptions)}, fields=*)",
+            b"".join(bson.encode(doc) for doc in transcriptions),
+            List[TranscriptionPartialResponse],
+            True,
+        ),
+        ("GET /transcriptions/{id}", bson.encode(transcriptions[0]), TranscriptionPartialResponse, False),
+    ]
+
+    rows = {}
+    for name, batch, model, is_list in cases:
+        def decoded():
+            documents = bson.decode_all(batch)
+            return fast_response(model, documents if is_list else documents[0]).body
+
+        def raw():
+            documents = bson.decode_all(batch, raw_options)
+            return fast_response(model, documents if is_list else documents[0], raw=True).body
+
+        if decoded() != raw():
+            raise AssertionError(f"{name}: las respuestas no coinciden")
+
+        row = {"bson_bytes": len(batch)}
+        for label, render in (("dict", decoded), ("raw", raw)):
+            render()
+            started = time.process_time()
+            for _ in range(iterations):
+                render()
+            row[f"{label}_cpu_ms"] = round((time.process_time() - started) * 1000 / iterations, 4)
+            row[f"{label}_peak_kb"] = round(_peak_kb(render), 1)
+        rows[name] = row
+    return rows
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    cases = results["cases"]
+    width = max(len(name) for name in cases)
+    print(f"\nCPU por petición (ms), {results['meta']['iterations']} iteraciones")
+    print(f"{'Caso':<{width}}  {'bytes':>8}  {'valid+json':>10}  {'valid+orjson':>12}  {'fast+orjson':>11}  {'x':>6}")
+    for name, row in cases.items():
+        print(
+            f"{name:<{width}}  {row['bytes']:>8}  {row['validated_json_cpu_ms']:>10.3f}  "
+            f"{row['validated_orjson_cpu_ms']:>12.3f}  {row['fast_orjson_cpu_ms']:>11.3f}  {row['speedup']:>5.1f}x"
+        )
+
+    bson_cases = results.get("bson_cases", {})
+    if bson_cases:
+        width = max(len(name) for name in bson_cases)
+        print("\nBSON -> JSON: lectura normal (dict) frente a RAW_BSON_READS (raw)")
+        print(
+            f"{'Caso':<{width}}  {'BSON bytes':>10}  {'CPU dict':>9}  {'CPU raw':>9}  "
+            f"{'pico dict KB':>12}  {'pico raw KB':>11}"
+        )
+        for name, row in bson_cases.items():
+            print(
+                f"{name:<{width}}  {row['bson_bytes']:>10}  {row['dict_cpu_ms']:>9.3f}  {row['raw_cpu_ms']:>9.3f}  "
+                f"{row['dict_peak_kb']:>12.1f}  {row['raw_peak_kb']:>11.1f}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from benchmarks import report
+
+    args = parse_args(argv)
+    os.environ["FAST_RESPONSES"] = "true"
+    results = asyncio.run(run(args))
+    print_results(results)
+    report.save(args.output, results)
+    print(f"\n💾 Resultados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
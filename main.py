@@ -5,8 +5,14 @@ from contextlib import asynccontextmanager
 import uvicorn
 
 from app.core.config import settings
-from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.database import connect_to_mongo, close_mongo_connection, warm_up_pool, get_database
+from app.core.events import event_bus
+from app.core.responses import ORJSONResponse
+from app.services.webhooks import webhook_dispatcher
+from app.services.ai_cache import ai_cache
+from app.services.job_queue import job_worker_pool
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.transcriptions import cancel_streaming_tasks
 
 
 @asynccontextmanager
@@ -14,7 +20,22 @@ async def lifespan(app: FastAPI):
     """Gestión del ciclo de vida de la aplicación"""
     # Conectar a MongoDB al iniciar
     await connect_to_mongo()
+    # Abrir las conexiones mínimas del pool antes de recibir tráfico
+    await warm_up_pool()
+    # Origen de los eventos de cambios (change streams o bus en memoria)
+    db = await get_database()
+    await event_bus.start(db)
+    # Dispatcher de webhooks salientes (cola, lotes y workers)
+    await webhook_dispatcher.start(db)
+    # Workers de la cola de trabajos (0 si corren aparte con app.worker)
+    await job_worker_pool.start(db, settings.JOBS_INPROCESS_WORKERS)
     yield
+    await job_worker_pool.stop()
+    # Los procesamientos cancelados liberan su transcripción antes de cerrar
+    await cancel_streaming_tasks()
+    await webhook_dispatcher.stop()
+    await ai_cache.close()
+    await event_bus.stop()
     # Cerrar conexión al finalizar
     await close_mongo_connection()
 
@@ -26,6 +47,7 @@ def create_application() -> FastAPI:
         description="API Backend para V1tr0 Dashboard - MongoDB",
         version="1.0.0",
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
 
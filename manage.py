@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Comandos de mantenimiento del backend.
+
+Uso:
+    python manage.py indexes            # Crear/reconciliar índices
+    python manage.py indexes --check    # Además, fallar si alguna consulta hace COLLSCAN
+    python manage.py summaries rebuild  # Recalcular los resúmenes por proyecto
+    python manage.py summaries rebuild --project-id <id>
+"""
+import argparse
+import asyncio
+import sys
+from typing import Optional
+
+from app.core.config import settings
+
+
+async def _indexes(check: bool) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.core.indexes import ensure_indexes, check_query_plans
+    from app.crud import CRUD_REGISTRY
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        db = client[settings.MONGODB_DB]
+        await ensure_indexes(db, CRUD_REGISTRY)
+        print("✅ Índices reconciliados")
+
+        if check:
+            problems = await check_query_plans(db, CRUD_REGISTRY)
+            if problems:
+                print("❌ Consultas sin índice (COLLSCAN):")
+                for problem in problems:
+                    print(f"   - {problem}")
+                return 1
+            print("✅ Todas las consultas registradas usan índices")
+    finally:
+        client.close()
+
+    return 0
+
+
+async def _rebuild_summaries(project_id: Optional[str]) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from bson import ObjectId
+    from app.crud.project_summary import project_summary_crud
+
+    if project_id and not ObjectId.is_valid(project_id):
+        print(f"❌ ID de proyecto no válido: {project_id}")
+        return 1
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        db = client[settings.MONGODB_DB]
+        count = await project_summary_crud.rebuild(db, project_id)
+        print(f"✅ Resúmenes recalculados: {count}")
+    finally:
+        client.close()
+
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Comandos de mantenimiento de V1tr0 Backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    indexes_parser = subparsers.add_parser("indexes", help="Reconciliar índices de MongoDB")
+    indexes_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Ejecutar explain() sobre cada consulta registrada y fallar si hay COLLSCAN"
+    )
+
+    summaries_parser = subparsers.add_parser("summaries", help="Resúmenes por proyecto (dashboard)")
+    summaries_subparsers = summaries_parser.add_subparsers(dest="action", required=True)
+    rebuild_parser = summaries_subparsers.add_parser(
+        "rebuild",
+        help="Recalcular los contadores desde requirements y project_phases"
+    )
+    rebuild_parser.add_argument("--project-id", help="Recalcular sólo este proyecto")
+
+    args = parser.parse_args()
+
+    if args.command == "indexes":
+        return asyncio.run(_indexes(args.check))
+    if args.command == "summaries" and args.action == "rebuild":
+        return asyncio.run(_rebuild_summaries(args.project_id))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
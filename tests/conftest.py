@@ -0,0 +1,45 @@
+"""
+Fixtures comunes: MongoDB simulado con mongomock-motor y cliente HTTP de la
+app sin lifespan (sin conexión real, sin workers ni dispatcher).
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# Los tests no dependen del .env local (Settings lo lee del directorio
+# actual): se ejecutan desde tests/ con la configuración por defecto
+os.chdir(Path(__file__).resolve().parent)
+os.environ.setdefault("MONGODB_ENSURE_INDEXES", "false")
+os.environ.setdefault("AI_CACHE_REDIS_ENABLED", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from app.core import database, deps  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Base de datos en memoria, nueva en cada test"""
+    # mongomock no tiene transacciones: run_in_transaction ejecuta sin sesión
+    database._replicated = False
+    return AsyncMongoMockClient()["test"]
+
+
+@pytest.fixture
+def client(db):
+    import main
+
+    async def get_test_db():
+        yield db
+
+    main.app.dependency_overrides[deps.get_db] = get_test_db
+    try:
+        yield TestClient(main.app, base_url="http://localhost")
+    finally:
+        main.app.dependency_overrides.clear()
@@ -0,0 +1,30 @@
+"""
+Caché de análisis de IA: los aciertos en Redis cuentan para la expulsión.
+"""
+import asyncio
+
+from app.crud.ai_cache import ai_analysis_cache_crud
+from app.services.ai_cache import AICache
+
+
+def test_redis_hit_keeps_entry_from_eviction(db, monkeypatch):
+    cache = AICache()
+
+    async def scenario():
+        for key in ("hot", "cold"):
+            await ai_analysis_cache_crud.set(db, key, {"key": key}, "model", "v1", 3600)
+        await asyncio.sleep(0.01)
+
+        async def redis_get(key):
+            return {"key": key} if key == "hot" else None
+
+        monkeypatch.setattr(cache, "_redis_get", redis_get)
+        assert await cache.get(db, "hot") == {"key": "hot"}
+
+        assert await ai_analysis_cache_crud.evict_overflow(db, 1) == 1
+        return await db["ai_analysis_cache"].find_one({"_id": "hot"})
+
+    entry = asyncio.run(scenario())
+    assert entry is not None
+    assert entry["hits"] == 1
+    assert cache.snapshot()["redis_hits"] == 1
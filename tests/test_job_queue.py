@@ -0,0 +1,139 @@
+"""
+Cola de trabajos: límite de intentos con plazos vencidos y pérdida del plazo.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.crud.job import job_crud
+from app.services import job_queue
+from app.services.job_queue import JobWorkerPool
+
+
+def test_expired_lease_without_attempts_left_is_failed(db):
+    async def scenario():
+        job = await job_crud.enqueue(db, "test", {}, max_attempts=2)
+        await db["jobs"].update_one(
+            {"_id": job["_id"]},
+            {"$set": {
+                "status": "running",
+                "attempts": 2,
+                "worker_id": "dead-worker",
+                "locked_until": datetime.utcnow() - timedelta(seconds=1),
+            }}
+        )
+        claimed = await job_crud.claim(db, "worker", 30)
+        failed = await job_crud.fail_expired(db)
+        return claimed, failed, await db["jobs"].find_one({"_id": job["_id"]})
+
+    claimed, failed, job = asyncio.run(scenario())
+    assert claimed is None
+    assert failed == 1
+    assert job["status"] == "failed"
+    assert "active" not in job
+
+
+def test_expired_lease_with_attempts_left_is_claimed(db):
+    async def scenario():
+        job = await job_crud.enqueue(db, "test", {}, max_attempts=3)
+        await db["jobs"].update_one(
+            {"_id": job["_id"]},
+            {"$set": {"status": "running", "attempts": 1, "locked_until": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        return await job_crud.claim(db, "worker", 30)
+
+    claimed = asyncio.run(scenario())
+    assert claimed["worker_id"] == "worker"
+    assert claimed["attempts"] == 2
+
+
+def test_lost_lease_cancels_handler(db, monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_LEASE_SECONDS", 0.06)
+    cancelled = []
+
+    async def slow_handler(_db, job):
+        # Mientras corre, otro worker toma el trabajo
+        await _db["jobs"].update_one({"_id": job["_id"]}, {"$set": {"worker_id": "other"}})
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(job["_id"])
+            raise
+
+    monkeypatch.setitem(job_queue._handlers, "slow", slow_handler)
+    pool = JobWorkerPool()
+    pool._db = db
+
+    async def scenario():
+        await job_crud.enqueue(db, "slow", {})
+        job = await job_crud.claim(db, "worker", settings.JOBS_LEASE_SECONDS)
+        await asyncio.wait_for(pool._run(job, "worker"), timeout=2)
+        return job, await db["jobs"].find_one({"_id": job["_id"]})
+
+    job, stored = asyncio.run(scenario())
+    assert cancelled == [job["_id"]]
+    assert pool.snapshot()["lost"] == 1
+    assert stored["status"] == "running"
+    assert stored["worker_id"] == "other"
+
+
+def _processing_job(db, monkeypatch, steal_lease):
+    """Trabajo de procesamiento cuyo análisis no termina nunca"""
+    from app.services.ai_cache import ai_cache
+    from app.services.job_handlers import TRANSCRIPTION_PROCESS
+
+    async def analyze(_db, transcription_text, project_context=None, use_cache=True, on_item=None):
+        if steal_lease:
+            await _db["jobs"].update_one({"type": TRANSCRIPTION_PROCESS}, {"$set": {"worker_id": "other"}})
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(ai_cache, "analyze", analyze)
+
+    async def seed():
+        now = datetime.utcnow()
+        result = await db["transcriptions"].insert_one({
+            "transcription_text": "Texto", "user_email": "user@example.com", "status": "pending",
+            "created_at": now, "updated_at": now,
+        })
+        await job_crud.enqueue(db, TRANSCRIPTION_PROCESS, {"transcription_id": str(result.inserted_id)})
+        return result.inserted_id
+
+    return seed
+
+
+def test_lost_lease_releases_transcription(db, monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_LEASE_SECONDS", 0.06)
+    seed = _processing_job(db, monkeypatch, steal_lease=True)
+    pool = JobWorkerPool()
+    pool._db = db
+
+    async def scenario():
+        transcription_id = await seed()
+        job = await job_crud.claim(db, "worker", settings.JOBS_LEASE_SECONDS)
+        await asyncio.wait_for(pool._run(job, "worker"), timeout=2)
+        return await db["transcriptions"].find_one({"_id": transcription_id})
+
+    transcription = asyncio.run(scenario())
+    assert pool.snapshot()["lost"] == 1
+    assert transcription["status"] == "pending"
+    assert "processing_by" not in transcription
+
+
+def test_stopped_worker_releases_transcription(db, monkeypatch):
+    seed = _processing_job(db, monkeypatch, steal_lease=False)
+    pool = JobWorkerPool()
+
+    async def scenario():
+        transcription_id = await seed()
+        await pool.start(db, 1)
+        for _ in range(100):
+            transcription = await db["transcriptions"].find_one({"_id": transcription_id})
+            if transcription["status"] == "processing":
+                break
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return await db["transcriptions"].find_one({"_id": transcription_id})
+
+    transcription = asyncio.run(scenario())
+    assert transcription["status"] == "pending"
+    assert "processing_by" not in transcription
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.crud.pagination import decode_cursor, paginate
+
+
+def _seed_requirements(db, count=7):
+    now = datetime(2024, 1, 1)
+    project_id = ObjectId()
+    documents = [
+        {
+            "_id": ObjectId(),
+            "project_id": project_id,
+            "phase_id": ObjectId(),
+            "title": f"r{index}",
+            "description": "d",
+            "type": "functional",
+            "priority": "medium",
+            "status": "pending",
+            "extracted_by_ai": False,
+            "user_edited": False,
+            "created_at": now + timedelta(minutes=index),
+        }
+        for index in range(count)
+    ]
+    asyncio.run(db.requirements.insert_many(documents))
+    # Orden del listado: created_at descendente
+    return [doc["title"] for doc in reversed(documents)]
+
+
+def _walk(collection, total_mode, projection=None, limit=2):
+    """Recorrer todas las páginas siguiendo next_cursor"""
+    titles, totals, after = [], [], None
+    for _ in range(20):
+        page = asyncio.run(paginate(
+            collection, {}, "created_at", -1,
+            limit=limit, after=after, total_mode=total_mode, projection=projection
+        ))
+        titles += [doc["title"] for doc in page.items]
+        totals.append(page.total)
+        if not page.next_cursor:
+            return titles, totals
+        after = decode_cursor(page.next_cursor)
+    raise AssertionError("el cursor no termina")
+
+
+@pytest.mark.parametrize("total_mode", ["exact", "estimated", "none"])
+def test_cursor_walk_returns_every_document_once(db, total_mode):
+    expected = _seed_requirements(db)
+    titles, totals = _walk(db.requirements, total_mode)
+    assert titles == expected
+    if total_mode != "none":
+        assert set(totals) == {len(expected)}
+
+
+@pytest.mark.parametrize("total_mode", ["exact", "estimated", "none"])
+def test_cursor_walk_with_sort_field_excluded(db, total_mode):
+    expected = _seed_requirements(db)
+    titles, _ = _walk(db.requirements, total_mode, projection={"created_at": 0, "description": 0})
+    assert titles == expected
+
+
+def test_api_cursor_walk_with_exclude_sort_field(client, db):
+    expected = _seed_requirements(db, count=5)
+    titles, url = [], "/api/v1/requirements/?limit=2&exclude=created_at"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        body = response.json()
+        titles += [item["title"] for item in body["items"]]
+        assert body["total"] == len(expected)
+        cursor = body["next_cursor"]
+        url = f"/api/v1/requirements/?limit=2&exclude=created_at&cursor={cursor}" if cursor else None
+    assert titles == expected
@@ -0,0 +1,62 @@
+"""
+Rollup de proyecto (completitud y fase actual) tras reordenar y borrar fases.
+"""
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.crud.project_phase import project_phase_crud
+
+
+def _seed_project(db, phases):
+    project_id = ObjectId()
+    now = datetime.utcnow()
+
+    async def _insert():
+        await db["projects"].insert_one({
+            "_id": project_id,
+            "name": "Proyecto",
+            "completion_percentage": 40,
+            "current_phase_id": ObjectId(),
+        })
+        docs = [
+            {"_id": ObjectId(), "project_id": project_id, "name": f"Fase {order}", "order": order,
+             "status": "pending", "weight": 1, "created_at": now, "updated_at": now}
+            for order in range(1, phases + 1)
+        ]
+        if docs:
+            await db["project_phases"].insert_many(docs)
+        return [doc["_id"] for doc in docs]
+
+    return project_id, asyncio.run(_insert())
+
+
+def test_rollup_without_phases_resets_project(db):
+    project_id, _ = _seed_project(db, 0)
+
+    assert asyncio.run(project_phase_crud.rollup_project(db, project_id)) == 0
+
+    project = asyncio.run(db["projects"].find_one({"_id": project_id}))
+    assert project["completion_percentage"] == 0
+    assert "current_phase_id" not in project
+
+
+def test_rollup_of_missing_project_is_none(db):
+    assert asyncio.run(project_phase_crud.rollup_project(db, ObjectId())) is None
+
+
+def test_reorder_rolls_up_project(db, monkeypatch):
+    project_id, phase_ids = _seed_project(db, 2)
+    calls = []
+
+    async def fake_rollup(_db, rolled_project_id):
+        calls.append(rolled_project_id)
+        return 0
+
+    monkeypatch.setattr(project_phase_crud, "rollup_project", fake_rollup)
+    orders = [{"phase_id": str(phase_ids[0]), "order": 2}, {"phase_id": str(phase_ids[1]), "order": 1}]
+    phases = asyncio.run(project_phase_crud.reorder_phases(db, str(project_id), orders))
+
+    assert [phase["_id"] for phase in phases] == [phase_ids[1], phase_ids[0]]
+    assert calls == [project_id]
@@ -0,0 +1,136 @@
+"""
+fast_response produce los mismos bytes que la validación de response_model.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi.exceptions import ResponseValidationError
+from fastapi.routing import APIRoute, serialize_response
+
+import main
+from app.core.responses import ORJSONResponse, fast_response
+from app.crud.pagination import Page
+from app.schemas.common import PaginatedResponse
+from app.schemas.meeting import MeetingPartialResponse, MeetingResponse
+from app.schemas.phase_comment import PhaseCommentPartialResponse, PhaseCommentResponse
+from app.schemas.project_phase import ProjectPhasePartialResponse, ProjectPhaseResponse
+from app.schemas.requirement import RequirementPartialResponse, RequirementResponse
+from app.schemas.transcription import TranscriptionPartialResponse, TranscriptionResponse
+
+NOW = datetime(2024, 5, 1, 10, 30, 0, 123000)
+
+# Documentos como los de MongoDB, con números de otro tipo que el del schema
+# (p. ej. escritos por $round / $merge o por otros clientes)
+TRANSCRIPTION = {
+    "_id": ObjectId(), "transcription_text": "Texto", "user_email": "user@example.com",
+    "meeting_id": ObjectId(), "project_id": ObjectId(), "language": "es", "source": "teams",
+    "status": "completed", "processed_at": NOW, "ai_analysis": {"summary": "Resumen", "score": 1.0},
+    "ai_model_used": "gpt", "ai_cache_hit": 1, "phases_created": 3.0, "requirements_created": 8,
+    "text_hash": "0" * 64, "created_at": NOW, "updated_at": NOW,
+}
+REQUIREMENT = {
+    "_id": ObjectId(), "project_id": ObjectId(), "phase_id": ObjectId(), "transcription_id": None,
+    "title": "Login", "description": "Acceso con SSO", "type": "functional", "priority": "high",
+    "status": "pending", "extracted_by_ai": True, "user_edited": 0, "created_at": NOW, "updated_at": NOW,
+}
+PHASE = {
+    "_id": ObjectId(), "project_id": ObjectId(), "name": "Diseño", "description": None,
+    "status": "in_progress", "order": 1.0, "start_date": NOW, "completion_percentage": 50.0,
+    "weight": 2, "project_completion_percentage": 40.0, "created_at": NOW, "updated_at": NOW,
+}
+PHASE_WITHOUT_WEIGHT = {key: value for key, value in PHASE.items() if key != "weight"}
+COMMENT = {
+    "_id": ObjectId(), "phase_id": ObjectId(), "project_id": ObjectId(), "user_email": "user@example.com",
+    "comment": "Revisado", "is_internal": 0, "created_at": NOW, "updated_at": NOW,
+}
+MEETING = {
+    "_id": ObjectId(), "title": "Kickoff", "project_id": ObjectId(), "scheduled_at": NOW,
+    "duration_minutes": 30.0, "status": "scheduled", "participant_ids": [ObjectId(), ObjectId()],
+    "agenda": ["Alcance", "Fechas"], "created_at": NOW, "updated_at": NOW,
+}
+
+DOCUMENTS = {
+    TranscriptionResponse: [TRANSCRIPTION],
+    TranscriptionPartialResponse: [TRANSCRIPTION, {"_id": TRANSCRIPTION["_id"], "phases_created": 2.0}],
+    RequirementResponse: [REQUIREMENT],
+    RequirementPartialResponse: [REQUIREMENT, {"_id": REQUIREMENT["_id"], "user_edited": 1}],
+    ProjectPhaseResponse: [PHASE, PHASE_WITHOUT_WEIGHT],
+    ProjectPhasePartialResponse: [PHASE, {"_id": PHASE["_id"], "weight": 3}],
+    PhaseCommentResponse: [COMMENT],
+    PhaseCommentPartialResponse: [COMMENT],
+    MeetingResponse: [MEETING],
+    MeetingPartialResponse: [MEETING],
+}
+
+
+def _cases():
+    """(ruta, contenido devuelto por el handler) de cada GET con estos schemas"""
+    cases = []
+    for route in main.app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods:
+            continue
+        model = route.response_model
+        if model in DOCUMENTS:
+            cases += [(route, doc) for doc in DOCUMENTS[model]]
+        elif getattr(model, "__origin__", None) is list and model.__args__[0] in DOCUMENTS:
+            cases.append((route, DOCUMENTS[model.__args__[0]]))
+        elif isinstance(model, type) and issubclass(model, PaginatedResponse):
+            item_model = model.model_fields["items"].annotation.__args__[0]
+            if item_model in DOCUMENTS:
+                page = Page(items=DOCUMENTS[item_model], total=10, has_more=True, next_cursor="abc")
+                cases.append((route, PaginatedResponse.from_page(page, skip=0, limit=2)))
+    return cases
+
+
+CASES = _cases()
+
+
+def _validated(route, content) -> bytes:
+    body = asyncio.run(serialize_response(
+        field=route.response_field,
+        response_content=content,
+        by_alias=route.response_model_by_alias,
+        exclude_unset=route.response_model_exclude_unset,
+        exclude_defaults=route.response_model_exclude_defaults,
+        exclude_none=route.response_model_exclude_none,
+    ))
+    return ORJSONResponse(body).body
+
+
+def test_every_fast_schema_is_covered():
+    covered = {route.path for route, _ in CASES}
+    assert len(covered) >= 13
+
+
+@pytest.mark.parametrize("route, content", CASES, ids=[f"{route.path}-{index}" for index, (route, _) in enumerate(CASES)])
+def test_fast_response_matches_validation(route, content):
+    assert fast_response(route.response_model, content).body == _validated(route, content)
+
+
+def test_raw_bson_matches_validation():
+    import bson
+    from bson.codec_options import CodecOptions
+    from bson.raw_bson import RawBSONDocument
+
+    route = next(route for route, _ in CASES if route.path == "/api/v1/transcriptions/")
+    raw = [bson.decode(bson.encode(TRANSCRIPTION), CodecOptions(document_class=RawBSONDocument))]
+    page = PaginatedResponse.from_page(Page(items=raw, total=1, has_more=False, next_cursor=None), skip=0, limit=1)
+    expected = PaginatedResponse.from_page(
+        Page(items=[TRANSCRIPTION], total=1, has_more=False, next_cursor=None), skip=0, limit=1
+    )
+
+    assert fast_response(route.response_model, page, raw=True).body == _validated(route, expected)
+
+
+@pytest.mark.parametrize("document", [
+    {key: value for key, value in REQUIREMENT.items() if key != "title"},
+    {**REQUIREMENT, "title": None},
+])
+def test_invalid_document_fails_like_validation(document):
+    route = next(route for route, _ in CASES if route.response_model == list[RequirementResponse])
+    with pytest.raises(ResponseValidationError):
+        fast_response(route.response_model, [document])
+    with pytest.raises(ResponseValidationError):
+        _validated(route, [document])
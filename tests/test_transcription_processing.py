@@ -0,0 +1,118 @@
+"""
+Procesamiento con IA: una transcripción sólo la procesa un dueño a la vez, y
+una marca abandonada (proceso caído) se puede retomar.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.crud.transcription import TranscriptionBusyError, transcription_crud
+from app.services.ai_cache import ai_cache
+from app.services.job_handlers import process_transcription
+
+
+def _seed_transcription(db, **fields):
+    now = datetime.utcnow()
+    result = asyncio.run(db["transcriptions"].insert_one({
+        "transcription_text": "Reunión de arranque",
+        "user_email": "user@example.com",
+        "status": "pending",
+        "created_at": now,
+        "updated_at": now,
+        **fields,
+    }))
+    return str(result.inserted_id)
+
+
+def _claimed_by(owner, job_id=None, expires_in=60):
+    return {
+        "status": "processing",
+        "processing_by": owner,
+        "processing_job": job_id,
+        "processing_until": datetime.utcnow() + timedelta(seconds=expires_in),
+    }
+
+
+@pytest.fixture
+def fake_analysis(monkeypatch):
+    async def analyze(db, transcription_text, project_context=None, use_cache=True, on_item=None):
+        return {"summary": "Resumen"}, False
+
+    monkeypatch.setattr(ai_cache, "analyze", analyze)
+
+
+def test_start_processing_claims_once(db):
+    transcription_id = _seed_transcription(db)
+
+    claimed = asyncio.run(transcription_crud.start_processing(db, transcription_id, "a"))
+    assert claimed["status"] == "processing"
+    assert claimed["processing_by"] == "a"
+
+    with pytest.raises(TranscriptionBusyError):
+        asyncio.run(transcription_crud.start_processing(db, transcription_id, "b"))
+    assert asyncio.run(transcription_crud.start_processing(db, str(ObjectId()), "a")) is None
+
+
+def test_stale_claim_can_be_taken_over(db):
+    transcription_id = _seed_transcription(db, **_claimed_by("stream:dead", expires_in=-1))
+
+    claimed = asyncio.run(transcription_crud.start_processing(db, transcription_id, "b"))
+    assert claimed["processing_by"] == "b"
+
+
+def test_stream_returns_409_while_processing(client, db):
+    transcription_id = _seed_transcription(db, **_claimed_by("job:other:1", ObjectId()))
+
+    response = client.post(f"/api/v1/transcriptions/{transcription_id}/process/stream", json={})
+    assert response.status_code == 409
+
+    response = client.post(f"/api/v1/transcriptions/{ObjectId()}/process/stream", json={})
+    assert response.status_code == 404
+
+
+def test_reclaimed_job_finishes_its_own_crashed_attempt(db, fake_analysis):
+    # El primer intento tomó la marca y el worker murió; la cola retoma el
+    # trabajo al vencer su plazo (la marca de la transcripción sigue vigente)
+    job_id = ObjectId()
+    transcription_id = _seed_transcription(db, **_claimed_by(f"job:{job_id}:1", job_id))
+    job = {"_id": job_id, "payload": {"transcription_id": transcription_id}, "attempts": 2, "max_attempts": 3}
+
+    result = asyncio.run(process_transcription(db, job))
+    stored = asyncio.run(db["transcriptions"].find_one({"_id": ObjectId(transcription_id)}))
+
+    assert result["status"] == "completed"
+    assert "skipped" not in result
+    assert stored["status"] == "completed"
+    assert "processing_by" not in stored and "processing_until" not in stored
+
+
+def test_job_skips_while_another_owner_is_processing(db, fake_analysis):
+    transcription_id = _seed_transcription(db, **_claimed_by("stream:live"))
+    job = {"_id": ObjectId(), "payload": {"transcription_id": transcription_id}, "attempts": 1, "max_attempts": 3}
+
+    result = asyncio.run(process_transcription(db, job))
+    stored = asyncio.run(db["transcriptions"].find_one({"_id": ObjectId(transcription_id)}))
+
+    assert result == {"transcription_id": transcription_id, "status": "processing", "skipped": True}
+    assert stored["processing_by"] == "stream:live"
+
+
+def test_result_is_not_saved_after_losing_the_claim(db, monkeypatch):
+    transcription_id = _seed_transcription(db)
+
+    async def analyze(_db, transcription_text, project_context=None, use_cache=True, on_item=None):
+        # Mientras se analiza, la marca venció y otro la retomó
+        await _db["transcriptions"].update_one(
+            {"_id": ObjectId(transcription_id)}, {"$set": {"processing_by": "other"}}
+        )
+        return {"summary": "Resumen"}, False
+
+    monkeypatch.setattr(ai_cache, "analyze", analyze)
+    with pytest.raises(TranscriptionBusyError):
+        asyncio.run(transcription_crud.process_with_ai(db, transcription_id, owner="mine"))
+
+    stored = asyncio.run(db["transcriptions"].find_one({"_id": ObjectId(transcription_id)}))
+    assert stored["status"] == "processing"
+    assert stored["processing_by"] == "other"